@@ -0,0 +1,173 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, Optional
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，桶容量即允许的突发数"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self, cost: float = 1.0) -> float:
+        """
+        尝试取出令牌
+
+        Returns:
+            0 表示成功；否则为需要等待的秒数
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """
+    按键（用户 / 会话）的令牌桶限流
+
+    桶数量按 LRU 限制；长时间未使用的桶本来也已补满，淘汰后重建不影响结果。
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int = 4096):
+        self.rate = max(0.0, float(per_minute)) / 60.0
+        self.burst = max(1, int(burst))
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def try_take(self, key: Hashable, cost: float = 1.0) -> float:
+        """
+        Args:
+            key: 限流键
+            cost: 消耗的令牌数，超过桶容量时按桶容量计
+
+        Returns:
+            0 表示放行；否则为建议的等待秒数
+        """
+        if not self.enabled:
+            return 0.0
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.try_take(min(cost, self.burst))
+
+    def refund(self, key: Hashable, cost: float = 1.0) -> None:
+        """退还已取出的令牌（同一请求的其他限流未通过时）"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.tokens = min(bucket.burst, bucket.tokens + min(cost, self.burst))
+
+
+class Slots:
+    """
+    不排队的全局并发名额
+
+    与 asyncio.Semaphore 不同，名额用尽时立即返回失败，由调用方降级而不是等待。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self.in_use = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_use >= self.limit:
+            return False
+        self.in_use += 1
+        return True
+
+    def release(self) -> None:
+        self.in_use = max(0, self.in_use - 1)
+
+    @property
+    def load(self) -> float:
+        return self.in_use / self.limit
+
+
+@dataclass
+class Admission:
+    """一次请求的准入结果"""
+    allowed: bool
+    text_only: bool = False
+    message: str = ""
+    _slots: Optional[Slots] = field(default=None, repr=False)
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+
+
+class AdmissionController:
+    """
+    查询请求的准入控制
+
+    依次检查:
+    1. 用户与会话的令牌桶，超出时回复“请求过于频繁”
+    2. 全局进行中的查询数，用尽时回复“繁忙”
+    3. 全局负载超过 text_only_load 时只回复文字，不再渲染图片
+    渲染另有独立的全局名额，用尽时单张卡片降级为文字。
+    """
+
+    def __init__(self, user_per_minute: float = 6, user_burst: int = 3,
+                 chat_per_minute: float = 20, chat_burst: int = 10,
+                 max_queries: int = 32, max_renders: int = 8, text_only_load: float = 0.75):
+        self.user_limiter = RateLimiter(user_per_minute, user_burst)
+        self.chat_limiter = RateLimiter(chat_per_minute, chat_burst)
+        self.query_slots = Slots(max_queries)
+        self.render_slots = Slots(max_renders)
+        self.text_only_load = text_only_load
+        self.rate_limited = 0
+        self.busy = 0
+        self.degraded = 0
+
+    def admit(self, user_key: Hashable, chat_key: Hashable, exempt: bool = False,
+              cost: float = 1.0) -> Admission:
+        """
+        判断是否受理一次查询；受理时占用一个全局名额，需在结束后调用 release()
+
+        Args:
+            user_key: 用户标识
+            chat_key: 会话标识
+            exempt: 是否跳过用户/会话限流（如管理员）
+            cost: 消耗的令牌数（批量查询按服务器数计）
+        """
+        if not exempt:
+            wait = self.user_limiter.try_take(user_key, cost)
+            if wait == 0:
+                wait = self.chat_limiter.try_take(chat_key, cost)
+                if wait > 0:
+                    self.user_limiter.refund(user_key, cost)
+            if wait > 0:
+                self.rate_limited += 1
+                return Admission(False, message=f"查询过于频繁，请 {max(1, round(wait))} 秒后再试")
+        if not self.query_slots.try_acquire():
+            self.busy += 1
+            return Admission(False, message="当前查询人数较多，请稍后再试")
+        text_only = self.query_slots.load > self.text_only_load
+        if text_only:
+            self.degraded += 1
+        return Admission(True, text_only=text_only, _slots=self.query_slots)
@@ -0,0 +1,209 @@
+import asyncio
+import ipaddress
+import random
+import socket
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+
+RAKNET_MAGIC = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+UNCONNECTED_PING = 0x01
+UNCONNECTED_PONG = 0x1C
+
+
+def build_ping(ping_id: int, client_guid: int) -> bytes:
+    """构造 RakNet Unconnected Ping 数据包"""
+    return struct.pack(">BQ", UNCONNECTED_PING, ping_id) + RAKNET_MAGIC + struct.pack(">Q", client_guid)
+
+
+def parse_pong(data: bytes) -> Tuple[int, str]:
+    """
+    解析 RakNet Unconnected Pong 数据包
+
+    Returns:
+        (ping_id, 服务器信息字符串)
+
+    Raises:
+        ValueError: 数据包格式不正确
+    """
+    if len(data) < 35 or data[0] != UNCONNECTED_PONG or data[17:33] != RAKNET_MAGIC:
+        raise ValueError("不是有效的 Unconnected Pong")
+    ping_id = struct.unpack_from(">Q", data, 1)[0]
+    (length,) = struct.unpack_from(">H", data, 33)
+    payload = data[35:35 + length].decode("utf-8", errors="replace")
+    return ping_id, payload
+
+
+def pong_to_info(payload: str, host: str, port: int, latency_ms: float) -> dict:
+    """
+    将 pong 中的服务器信息字符串转换为与 _probe_bedrock 相同结构的字典
+
+    格式: 版本标识;MOTD;协议号;版本号;在线人数;最大人数;服务器ID;地图名;游戏模式;...
+    """
+    fields = payload.split(";")
+    if len(fields) < 6:
+        raise ValueError(f"服务器信息字段不足: {len(fields)}")
+
+    def to_int(value: str) -> int:
+        try:
+            return int(value)
+        except ValueError:
+            return 0
+
+    motd = fields[1]
+    if not motd and len(fields) > 7:
+        motd = fields[7]
+    return {
+        "edition": "BE基岩版",
+        "host": host,
+        "port": port,
+        "online": True,
+        "latency_ms": round(latency_ms),
+        "protocol": to_int(fields[2]) if fields[2] else None,
+        "version_name": fields[3] or "",
+        "players_online": to_int(fields[4]),
+        "players_max": to_int(fields[5]),
+        "player_names": [],
+        "motd": motd or "",
+        "favicon_data_uri": None,
+    }
+
+
+class _PingProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner: "BedrockPinger"):
+        self.owner = owner
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.owner._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.info(f"Bedrock UDP 端点错误: {exc}")
+
+
+class BedrockPinger:
+    """
+    共享的 Bedrock UDP 探测端点
+
+    每个地址族只打开一个长期存在的 UDP 套接字，向任意数量的服务器发送
+    Unconnected Ping，并按 ping 编号与来源地址把 pong 分发给对应的等待方。
+    每个目标有独立的超时，期间按间隔重发以应对丢包。
+    """
+
+    def __init__(self, resend_interval: float = 1.0):
+        self.resend_interval = resend_interval
+        self.client_guid = random.getrandbits(63)
+        self._next_id = random.getrandbits(32)
+        self._transports: Dict[int, asyncio.DatagramTransport] = {}
+        self._lock = asyncio.Lock()
+        # ping_id -> (目标 IP, future)
+        self._pending: Dict[int, Tuple[str, "asyncio.Future[Tuple[str, float]]"]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def ping(self, ip: str, port: int, timeout: float,
+                   host: Optional[str] = None, label_port: Optional[int] = None) -> dict:
+        """
+        探测一个 Bedrock 服务器
+
+        Args:
+            ip: 目标地址（IP，或交给系统解析的域名）
+            port: 目标端口
+            timeout: 超时时间
+            host: 结果中显示的地址，默认为 ip
+            label_port: 结果中显示的端口，默认为 port
+
+        Returns:
+            与 _probe_bedrock 相同结构的服务器信息
+
+        Raises:
+            asyncio.TimeoutError: 超时未收到应答
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        ip = await asyncio.wait_for(self._to_ip(ip, port), timeout)
+        transport = await self._transport(ipaddress.ip_address(ip).version)
+
+        ping_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFFFFFFFFFF
+        future: "asyncio.Future[Tuple[str, float]]" = loop.create_future()
+        self._pending[ping_id] = (ip, future)
+        packet = build_ping(ping_id, self.client_guid)
+        try:
+            while True:
+                # 延迟按最近一次发送计算，丢包重发不会把等待时间算进延迟
+                sent_at = time.perf_counter()
+                transport.sendto(packet, (ip, port))
+                wait = min(self.resend_interval, deadline - loop.time())
+                if wait <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    payload, received_at = await asyncio.wait_for(asyncio.shield(future), wait)
+                    break
+                except asyncio.TimeoutError:
+                    if loop.time() >= deadline:
+                        raise
+        finally:
+            self._pending.pop(ping_id, None)
+            if not future.done():
+                future.cancel()
+
+        latency_ms = (received_at - sent_at) * 1000
+        return pong_to_info(payload, host or ip, label_port or port, latency_ms)
+
+    def close(self) -> None:
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
+        for _, future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def _transport(self, version: int) -> asyncio.DatagramTransport:
+        transport = self._transports.get(version)
+        if transport is not None and not transport.is_closing():
+            return transport
+        async with self._lock:
+            transport = self._transports.get(version)
+            if transport is None or transport.is_closing():
+                loop = asyncio.get_running_loop()
+                family = socket.AF_INET if version == 4 else socket.AF_INET6
+                local = ("0.0.0.0", 0) if version == 4 else ("::", 0)
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _PingProtocol(self), local_addr=local, family=family
+                )
+                self._transports[version] = transport
+        return transport
+
+    @staticmethod
+    async def _to_ip(host: str, port: int) -> str:
+        try:
+            return ipaddress.ip_address(host).compressed
+        except ValueError:
+            pass
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_DGRAM)
+        return ipaddress.ip_address(infos[0][4][0]).compressed
+
+    def _on_datagram(self, data: bytes, addr) -> None:
+        received_at = time.perf_counter()
+        try:
+            ping_id, payload = parse_pong(data)
+        except (ValueError, struct.error):
+            return
+        pending = self._pending.get(ping_id)
+        if pending is None:
+            return
+        ip, future = pending
+        try:
+            source = ipaddress.ip_address(addr[0].split("%", 1)[0]).compressed
+        except ValueError:
+            return
+        if source != ip or future.done():
+            return
+        future.set_result((payload, received_at))
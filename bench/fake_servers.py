@@ -0,0 +1,265 @@
+"""
+本地模拟的 Minecraft 服务器
+
+FakeJavaServer 在 TCP 上实现 Server List Ping（握手、状态请求与延迟测试），
+FakeBedrockServer 在 UDP 上应答 RakNet Unconnected Ping。
+两者都可以配置应答延迟、MOTD 长度、图标大小与玩家列表长度，供基准测试使用。
+"""
+import asyncio
+import base64
+import io
+import json
+import random
+import struct
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+RAKNET_MAGIC = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+
+
+@dataclass
+class FakeServerOptions:
+    """模拟服务器的应答内容与延迟"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    motd_length: int = 40
+    favicon_size: int = 64
+    player_sample: int = 12
+    players_online: int = 42
+    players_max: int = 100
+    version_name: str = "Paper 1.20.4"
+    protocol: int = 765
+
+    def delay(self) -> float:
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+
+def make_motd(length: int) -> str:
+    """生成带颜色代码的指定长度 MOTD"""
+    words = ["§aWelcome", "§eto", "§lthe", "§rbench", "§bserver", "§6survival", "§dminigames", "§7lobby"]
+    parts: List[str] = []
+    size = 0
+    while size < length:
+        word = words[len(parts) % len(words)]
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)[:length]
+
+
+def make_favicon(size: int) -> Optional[str]:
+    """生成随机像素的 PNG 图标 data URI（随机像素几乎无法压缩，体积接近最坏情况）"""
+    if size <= 0:
+        return None
+    from PIL import Image
+
+    image = Image.frombytes("RGBA", (size, size), bytes(random.getrandbits(8) for _ in range(size * size * 4)))
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    value &= 0xFFFFFFFF
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for i in range(5):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return result
+    raise ValueError("VarInt 过长")
+
+
+def _packet(packet_id: int, payload: bytes) -> bytes:
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+class FakeJavaServer:
+    """Java 版 Server List Ping 模拟服务器（TCP）"""
+
+    def __init__(self, options: FakeServerOptions):
+        self.options = options
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        status = {
+            "version": {"name": options.version_name, "protocol": options.protocol},
+            "players": {
+                "online": options.players_online,
+                "max": options.players_max,
+                "sample": [
+                    {"name": f"Player{i:04d}", "id": f"00000000-0000-0000-0000-{i:012d}"}
+                    for i in range(options.player_sample)
+                ],
+            },
+            "description": {"text": make_motd(options.motd_length)},
+        }
+        favicon = make_favicon(options.favicon_size)
+        if favicon:
+            status["favicon"] = favicon
+        data = json.dumps(status).encode("utf-8")
+        self._status_packet = _packet(0x00, _varint(len(data)) + data)
+
+    async def start(self, host: str, port: int) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                length = await _read_varint(reader)
+                data = await reader.readexactly(length)
+                packet_id = data[0]
+                if packet_id == 0x00 and length > 1:
+                    # 握手包，无需应答
+                    continue
+                if packet_id == 0x00:
+                    self.requests += 1
+                    await asyncio.sleep(self.options.delay())
+                    writer.write(self._status_packet)
+                elif packet_id == 0x01:
+                    await asyncio.sleep(self.options.delay())
+                    writer.write(_packet(0x01, data[1:9]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class _BedrockProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner: "FakeBedrockServer"):
+        self.owner = owner
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) < 33 or data[0] != 0x01 or data[9:25] != RAKNET_MAGIC:
+            return
+        self.owner.requests += 1
+        pong = self.owner.pong(data[1:9])
+        delay = self.owner.options.delay()
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, pong, addr)
+        else:
+            self.transport.sendto(pong, addr)
+
+
+class FakeBedrockServer:
+    """基岩版 RakNet Unconnected Pong 模拟服务器（UDP）"""
+
+    def __init__(self, options: FakeServerOptions):
+        self.options = options
+        self.requests = 0
+        self.server_guid = random.getrandbits(63)
+        # 基岩版 MOTD 中不能包含分号
+        self._motd = make_motd(options.motd_length).replace(";", " ")
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._port = 0
+
+    def pong(self, ping_time: bytes) -> bytes:
+        o = self.options
+        info = (
+            f"MCPE;{self._motd};{o.protocol};{o.version_name.split()[-1]};{o.players_online};{o.players_max};"
+            f"{self.server_guid};Bench;Survival;1;{self._port};{self._port};"
+        ).encode("utf-8")
+        return (
+            b"\x1c" + ping_time + struct.pack(">Q", self.server_guid) + RAKNET_MAGIC
+            + struct.pack(">H", len(info)) + info
+        )
+
+    async def start(self, host: str, port: int) -> int:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _BedrockProtocol(self), local_addr=(host, port)
+        )
+        self._port = self._transport.get_extra_info("sockname")[1]
+        return self._port
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+class FakeServerThread:
+    """
+    在独立线程的事件循环中运行一组模拟服务器
+
+    每个服务器在同一端口号上同时监听 TCP（Java）与 UDP（基岩版），
+    模拟服务器的开销不会计入插件所在事件循环的延迟。
+    """
+
+    def __init__(self, options: FakeServerOptions, count: int = 1, host: str = "127.0.0.1",
+                 java: bool = True, bedrock: bool = True):
+        self.options = options
+        self.count = count
+        self.host = host
+        self.java = java
+        self.bedrock = bedrock
+        self.ports: List[int] = []
+        self.servers: List[Tuple[Optional[FakeJavaServer], Optional[FakeBedrockServer]]] = []
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake_mc", daemon=True)
+
+    def __enter__(self) -> "FakeServerThread":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=30)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    @property
+    def addresses(self) -> List[str]:
+        return [f"{self.host}:{port}" for port in self.ports]
+
+    async def _start(self) -> None:
+        for _ in range(self.count):
+            java = FakeJavaServer(self.options) if self.java else None
+            bedrock = FakeBedrockServer(self.options) if self.bedrock else None
+            port = await self._bind(java, bedrock)
+            self.ports.append(port)
+            self.servers.append((java, bedrock))
+
+    async def _bind(self, java: Optional[FakeJavaServer], bedrock: Optional[FakeBedrockServer]) -> int:
+        # TCP 端口由系统分配，再在同一端口号上绑定 UDP；偶尔冲突时重试
+        for _ in range(20):
+            port = await java.start(self.host, 0) if java else 0
+            if bedrock is None:
+                return port
+            try:
+                return await bedrock.start(self.host, port)
+            except OSError:
+                if java:
+                    await java.close()
+        raise OSError("无法为模拟服务器分配端口")
+
+    async def _close(self) -> None:
+        for java, bedrock in self.servers:
+            if java:
+                await java.close()
+            if bedrock:
+                await bedrock.close()
@@ -0,0 +1,246 @@
+"""
+端到端基准测试
+
+在本机启动模拟的 Java / 基岩版服务器，直接调用插件的 handle_motd，
+统计 single（串行单查询）、burst（并发单查询）与 batch（批量查询）三种负载下的
+p50/p95/p99 端到端延迟、每秒生成的卡片数与进程峰值内存。
+峰值内存是进程启动以来的累计值，同一次运行中后面的负载会沿用前面负载的峰值，
+需要单个负载的内存数据时用 --workloads 只运行该负载。
+
+需要在已安装 AstrBot 与插件依赖的环境中运行:
+    python bench/run_bench.py --requests 200 --latency-ms 20 --favicon-size 64
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_servers import FakeServerOptions, FakeServerThread  # noqa: E402
+
+
+class BenchEvent:
+    """模拟 AstrMessageEvent，只实现 handle_motd 用到的部分"""
+
+    def __init__(self, message_str: str, session: str = "bench", platform: str = "aiocqhttp"):
+        self.message_str = message_str
+        self.unified_msg_origin = f"{platform}:GroupMessage:{session}"
+        self.platform = platform
+        self.session = session
+
+    def get_platform_name(self) -> str:
+        return self.platform
+
+    def get_sender_id(self) -> str:
+        return f"user_{self.session}"
+
+    def get_group_id(self) -> str:
+        return self.session
+
+    def get_self_id(self) -> str:
+        return "bench_bot"
+
+    def is_admin(self) -> bool:
+        return False
+
+    def plain_result(self, text: str) -> Dict[str, Any]:
+        return {"type": "plain", "text": text}
+
+    def chain_result(self, chain: List[Any]) -> Dict[str, Any]:
+        return {"type": "chain", "chain": chain}
+
+
+class BenchContext:
+    """模拟 Context，监控通知直接丢弃"""
+
+    async def send_message(self, session, message_chain) -> bool:
+        return True
+
+
+def load_plugin_class():
+    """以包的形式导入插件，保证 main.py 中的相对导入可用"""
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+    module = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.main")
+    return module.MinecraftMOTDPlugin
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    进程启动以来的峰值常驻内存（MB），不支持的平台返回 None
+
+    ru_maxrss 只增不减，因此是截至调用时所有负载的累计峰值，而不是单个负载的峰值。
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_request(plugin, message: str, session: str) -> Dict[str, Any]:
+    """执行一次 /motd 请求，返回耗时与回复统计"""
+    event = BenchEvent(message, session=session)
+    started = time.perf_counter()
+    first_reply: Optional[float] = None
+    cards = 0
+    texts = 0
+    async for result in plugin.handle_motd(event):
+        if first_reply is None:
+            first_reply = time.perf_counter() - started
+        if result["type"] == "chain":
+            cards += 1
+        else:
+            texts += 1
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "first_reply": first_reply or elapsed, "cards": cards, "texts": texts}
+
+
+async def run_workload(plugin, name: str, messages: List[str], concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int, message: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_request(plugin, message, session=str(i % 16))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i, m) for i, m in enumerate(messages)))
+    wall = time.perf_counter() - started
+
+    latencies = [r["elapsed"] * 1000 for r in results]
+    first = [r["first_reply"] * 1000 for r in results]
+    cards = sum(r["cards"] for r in results)
+    return {
+        "workload": name,
+        "requests": len(results),
+        "concurrency": concurrency,
+        "wall_sec": round(wall, 3),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "first_reply_p50_ms": round(percentile(first, 50), 2),
+        "cards": cards,
+        "text_replies": sum(r["texts"] for r in results),
+        "cards_per_sec": round(cards / wall, 2) if wall > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    rss = result["peak_rss_mb"]
+    return (
+        f"{result['workload']:<7} n={result['requests']:<5} c={result['concurrency']:<4} "
+        f"p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms p99={result['p99_ms']:>8.2f}ms "
+        f"first_p50={result['first_reply_p50_ms']:>8.2f}ms "
+        f"cards/s={result['cards_per_sec']:>8.2f} text={result['text_replies']:<4} "
+        f"peak_rss_cum={'n/a' if rss is None else f'{rss:.1f}MB'}"
+    )
+
+
+def parse_config(pairs: List[str]) -> Dict[str, Any]:
+    """解析 --config key=value，值按 JSON 解析，失败时作为字符串"""
+    config: Dict[str, Any] = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        try:
+            config[key] = json.loads(value)
+        except ValueError:
+            config[key] = value
+    return config
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    options = FakeServerOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        motd_length=args.motd_length,
+        favicon_size=args.favicon_size,
+        player_sample=args.players,
+    )
+    # 默认关闭状态缓存与用户/会话限流，每次请求都真实探测；可用 --config 覆盖
+    config = {
+        "status_cache_ttl": 0,
+        "history_persist": False,
+        "batch_max_servers": max(30, args.batch_size),
+        "rate_limit_user_per_min": 0,
+        "rate_limit_chat_per_min": 0,
+    }
+    config.update(parse_config(args.config))
+
+    plugin_cls = load_plugin_class()
+    plugin = plugin_cls(BenchContext(), config)
+    await plugin.initialize()
+
+    results = []
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    try:
+        with FakeServerThread(options, count=max(1, args.batch_size)) as fakes:
+            addresses = fakes.addresses
+            for name in workloads:
+                if name == "single":
+                    messages = [f"motd {addresses[i % len(addresses)]}" for i in range(args.requests)]
+                    results.append(await run_workload(plugin, name, messages, 1))
+                elif name == "burst":
+                    messages = [f"motd {addresses[i % len(addresses)]}" for i in range(args.requests)]
+                    results.append(await run_workload(plugin, name, messages, args.concurrency))
+                elif name == "batch":
+                    count = max(1, args.requests // max(1, args.batch_size))
+                    messages = ["motd " + " ".join(addresses)] * count
+                    results.append(await run_workload(plugin, name, messages, max(1, args.concurrency // 8)))
+                else:
+                    raise SystemExit(f"未知的负载类型: {name}")
+                print(format_result(results[-1]), flush=True)
+    finally:
+        await plugin.terminate()
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="MOTD 插件端到端基准测试")
+    parser.add_argument("--workloads", default="single,burst,batch", help="逗号分隔: single,burst,batch")
+    parser.add_argument("--requests", type=int, default=100, help="每种负载的请求数")
+    parser.add_argument("--concurrency", type=int, default=32, help="burst 负载的并发数")
+    parser.add_argument("--batch-size", type=int, default=8, help="batch 负载每次查询的服务器数")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="模拟服务器的应答延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="应答延迟的随机抖动")
+    parser.add_argument("--motd-length", type=int, default=60, help="MOTD 长度（字符）")
+    parser.add_argument("--favicon-size", type=int, default=64, help="图标边长（像素），0 表示不带图标")
+    parser.add_argument("--players", type=int, default=12, help="玩家列表样本长度")
+    parser.add_argument("--config", action="append", default=[], metavar="KEY=VALUE", help="覆盖插件配置项")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--output", help="同时将结果追加写入文件（相对于当前目录），例如 bench_output.txt")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    if cli_args.output:
+        # 下面会切换到临时目录，相对路径需按启动时的工作目录解析
+        cli_args.output = os.path.abspath(cli_args.output)
+    # AstrBot 的数据目录基于当前工作目录，基准测试在临时目录中运行以免污染真实数据
+    with tempfile.TemporaryDirectory(prefix="motd_bench_") as workdir:
+        os.chdir(workdir)
+        bench_results = asyncio.run(main(cli_args))
+    lines = [json.dumps(r, ensure_ascii=False) if cli_args.json else format_result(r) for r in bench_results]
+    if cli_args.json:
+        print("\n".join(lines))
+    if cli_args.output:
+        with open(cli_args.output, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class LRUCache:
+    """
+    带 TTL 的 LRU 缓存
+
+    同时支持条目数上限与按权重（例如字节数）计算的容量上限，并统计命中率。
+    只在事件循环线程中使用，不做加锁。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        # key -> (value, stored_at, expires_at, weight)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, Optional[float], int]]" = OrderedDict()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get_entry(key, count=False) is not None
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def get_entry(self, key: Hashable, count: bool = True) -> Optional[Tuple[Any, float]]:
+        """
+        获取缓存值及其写入时间
+
+        Returns:
+            (值, 写入时间戳) 或 None
+        """
+        item = self._data.get(key)
+        if item is None:
+            if count:
+                self.misses += 1
+            return None
+        value, stored_at, expires_at, _ = item
+        if expires_at is not None and time.time() >= expires_at:
+            self.pop(key)
+            if count:
+                self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value, stored_at
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            stored_at: Optional[float] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 覆盖默认 TTL（秒），None 表示使用默认值
+            stored_at: 写入时间戳，恢复旧数据时使用
+        """
+        self.pop(key)
+        now = time.time()
+        stored_at = now if stored_at is None else stored_at
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = stored_at + ttl if ttl is not None else None
+        if expires_at is not None and expires_at <= now:
+            return
+        weight = self.weigher(value) if self.weigher else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        self._data[key] = (value, stored_at, expires_at, weight)
+        self._weight += weight
+        self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        self._weight -= item[3]
+        return item[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._weight = 0
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float, Optional[float]]]:
+        """遍历未过期的条目：(键, 值, 写入时间, 过期时间)"""
+        now = time.time()
+        for key, (value, stored_at, expires_at, _) in list(self._data.items()):
+            if expires_at is None or now < expires_at:
+                yield key, value, stored_at, expires_at
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "weight": self._weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize or (
+            self.max_weight is not None and self._weight > self.max_weight and self._data
+        ):
+            _, item = self._data.popitem(last=False)
+            self._weight -= item[3]
+
+
+class SingleFlight:
+    """
+    请求合并
+
+    同一个键同时只有一个协程在执行，其他并发调用方共享这一次的结果。
+    某个调用方被取消不会影响正在进行的任务。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
@@ -0,0 +1,294 @@
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+Color = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class CardTheme:
+    """状态卡片配色与品牌文字"""
+    name: str
+    background: Color
+    fg_primary: Color
+    fg_secondary: Color
+    accent_java: Color
+    accent_bedrock: Color
+    players: Color
+    chart_outline: Color
+    offline: Color
+    composite_background: Color
+    badge_text: Color = (255, 255, 255)
+    # MOTD 的颜色代码按深色背景设计，浅色主题在 MOTD 区域下方垫一块深色底板
+    motd_panel: Optional[Color] = None
+    motd_default: Optional[Color] = None
+    brand: str = ""
+
+    @property
+    def key(self) -> str:
+        """渲染缓存与模板缓存使用的主题标识"""
+        return f"{self.name}|{self.brand}"
+
+    @property
+    def motd_color(self) -> Color:
+        """MOTD 中未指定颜色的文字使用的颜色"""
+        return self.motd_default or self.fg_primary
+
+    def accent_for(self, edition: str) -> Color:
+        return self.accent_java if edition == "Java" else self.accent_bedrock
+
+    def with_brand(self, brand: str) -> "CardTheme":
+        return replace(self, brand=brand)
+
+
+THEMES: Dict[str, CardTheme] = {
+    "dark": CardTheme(
+        name="dark",
+        background=(28, 30, 34),
+        fg_primary=(235, 235, 235),
+        fg_secondary=(170, 170, 170),
+        accent_java=(88, 166, 255),
+        accent_bedrock=(76, 175, 80),
+        players=(120, 200, 120),
+        chart_outline=(60, 63, 70),
+        offline=(220, 76, 70),
+        composite_background=(18, 19, 22),
+    ),
+    "light": CardTheme(
+        name="light",
+        background=(246, 247, 249),
+        fg_primary=(30, 32, 36),
+        fg_secondary=(96, 100, 108),
+        accent_java=(38, 110, 220),
+        accent_bedrock=(46, 140, 60),
+        players=(46, 140, 60),
+        chart_outline=(210, 213, 220),
+        offline=(200, 56, 50),
+        composite_background=(226, 228, 232),
+        motd_panel=(44, 46, 52),
+        motd_default=(235, 235, 235),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class CardLayout:
+    """卡片中固定元素的位置（与主题无关）"""
+    width: int = 900
+    height: int = 300
+    padding: int = 20
+    icon_size: int = 96
+    history_height: int = 80
+    title_size: int = 28
+    body_size: int = 20
+    small_size: int = 16
+    # 第二行三列标签相对文字区域起点的偏移
+    columns: Tuple[int, int, int] = (0, 190, 340)
+
+    @property
+    def x_text(self) -> int:
+        return self.padding + self.icon_size + 16
+
+
+@dataclass
+class CardTemplate:
+    """预先绘制好静态部分的卡片底图，以及动态字段的绘制位置"""
+    image: Image.Image
+    y_info: int
+    y_players: int
+    y_motd: int
+    # 标签名 -> 数值的绘制坐标
+    value_pos: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # 趋势图的两个绘图区域
+    chart_boxes: Tuple[Tuple[int, int, int, int], ...] = ()
+    # 双版本卡片中各版本栏的水平范围 (x0, x1)
+    column_spans: Tuple[Tuple[int, int], ...] = ()
+
+
+class CardTemplates:
+    """
+    卡片模板缓存
+
+    按 (主题, 版本, 是否带趋势图) 预先绘制背景、版本徽标、固定标签、趋势图边框与品牌文字，
+    每次渲染只需复制底图并绘制动态字段。Java 与基岩版同时应答时使用左右两栏的双版本模板。
+    模板在渲染线程中按需创建，访问时加锁。
+    """
+
+    LABELS_INFO = ("延迟:", "协议:", "版本:")
+    LABEL_PLAYERS = "在线:"
+    # 双版本模板每栏的标签行：(标签, 相对栏起点的横向偏移, 行号)
+    COMBINED_ROWS = (("延迟:", 0, 0), ("协议:", 170, 0), ("版本:", 0, 1), ("在线:", 0, 2))
+
+    def __init__(self, font_loader: Callable[[int, str], ImageFont.ImageFont], layout: CardLayout = CardLayout()):
+        self.font_loader = font_loader
+        self.layout = layout
+        self._templates: Dict[Tuple[str, str, bool], CardTemplate] = {}
+        self._offline: Dict[str, Image.Image] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def preload(self, themes: Iterable[CardTheme], editions: Iterable[str] = ("Java", "BE基岩版")) -> None:
+        """启动时为常用组合预先生成模板（同步，需在线程中调用）"""
+        for theme in themes:
+            self.offline(theme)
+            for edition in editions:
+                for with_history in (False, True):
+                    self.get(theme, edition, with_history)
+            self.combined(theme)
+
+    def get(self, theme: CardTheme, edition: str, with_history: bool) -> CardTemplate:
+        """获取模板；返回的底图为共享对象，调用方需先 copy() 再绘制"""
+        key = (theme.key, edition, with_history)
+        template = self._templates.get(key)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    template = self._build(theme, edition, with_history)
+                    self._templates[key] = template
+        return template
+
+    def combined(self, theme: CardTheme, editions: Tuple[str, ...] = ("Java", "BE基岩版")) -> CardTemplate:
+        """
+        获取双版本模板；value_pos 的键为 "版本|标签"
+
+        返回的底图为共享对象，调用方需先 copy() 再绘制
+        """
+        key = (theme.key, "+".join(editions), False)
+        template = self._templates.get(key)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    template = self._build_combined(theme, editions)
+                    self._templates[key] = template
+        return template
+
+    def offline(self, theme: CardTheme) -> Image.Image:
+        """批量查询中离线条目的底图（只缺地址文字）"""
+        image = self._offline.get(theme.key)
+        if image is None:
+            with self._lock:
+                image = self._offline.get(theme.key)
+                if image is None:
+                    image = Image.new("RGBA", (self.layout.width, 64), theme.background)
+                    draw = ImageDraw.Draw(image)
+                    draw.rounded_rectangle([20, 20, 32, 32], radius=6, fill=theme.offline)
+                    self._offline[theme.key] = image
+        return image
+
+    def _build(self, theme: CardTheme, edition: str, with_history: bool) -> CardTemplate:
+        lo = self.layout
+        height = lo.height + (lo.history_height if with_history else 0)
+        image = Image.new("RGBA", (lo.width, height), theme.background)
+        draw = ImageDraw.Draw(image)
+        x_text, y = lo.x_text, lo.padding
+
+        # 版本徽标
+        badge_y = y + 34
+        badge_h = self._draw_badge(draw, x_text, badge_y, edition, theme)
+
+        # 固定标签，数值绘制在标签之后
+        value_pos: Dict[str, Tuple[int, int]] = {}
+        y_info = badge_y + badge_h + 20
+        y_players = y_info + 28
+        rows = [(label, x_text + col, y_info) for label, col in zip(self.LABELS_INFO, lo.columns)]
+        rows.append((self.LABEL_PLAYERS, x_text, y_players))
+        for label, x, row_y in rows:
+            font = self.font_loader(lo.body_size, label)
+            draw.text((x, row_y), label, font=font, fill=theme.fg_secondary)
+            value_pos[label] = (x + int(draw.textlength(label, font=font)) + 8, row_y)
+
+        # MOTD 底板
+        y_motd = y_players + 60
+        self._draw_motd_panel(draw, y_motd, theme)
+        self._draw_brand(draw, theme)
+
+        # 趋势图边框
+        chart_boxes = ()
+        if with_history:
+            gap = 24
+            box_w = (lo.width - lo.padding * 2 - gap) // 2
+            top = lo.height
+            chart_boxes = tuple(
+                (lo.padding + i * (box_w + gap), top + 24,
+                 lo.padding + i * (box_w + gap) + box_w, top + lo.history_height - lo.padding)
+                for i in range(2)
+            )
+            for box in chart_boxes:
+                draw.rectangle(box, outline=theme.chart_outline)
+
+        return CardTemplate(
+            image=image,
+            y_info=y_info,
+            y_players=y_players,
+            y_motd=y_motd,
+            value_pos=value_pos,
+            chart_boxes=chart_boxes,
+        )
+
+    def _build_combined(self, theme: CardTheme, editions: Tuple[str, ...]) -> CardTemplate:
+        lo = self.layout
+        image = Image.new("RGBA", (lo.width, lo.height), theme.background)
+        draw = ImageDraw.Draw(image)
+        x_text, y = lo.x_text, lo.padding
+        column_w = (lo.width - lo.padding - x_text) // len(editions)
+        spans = tuple((x_text + i * column_w, x_text + (i + 1) * column_w - 12) for i in range(len(editions)))
+
+        badge_y = y + 34
+        badge_h = 0
+        value_pos: Dict[str, Tuple[int, int]] = {}
+        for edition, (x0, _) in zip(editions, spans):
+            badge_h = self._draw_badge(draw, x0, badge_y, edition, theme)
+        y_info = badge_y + badge_h + 20
+        for edition, (x0, _) in zip(editions, spans):
+            for label, offset, row in self.COMBINED_ROWS:
+                x, row_y = x0 + offset, y_info + row * 28
+                font = self.font_loader(lo.body_size, label)
+                draw.text((x, row_y), label, font=font, fill=theme.fg_secondary)
+                value_pos[f"{edition}|{label}"] = (x + int(draw.textlength(label, font=font)) + 8, row_y)
+
+        # 在线人数一行，其下留出玩家示例列表的位置（与单版本卡片相同）
+        y_players = y_info + 2 * 28
+        y_motd = y_players + 60
+        self._draw_motd_panel(draw, y_motd, theme)
+        self._draw_brand(draw, theme)
+        return CardTemplate(
+            image=image,
+            y_info=y_info,
+            y_players=y_players,
+            y_motd=y_motd,
+            value_pos=value_pos,
+            column_spans=spans,
+        )
+
+    def _draw_badge(self, draw: ImageDraw.ImageDraw, x: int, y: int, edition: str, theme: CardTheme) -> int:
+        """绘制版本徽标，返回文字高度"""
+        font_badge = self.font_loader(self.layout.small_size, edition)
+        badge_w, badge_h = draw.textbbox((0, 0), edition, font=font_badge)[2:]
+        draw.rounded_rectangle([x, y, x + badge_w + 12, y + badge_h + 8], radius=6, fill=theme.accent_for(edition))
+        draw.text((x + 6, y + 4), edition, font=font_badge, fill=theme.badge_text)
+        return badge_h
+
+    def _draw_motd_panel(self, draw: ImageDraw.ImageDraw, y_motd: int, theme: CardTheme) -> None:
+        if theme.motd_panel is None:
+            return
+        lo = self.layout
+        draw.rounded_rectangle(
+            [lo.x_text - 8, y_motd - 6, lo.width - lo.padding + 8, lo.height - lo.padding + 4],
+            radius=8, fill=theme.motd_panel,
+        )
+
+    def _draw_brand(self, draw: ImageDraw.ImageDraw, theme: CardTheme) -> None:
+        """品牌文字（右上角）"""
+        if not theme.brand:
+            return
+        lo = self.layout
+        font_brand = self.font_loader(lo.small_size, theme.brand)
+        brand_w = int(draw.textlength(theme.brand, font=font_brand))
+        draw.text((lo.width - lo.padding - brand_w, lo.padding), theme.brand, font=font_brand, fill=theme.fg_secondary)
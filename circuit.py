@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+
+@dataclass
+class CircuitState:
+    failures: int = 0
+    open_until: float = 0.0
+    last_checked: float = 0.0
+
+
+class CircuitBreaker:
+    """
+    按 (host, port, edition) 的熔断器
+
+    每次探测失败后熔断一段时间，时长按连续失败次数指数增长（上限 max_backoff）。
+    熔断期间直接判定为离线而不再发起探测；到期后放行一次探测（半开），
+    成功则恢复，失败则继续延长熔断时间。
+    """
+
+    def __init__(self, base_backoff: float = 10.0, max_backoff: float = 600.0, max_keys: int = 4096):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_keys = max_keys
+        self._states: "OrderedDict[Hashable, CircuitState]" = OrderedDict()
+        self.short_circuited = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def is_open(self, key: Hashable) -> bool:
+        state = self._states.get(key)
+        return state is not None and time.time() < state.open_until
+
+    def allow(self, key: Hashable) -> bool:
+        """是否允许发起探测；熔断中返回 False"""
+        if self.is_open(key):
+            self.short_circuited += 1
+            return False
+        return True
+
+    def last_checked(self, key: Hashable) -> Optional[float]:
+        """最近一次失败探测的时间戳，没有失败记录时为 None"""
+        state = self._states.get(key)
+        return state.last_checked if state is not None else None
+
+    def record_success(self, key: Hashable) -> None:
+        self._states.pop(key, None)
+
+    def record_failure(self, key: Hashable) -> float:
+        """
+        记录一次失败
+
+        Returns:
+            本次熔断时长（秒）
+        """
+        state = self._states.get(key)
+        if state is None:
+            state = CircuitState()
+            self._states[key] = state
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        state.failures += 1
+        backoff = min(self.base_backoff * (2 ** min(state.failures - 1, 16)), self.max_backoff)
+        now = time.time()
+        state.last_checked = now
+        state.open_until = now + backoff
+        return backoff
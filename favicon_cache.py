@@ -0,0 +1,151 @@
+import base64
+import binascii
+import hashlib
+import threading
+import zlib
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from astrbot.api import logger
+
+from .cache import LRUCache
+
+
+class FaviconCache:
+    """
+    服务器图标解码缓存
+
+    以 data URI 的哈希为键缓存解码并缩放后的 RGBA 图标，按像素字节数限制内存。
+    解码前先校验编码长度、图片格式与尺寸，过大或格式不符的图标直接拒绝，
+    拒绝结果同样缓存，重复出现时不会再次解析。
+    在渲染线程中使用，访问缓存时加锁。
+    """
+
+    ALLOWED_FORMATS = ("PNG",)
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, size: int = 96,
+                 max_encoded_bytes: int = 256 * 1024, max_dimension: int = 512):
+        self.size = size
+        self.max_encoded_bytes = max_encoded_bytes
+        self.max_dimension = max_dimension
+        # 值为缩放后的图标，或 False 表示该图标无效
+        self._cache = LRUCache(
+            maxsize=4096,
+            max_weight=max_bytes,
+            weigher=lambda icon: icon.width * icon.height * 4 if icon else 64,
+        )
+        self._lock = threading.Lock()
+        # 启动快照中恢复、尚未解压的图标：哈希 -> 压缩的 RGBA 像素（空字节表示无效图标）
+        self._restored: Dict[str, bytes] = {}
+        self.rejected = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._cache.hit_ratio
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, data_uri: str) -> Optional[Image.Image]:
+        """
+        获取解码后的图标
+
+        Args:
+            data_uri: favicon 的 data URI（或裸 base64 字符串）
+
+        Returns:
+            缩放到 size x size 的 RGBA 图标，无效时为 None。返回的图片为共享对象，调用方不得修改
+        """
+        key = hashlib.sha1(data_uri.encode("utf-8", "replace")).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            restored = self._restored.pop(key, None) if cached is None else None
+        if cached is not None:
+            return cached or None
+        if restored is not None:
+            icon = self._from_snapshot(restored)
+            if icon is not None:
+                with self._lock:
+                    self._cache.set(key, icon)
+                return icon or None
+
+        icon = self._decode(data_uri)
+        with self._lock:
+            self._cache.set(key, icon if icon is not None else False)
+        return icon
+
+    def snapshot(self) -> List[Tuple[str, bytes]]:
+        """
+        导出缓存的图标（可在线程中调用）
+
+        Returns:
+            [(data URI 哈希, zlib 压缩的 RGBA 像素；无效图标为空字节)]
+        """
+        with self._lock:
+            items = [(key, value) for key, value, _, _ in self._cache.items()]
+            pending = list(self._restored.items())
+        entries = [(key, zlib.compress(icon.tobytes(), 1) if icon else b"") for key, icon in items]
+        # 尚未用到的恢复条目原样保留
+        known = {key for key, _ in entries}
+        entries.extend((key, data) for key, data in pending if key not in known)
+        return entries
+
+    def restore(self, entries: List[Tuple[str, bytes]]) -> int:
+        """
+        登记 snapshot() 导出的图标，首次用到时才解压
+
+        Returns:
+            登记的条目数
+        """
+        with self._lock:
+            for key, data in entries:
+                self._restored[key] = data
+            # 未用到的恢复条目同样受条目数上限约束
+            while len(self._restored) > self._cache.maxsize:
+                self._restored.pop(next(iter(self._restored)))
+        return len(entries)
+
+    def _from_snapshot(self, data: bytes):
+        """
+        解压恢复的图标
+
+        Returns:
+            图标；False 表示快照中记录为无效图标；None 表示快照数据损坏（重新解码原图）
+        """
+        if not data:
+            return False
+        try:
+            pixels = zlib.decompress(data)
+        except zlib.error:
+            return None
+        if len(pixels) != self.size * self.size * 4:
+            return None
+        return Image.frombytes("RGBA", (self.size, self.size), pixels)
+
+    def _decode(self, data_uri: str) -> Optional[Image.Image]:
+        b64 = data_uri.split(",", 1)[1] if data_uri.startswith("data:") else data_uri
+        # base64 每 4 个字符对应 3 个字节，解码前先按长度拒绝过大的图标
+        if len(b64) * 3 // 4 > self.max_encoded_bytes:
+            return self._reject(f"图标数据过大 ({len(b64) * 3 // 4} 字节)")
+        try:
+            raw = base64.b64decode(b64)
+        except (binascii.Error, ValueError) as e:
+            return self._reject(f"图标 base64 无效: {e}")
+        try:
+            # Image.open 只读取文件头，像素在 convert 时才解压
+            with Image.open(BytesIO(raw)) as icon:
+                if icon.format not in self.ALLOWED_FORMATS:
+                    return self._reject(f"不支持的图标格式: {icon.format}")
+                width, height = icon.size
+                if width > self.max_dimension or height > self.max_dimension:
+                    return self._reject(f"图标尺寸过大: {width}x{height}")
+                return icon.convert("RGBA").resize((self.size, self.size))
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            return self._reject(f"图标解码失败: {e}")
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        logger.info(f"加载服务器 favicon 失败: {reason}")
+        return None
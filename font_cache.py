@@ -0,0 +1,120 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import ImageFont
+
+from astrbot.api import logger
+
+
+# 常见系统中的 CJK 字体位置，按优先级排列
+CJK_FONT_CANDIDATES: List[str] = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "C:\\Windows\\Fonts\\msyh.ttc",
+    "C:\\Windows\\Fonts\\simhei.ttf",
+]
+
+
+def has_cjk(text: str) -> bool:
+    """判断文本是否包含 CJK 等需要回退字体的字符"""
+    return any(ord(ch) >= 0x2E80 for ch in text)
+
+
+class FontCache:
+    """
+    字体缓存
+
+    每个 (字体路径, 字号) 只解析一次 TTF，渲染时不再产生文件 I/O。
+    主字体缺少 CJK 字形时，包含中日韩字符的文本会使用启动时确定的回退字体。
+    """
+
+    def __init__(self, primary_path: str, cjk_candidates: Optional[List[str]] = None):
+        self.primary_path = primary_path
+        self.cjk_candidates = CJK_FONT_CANDIDATES if cjk_candidates is None else cjk_candidates
+        self._fonts: Dict[Tuple[Optional[str], int], ImageFont.ImageFont] = {}
+        self._lock = threading.Lock()
+        self._resolved = False
+        self._primary: Optional[str] = None
+        self._cjk: Optional[str] = None
+        self._primary_has_cjk = False
+
+    def preload(self, sizes: Iterable[int]) -> None:
+        """
+        解析字体路径并预加载指定字号（同步，需在线程中调用）
+
+        Args:
+            sizes: 需要预加载的字号
+        """
+        self._resolve()
+        for size in sizes:
+            self.get(size)
+            if self._cjk and not self._primary_has_cjk:
+                self._get_path(self._cjk, size)
+
+    def get(self, size: int) -> ImageFont.ImageFont:
+        """获取主字体"""
+        if not self._resolved:
+            self._resolve()
+        return self._get_path(self._primary, size)
+
+    def get_for_text(self, text: str, size: int) -> ImageFont.ImageFont:
+        """根据文本内容选择主字体或 CJK 回退字体"""
+        if not self._resolved:
+            self._resolve()
+        if self._cjk and not self._primary_has_cjk and has_cjk(text):
+            return self._get_path(self._cjk, size)
+        return self._get_path(self._primary, size)
+
+    def _resolve(self) -> None:
+        with self._lock:
+            if self._resolved:
+                return
+            if os.path.exists(self.primary_path):
+                self._primary = self.primary_path
+            else:
+                logger.info("未找到 Minecraft 字体，使用默认字体")
+            self._cjk = next((p for p in self.cjk_candidates if os.path.exists(p)), None)
+            if self._primary:
+                self._primary_has_cjk = self._covers_cjk(self._primary)
+            if self._cjk and not self._primary_has_cjk:
+                logger.info(f"CJK 回退字体: {os.path.basename(self._cjk)}")
+            self._resolved = True
+
+    def _get_path(self, path: Optional[str], size: int) -> ImageFont.ImageFont:
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            return font
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is None:
+                font = self._open(path, size)
+                self._fonts[key] = font
+        return font
+
+    @staticmethod
+    def _open(path: Optional[str], size: int) -> ImageFont.ImageFont:
+        if path:
+            try:
+                return ImageFont.truetype(path, size)
+            except Exception as e:
+                logger.info(f"加载字体失败 {os.path.basename(path)}: {e}")
+        return ImageFont.load_default(size)
+
+    @staticmethod
+    def _covers_cjk(path: str) -> bool:
+        """比较 CJK 字符与缺字字形的位图，判断字体是否包含 CJK 字形"""
+        try:
+            font = ImageFont.truetype(path, 20)
+            cjk_mask = font.getmask("中")
+            missing_mask = font.getmask("\uffff")
+            return cjk_mask.size != missing_mask.size or bytes(cjk_mask) != bytes(missing_mask)
+        except Exception:
+            return False
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from astrbot.api import logger
+
+
+HistoryKey = Tuple[str, int, str]
+
+
+class RingBuffer:
+    """
+    定长样本环形缓冲区
+
+    时间戳、延迟与在线人数分别存放在预分配的 numpy 数组中，内存占用固定；
+    聚合与降采样全部使用向量化运算。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(2, int(capacity))
+        self.ts = np.zeros(self.capacity, dtype=np.float64)
+        self.latency = np.full(self.capacity, np.nan, dtype=np.float32)
+        self.players = np.zeros(self.capacity, dtype=np.int32)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, ts: float, latency_ms: float, players: int) -> None:
+        i = self._next
+        self.ts[i] = ts
+        self.latency[i] = latency_ms
+        self.players[i] = players
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按时间顺序返回 (时间戳, 延迟, 人数) 的副本"""
+        if self._size < self.capacity:
+            sl = slice(0, self._size)
+            return self.ts[sl].copy(), self.latency[sl].copy(), self.players[sl].copy()
+        order = np.r_[self._next:self.capacity, 0:self._next]
+        return self.ts[order], self.latency[order], self.players[order]
+
+    def aggregate(self, window_sec: Optional[float] = None, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        统计时间窗口内的 min/avg/max
+
+        Args:
+            window_sec: 窗口长度（秒），None 表示全部样本
+            now: 当前时间戳
+
+        Returns:
+            包含 latency_min/avg/max 与 players_min/avg/max 的字典，没有样本时为空
+        """
+        ts, latency, players = self.view()
+        if window_sec is not None:
+            now = time.time() if now is None else now
+            mask = ts >= now - window_sec
+            latency, players = latency[mask], players[mask]
+        if players.size == 0:
+            return {}
+        result = {
+            "players_min": float(players.min()),
+            "players_avg": float(players.mean()),
+            "players_max": float(players.max()),
+        }
+        if np.isfinite(latency).any():
+            result.update(
+                latency_min=float(np.nanmin(latency)),
+                latency_avg=float(np.nanmean(latency)),
+                latency_max=float(np.nanmax(latency)),
+            )
+        return result
+
+    def downsample(self, points: int) -> Tuple[List[float], List[float]]:
+        """
+        将样本平均降采样为最多 points 个点
+
+        Returns:
+            (延迟序列, 人数序列)，缺失的延迟为 NaN
+        """
+        _, latency, players = self.view()
+        n = latency.size
+        if n <= points:
+            return latency.astype(float).tolist(), players.astype(float).tolist()
+        starts = np.linspace(0, n, points + 1).astype(np.int64)[:-1]
+        counts = np.diff(np.append(starts, n))
+        valid = np.isfinite(latency)
+        lat_sum = np.add.reduceat(np.where(valid, latency, 0.0), starts)
+        lat_cnt = np.add.reduceat(valid.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lat_avg = np.where(lat_cnt > 0, lat_sum / lat_cnt, np.nan)
+        ply_avg = np.add.reduceat(players.astype(np.float64), starts) / counts
+        return lat_avg.tolist(), ply_avg.tolist()
+
+
+class HistoryStore:
+    """
+    服务器延迟与在线人数历史
+
+    每个 (host, port, edition) 一个环形缓冲区，服务器数量按 LRU 限制。
+    启用持久化时样本批量写入本地 SQLite，启动时恢复最近的样本。
+    """
+
+    def __init__(self, capacity: int = 288, max_servers: int = 512, db_path: Optional[str] = None):
+        self.capacity = capacity
+        self.max_servers = max_servers
+        self.db_path = db_path
+        self._buffers: "OrderedDict[HistoryKey, RingBuffer]" = OrderedDict()
+        self._pending: List[Tuple[str, int, str, float, float, int]] = []
+        self._db_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, key: HistoryKey, latency_ms: float, players: int, ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        self._buffer(key).append(ts, latency_ms, players)
+        if self.db_path:
+            self._pending.append((key[0], key[1], key[2], ts, float(latency_ms), int(players)))
+
+    def get(self, key: HistoryKey) -> Optional[RingBuffer]:
+        return self._buffers.get(key)
+
+    def load(self) -> None:
+        """从 SQLite 恢复最近的样本（同步，需在线程中调用）"""
+        if not self.db_path or not os.path.isfile(self.db_path):
+            return
+        try:
+            with self._db_lock, sqlite3.connect(self.db_path) as conn:
+                self._ensure_schema(conn)
+                since = time.time() - 7 * 24 * 3600
+                rows = conn.execute(
+                    "SELECT host, port, edition, ts, latency_ms, players FROM samples "
+                    "WHERE ts >= ? ORDER BY ts",
+                    (since,),
+                ).fetchall()
+            for host, port, edition, ts, latency_ms, players in rows:
+                self._buffer((host, port, edition)).append(ts, latency_ms, players)
+            logger.info(f"已恢复历史样本 {len(rows)} 条")
+        except sqlite3.Error as e:
+            logger.warning(f"读取历史数据失败: {e}")
+
+    def start(self, flush_interval: float = 60.0) -> None:
+        if self.db_path and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_loop(flush_interval))
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, rows)
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"写入历史数据失败: {e}")
+
+    def _write(self, rows: List[Tuple[str, int, str, float, float, int]]) -> None:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._db_lock, sqlite3.connect(self.db_path) as conn:
+            self._ensure_schema(conn)
+            conn.executemany(
+                "INSERT INTO samples (host, port, edition, ts, latency_ms, players) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # 只保留最近 7 天的样本
+            conn.execute("DELETE FROM samples WHERE ts < ?", (time.time() - 7 * 24 * 3600,))
+
+    @staticmethod
+    def _ensure_schema(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "host TEXT NOT NULL, port INTEGER NOT NULL, edition TEXT NOT NULL, "
+            "ts REAL NOT NULL, latency_ms REAL, players INTEGER)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples (ts)")
+
+    def _buffer(self, key: HistoryKey) -> RingBuffer:
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = RingBuffer(self.capacity)
+            self._buffers[key] = buf
+            while len(self._buffers) > self.max_servers:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(key)
+        return buf
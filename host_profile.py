@@ -0,0 +1,148 @@
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class HostProfile:
+    """
+    单个地址的探测画像
+
+    记录每个版本成功/失败的次数、最近一次应答的端口和 RTT 的指数滑动平均。
+    """
+    java_ok: int = 0
+    java_fail: int = 0
+    bedrock_ok: int = 0
+    bedrock_fail: int = 0
+    java_port: Optional[int] = None
+    bedrock_port: Optional[int] = None
+    rtt_ms: Optional[float] = None
+    java_checked_at: float = 0.0
+    bedrock_checked_at: float = 0.0
+
+
+class HostProfiles:
+    """
+    按地址学习的版本预测
+
+    某地址多次只由一个版本应答时，先探测该版本，另一版本作为对冲探测在
+    根据 RTT 推算的延迟之后才发出；预测版本在此之前成功则不再发出对冲探测。
+    没有足够历史，或另一版本已超过 recheck_sec 未被实际探测时返回 None，
+    两个版本同时探测，以便发现服务器后来新增的版本。
+    """
+
+    def __init__(self, max_hosts: int = 2048, min_samples: int = 3, confidence: float = 0.9,
+                 rtt_alpha: float = 0.3, hedge_factor: float = 3.0,
+                 min_hedge_sec: float = 0.15, max_hedge_sec: float = 1.5,
+                 recheck_sec: float = 3600.0):
+        self.max_hosts = max_hosts
+        self.min_samples = min_samples
+        self.confidence = confidence
+        self.rtt_alpha = rtt_alpha
+        self.hedge_factor = hedge_factor
+        self.min_hedge_sec = min_hedge_sec
+        self.max_hedge_sec = max_hedge_sec
+        self.recheck_sec = recheck_sec
+        self._profiles: "OrderedDict[Hashable, HostProfile]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def get(self, key: Hashable) -> Optional[HostProfile]:
+        return self._profiles.get(key)
+
+    def observe(self, key: Hashable, edition: str, ok: bool,
+                rtt_ms: Optional[float] = None, port: Optional[int] = None) -> None:
+        """
+        记录一次实际探测的结果
+
+        Args:
+            key: 地址键（host, 用户指定的端口）
+            edition: "java" 或 "bedrock"
+            ok: 是否成功
+            rtt_ms: 成功时的延迟
+            port: 成功应答的端口
+        """
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = HostProfile()
+            self._profiles[key] = profile
+            while len(self._profiles) > self.max_hosts:
+                self._profiles.popitem(last=False)
+        else:
+            self._profiles.move_to_end(key)
+
+        suffix = "ok" if ok else "fail"
+        setattr(profile, f"{edition}_{suffix}", getattr(profile, f"{edition}_{suffix}") + 1)
+        if ok:
+            setattr(profile, f"{edition}_port", port)
+            if rtt_ms is not None:
+                if profile.rtt_ms is None:
+                    profile.rtt_ms = float(rtt_ms)
+                else:
+                    profile.rtt_ms += self.rtt_alpha * (float(rtt_ms) - profile.rtt_ms)
+        setattr(profile, f"{edition}_checked_at", time.time())
+
+    def predict(self, key: Hashable) -> Optional[str]:
+        """
+        预测该地址只会由哪个版本应答
+
+        Returns:
+            "java"、"bedrock"，或 None（没有足够把握，两个版本都探测）
+        """
+        profile = self._profiles.get(key)
+        if profile is None:
+            return None
+        for edition, other in (("java", "bedrock"), ("bedrock", "java")):
+            ok = getattr(profile, f"{edition}_ok")
+            other_ok = getattr(profile, f"{other}_ok")
+            other_total = other_ok + getattr(profile, f"{other}_fail")
+            if ok >= self.min_samples and other_total >= self.min_samples \
+                    and other_ok / other_total <= 1 - self.confidence:
+                if time.time() - getattr(profile, f"{other}_checked_at") > self.recheck_sec:
+                    return None
+                return edition
+        return None
+
+    def snapshot(self) -> List[Tuple[Hashable, Dict[str, Any], float]]:
+        """导出全部画像：[(地址键, 画像字段, 最近探测时间)]，按最近使用从旧到新排列"""
+        return [
+            (key, asdict(profile), max(profile.java_checked_at, profile.bedrock_checked_at))
+            for key, profile in self._profiles.items()
+        ]
+
+    def restore(self, entries: List[Tuple[Hashable, Dict[str, Any]]]) -> int:
+        """
+        恢复 snapshot() 导出的画像；字段不符的条目与已有画像的地址被跳过
+
+        Returns:
+            恢复的条目数
+        """
+        names = {f.name for f in fields(HostProfile)}
+        restored = 0
+        for key, data in entries:
+            if key in self._profiles or not isinstance(data, dict) or set(data) - names:
+                continue
+            try:
+                profile = HostProfile(**data)
+                counts = (profile.java_ok, profile.java_fail, profile.bedrock_ok, profile.bedrock_fail)
+                if any(not isinstance(n, int) or n < 0 for n in counts):
+                    continue
+            except TypeError:
+                continue
+            self._profiles[key] = profile
+            # 恢复的画像排在最旧的位置，不挤掉本次运行新学到的画像
+            self._profiles.move_to_end(key, last=False)
+            restored += 1
+        while len(self._profiles) > self.max_hosts:
+            self._profiles.popitem(last=False)
+        return restored
+
+    def hedge_delay(self, key: Hashable) -> float:
+        """对冲探测的等待时间（秒），由观测到的 RTT 推算"""
+        profile = self._profiles.get(key)
+        if profile is None or profile.rtt_ms is None:
+            return self.max_hedge_sec
+        delay = profile.rtt_ms * self.hedge_factor / 1000.0
+        return min(max(delay, self.min_hedge_sec), self.max_hedge_sec)
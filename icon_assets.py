@@ -0,0 +1,144 @@
+import asyncio
+import os
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from astrbot.api import logger
+
+
+DEFAULT_LOGO_URL = "https://patchwiki.biligame.com/images/mc/5/53/smk9nesqj6bkd5qyd718xxhocic6et0.png"
+DEFAULT_ICON_NAME = "default_icon.png"
+ICON_SIZE = (96, 96)
+
+
+class IconAssets:
+    """
+    默认图标资源缓存
+
+    图标在 initialize 阶段一次性解码并缩放为 96x96 RGBA，渲染时直接复用。
+    网络刷新只在后台线程中进行，离线时退回到本地文件或内置的像素图标。
+    """
+
+    def __init__(self, search_dirs: List[str], cache_dir: str, url: str = DEFAULT_LOGO_URL):
+        self.search_dirs = search_dirs
+        self.cache_dir = cache_dir
+        self.url = url
+        self._default_icon: Optional[Image.Image] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def default_icon(self) -> Image.Image:
+        """已解码的默认图标（未加载时返回内置图标）"""
+        if self._default_icon is None:
+            self._default_icon = self._builtin_icon()
+        return self._default_icon
+
+    def load(self) -> bool:
+        """
+        从本地加载默认图标（同步，需在线程中调用）
+
+        Returns:
+            是否从本地文件加载成功
+        """
+        for path in self._candidate_paths():
+            icon = self._decode_file(path)
+            if icon is not None:
+                self._default_icon = icon
+                logger.info(f"已加载本地默认图标: {os.path.basename(path)}")
+                return True
+        self._default_icon = self._builtin_icon()
+        logger.info("未找到本地默认图标，使用内置图标")
+        return False
+
+    def schedule_refresh(self) -> None:
+        """在后台刷新默认图标，不阻塞事件循环"""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> bool:
+        """
+        从网络下载默认图标并写入本地缓存
+
+        Returns:
+            是否刷新成功
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            icon = await loop.run_in_executor(None, self._download)
+        except Exception as e:
+            logger.info(f"刷新默认图标失败: {e}")
+            return False
+        if icon is None:
+            return False
+        self._default_icon = icon
+        logger.info("默认图标已刷新")
+        return True
+
+    async def close(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+    def _candidate_paths(self) -> List[str]:
+        dirs = [self.cache_dir] + list(self.search_dirs)
+        return [os.path.join(d, DEFAULT_ICON_NAME) for d in dirs if d]
+
+    def _download(self) -> Optional[Image.Image]:
+        import requests
+
+        response = requests.get(self.url, timeout=10)
+        if response.status_code != 200:
+            logger.info(f"下载默认图标失败: HTTP {response.status_code}")
+            return None
+        icon = self._decode_bytes(response.content)
+        if icon is None:
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, DEFAULT_ICON_NAME)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(response.content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.info(f"保存默认图标失败: {e}")
+        return icon
+
+    def _decode_file(self, path: str) -> Optional[Image.Image]:
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return self._decode_bytes(f.read())
+        except OSError as e:
+            logger.info(f"读取默认图标失败 {os.path.basename(path)}: {e}")
+            return None
+
+    @staticmethod
+    def _decode_bytes(data: bytes) -> Optional[Image.Image]:
+        try:
+            icon = Image.open(BytesIO(data)).convert("RGBA")
+            return icon.resize(ICON_SIZE)
+        except Exception as e:
+            logger.info(f"解码默认图标失败: {e}")
+            return None
+
+    @staticmethod
+    def _builtin_icon() -> Image.Image:
+        """绘制一个草方块像素图标，保证离线时也有可用的默认图标"""
+        grass: Tuple[int, int, int, int] = (94, 157, 52, 255)
+        grass_dark: Tuple[int, int, int, int] = (72, 128, 40, 255)
+        dirt: Tuple[int, int, int, int] = (134, 96, 67, 255)
+        dirt_dark: Tuple[int, int, int, int] = (106, 74, 50, 255)
+
+        pixels = Image.new("RGBA", (16, 16), dirt)
+        draw = ImageDraw.Draw(pixels)
+        draw.rectangle([0, 0, 15, 3], fill=grass)
+        # 草皮边缘向下的锯齿
+        for px, depth in ((0, 5), (2, 4), (5, 6), (7, 4), (9, 5), (12, 6), (14, 4)):
+            draw.rectangle([px, 4, px + 1, depth], fill=grass_dark)
+        for px, py in ((3, 9), (10, 8), (6, 12), (13, 12), (1, 14), (8, 15)):
+            draw.point((px, py), fill=dirt_dark)
+        return pixels.resize(ICON_SIZE, Image.NEAREST)
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, features
+
+
+# 可选的输出格式；png8 为调色板量化后的 PNG，扁平配色的卡片体积最小
+FORMATS = ("png", "png8", "webp", "jpeg")
+
+# 各格式对应的容器格式（平台能力按容器格式声明）与文件后缀
+CONTAINERS = {"png": "png", "png8": "png", "webp": "webp", "jpeg": "jpeg"}
+SUFFIXES = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+
+# auto 时按顺序选择平台支持的第一个格式
+AUTO_ORDER = ("png8", "webp", "jpeg", "png")
+
+# 未单独声明的平台只假定支持 PNG 与 JPEG
+DEFAULT_PLATFORM_FORMATS: Tuple[str, ...] = ("png", "jpeg")
+PLATFORM_FORMATS: Dict[str, Tuple[str, ...]] = {
+    "telegram": ("png", "jpeg", "webp"),
+    "discord": ("png", "jpeg", "webp"),
+    "slack": ("png", "jpeg", "webp"),
+}
+
+
+@dataclass(frozen=True)
+class EncoderPreset:
+    """速度/体积档位对应的编码参数"""
+    png_compress_level: int
+    png_optimize: bool
+    palette_colors: int
+    webp_quality: int
+    webp_method: int
+    jpeg_quality: int
+    jpeg_optimize: bool
+
+
+PRESETS: Dict[str, EncoderPreset] = {
+    "speed": EncoderPreset(1, False, 256, 80, 0, 80, False),
+    "balanced": EncoderPreset(6, False, 256, 80, 4, 85, False),
+    "size": EncoderPreset(9, True, 128, 75, 6, 80, True),
+}
+
+
+@dataclass
+class EncodedImage:
+    data: bytes
+    # 实际使用的格式（超出字节预算时可能与请求的格式不同）
+    format: str
+    attempts: int = 1
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[CONTAINERS[self.format]]
+
+
+def sniff_suffix(data: bytes) -> str:
+    """根据文件头判断图片字节对应的文件后缀"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    if data[:3] == b"\xff\xd8\xff":
+        return ".jpg"
+    return ".png"
+
+
+class ImageEncoder:
+    """
+    卡片图片编码器
+
+    根据配置的格式与档位编码卡片，并按消息平台的能力选择实际格式。
+    设置了字节预算时，输出超出预算会依次降低调色板颜色数或有损质量，
+    最后退回 JPEG（各平台均支持）；都无法满足时返回其中最小的结果。
+    在渲染线程中调用，本身无共享状态。
+    """
+
+    def __init__(self, image_format: str = "auto", preset: str = "balanced", max_bytes: int = 0,
+                 platform_formats: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.image_format = image_format if image_format in FORMATS else "auto"
+        self.preset = PRESETS.get(preset, PRESETS["balanced"])
+        self.max_bytes = max(0, int(max_bytes))
+        self.platform_formats = dict(PLATFORM_FORMATS)
+        self.platform_formats.update(platform_formats or {})
+        self.webp_available = features.check("webp")
+
+    @staticmethod
+    def parse_platform_formats(items: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        解析 "平台名=格式1,格式2" 形式的平台能力配置
+
+        Returns:
+            平台名 -> 支持的容器格式；无法识别的条目被忽略
+        """
+        result: Dict[str, Tuple[str, ...]] = {}
+        for item in items or []:
+            name, sep, value = str(item).partition("=")
+            formats = tuple(
+                CONTAINERS[f] for f in (v.strip().lower() for v in value.split(",")) if f in CONTAINERS
+            )
+            if sep and name.strip() and formats:
+                result[name.strip()] = formats
+        return result
+
+    def supported(self, platform: Optional[str]) -> Tuple[str, ...]:
+        """平台支持的容器格式"""
+        formats = self.platform_formats.get(platform or "", DEFAULT_PLATFORM_FORMATS)
+        if not self.webp_available:
+            formats = tuple(f for f in formats if f != "webp")
+        return formats
+
+    def choose(self, platform: Optional[str]) -> str:
+        """
+        为消息平台选择输出格式
+
+        配置的格式不被平台支持时按 auto 的顺序选择。
+        """
+        supported = self.supported(platform)
+        if self.image_format != "auto" and CONTAINERS[self.image_format] in supported:
+            return self.image_format
+        for fmt in AUTO_ORDER:
+            if CONTAINERS[fmt] in supported:
+                return fmt
+        return "png"
+
+    def encode(self, image: Image.Image, image_format: str = "png8") -> EncodedImage:
+        """
+        编码图片
+
+        Args:
+            image: 卡片图片（不透明背景）
+            image_format: choose() 返回的格式
+
+        Returns:
+            编码结果；未设置预算时只编码一次
+        """
+        attempts = self._attempts(image_format)
+        best: Optional[EncodedImage] = None
+        for count, (fmt, param) in enumerate(attempts, 1):
+            data = self._encode_once(image, fmt, param)
+            if best is None or len(data) < len(best.data):
+                best = EncodedImage(data, fmt)
+            if not self.max_bytes or len(data) <= self.max_bytes:
+                return EncodedImage(data, fmt, count)
+        best.attempts = len(attempts)
+        return best
+
+    def _attempts(self, image_format: str) -> List[Tuple[str, int]]:
+        """按顺序尝试的 (格式, 参数)；参数为调色板颜色数或有损质量"""
+        p = self.preset
+        if image_format == "png":
+            first = [("png", 0)]
+        elif image_format == "png8":
+            first = [("png8", p.palette_colors)]
+        elif image_format == "webp":
+            first = [("webp", p.webp_quality)]
+        else:
+            first = [("jpeg", p.jpeg_quality)]
+        if not self.max_bytes:
+            return first
+        if image_format in ("png", "png8"):
+            steps = [("png8", 64), ("jpeg", p.jpeg_quality)]
+        elif image_format == "webp":
+            steps = [("webp", 60), ("webp", 40)]
+        else:
+            steps = []
+        steps += [("jpeg", 60), ("jpeg", 40)]
+        result = first
+        for step in steps:
+            if step not in result:
+                result.append(step)
+        return result
+
+    def _encode_once(self, image: Image.Image, fmt: str, param: int) -> bytes:
+        p = self.preset
+        buf = BytesIO()
+        if fmt != "png" and image.mode != "RGB":
+            # 卡片背景不透明，去掉 alpha 通道可减少量化与有损编码的工作量；JPEG 也不接受 RGBA。
+            # 超出预算时会从 PNG 退回其他格式，因此按每次尝试的格式转换
+            image = image.convert("RGB")
+        if fmt == "png":
+            image.save(buf, format="PNG", compress_level=p.png_compress_level, optimize=p.png_optimize)
+        elif fmt == "png8":
+            palette = image.quantize(param, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+            palette.save(buf, format="PNG", compress_level=p.png_compress_level, optimize=p.png_optimize)
+        elif fmt == "webp":
+            image.save(buf, format="WEBP", quality=param, method=p.webp_method)
+        else:
+            image.save(buf, format="JPEG", quality=param, optimize=p.jpeg_optimize)
+        return buf.getvalue()
@@ -1,13 +1,14 @@
-from astrbot.api.event import filter, AstrMessageEvent
-from astrbot.api.star import Context, Star, register
+from astrbot.api.event import filter, AstrMessageEvent, MessageChain
+from astrbot.api.star import Context, Star, StarTools, register
 import astrbot.api.message_components as Comp
-from astrbot.api import logger
+from astrbot.api import AstrBotConfig, logger
 
 import asyncio
 import re
-import base64
-from io import BytesIO
-from typing import Optional, List, Tuple
+import time
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Set, Tuple
 import os
 import tempfile
 
@@ -15,8 +16,53 @@ import validators
 from mcstatus import JavaServer, BedrockServer
 from PIL import Image, ImageDraw, ImageFont
 
+from .admission import AdmissionController
+from .bedrock_ping import BedrockPinger
+from .cache import LRUCache, SingleFlight
+from .card_templates import THEMES, CardLayout, CardTemplate, CardTemplates, CardTheme
+from .circuit import CircuitBreaker
+from .favicon_cache import FaviconCache
+from .font_cache import FontCache
+from .history import HistoryStore
+from .host_profile import HostProfiles
+from .icon_assets import IconAssets
+from .image_encoder import ImageEncoder, sniff_suffix
+from .metrics import Metrics
+from .render_pool import BoundedExecutor, RenderPool, RenderQueueFull
+from .resolver import AsyncResolver, NXDomainError, ResolveError, ResolvedAddress
+from .spool import ImageSpool
+from .styled_text import StyledTextRenderer, parse_motd, runs_to_plain
+from .text_layout import GlyphWidthCache, wrap_text
+from .warm_state import WarmStateStore, dumps, loads
+from .watchlist import WatchScheduler
 
-@register("astrbot_minecraft_motd", "ChuranNeko", "Minecraft 服务器 MOTD 状态图", "1.3.0")
+PLUGIN_NAME = "astrbot_minecraft_motd"
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FONT_SIZE_TITLE = 28
+FONT_SIZE_BODY = 20
+FONT_SIZE_SMALL = 16
+
+# 出现在状态卡片上的字段，渲染缓存以它们的哈希为键
+CARD_FIELDS = (
+    "edition", "host", "port", "latency_ms", "protocol", "version_name",
+    "players_online", "players_max", "player_names", "motd", "motd_raw", "history",
+)
+
+# _probe_cached 未实际发起探测（熔断中）时的返回值：按离线处理，但不计入主机画像
+NOT_PROBED = object()
+
+# 趋势图区域高度与降采样点数
+HISTORY_STRIP_HEIGHT = 80
+HISTORY_POINTS = 60
+
+CARD_LAYOUT = CardLayout(
+    title_size=FONT_SIZE_TITLE, body_size=FONT_SIZE_BODY, small_size=FONT_SIZE_SMALL,
+    history_height=HISTORY_STRIP_HEIGHT,
+)
+
+
+@register(PLUGIN_NAME, "ChuranNeko", "Minecraft 服务器 MOTD 状态图", "1.3.0")
 class MinecraftMOTDPlugin(Star):
     """
     Minecraft 服务器 MOTD 插件
@@ -25,8 +71,137 @@ class MinecraftMOTDPlugin(Star):
     支持 IPv4、IPv6、域名格式的服务器地址。
     """
     
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, config: Optional[AstrBotConfig] = None):
         super().__init__(context)
+        self.config = config if config is not None else {}
+        self.data_dir = str(StarTools.get_data_dir(PLUGIN_NAME))
+        self.icon_assets = IconAssets(
+            search_dirs=[os.path.join(PLUGIN_DIR, "assets")],
+            cache_dir=self.data_dir,
+        )
+        self.font_cache = FontCache(os.path.join(PLUGIN_DIR, "font", "Minecraft_AE.ttf"))
+        self.glyph_widths = GlyphWidthCache()
+        # MOTD 按 § 代码与 JSON 文本组件的样式绘制，字形蒙版缓存复用
+        self.styled_text = StyledTextRenderer()
+        # 卡片模板：静态部分按主题与版本预先绘制
+        self.card_templates = CardTemplates(self._load_font, CARD_LAYOUT)
+        self.default_theme, self.group_themes = self._load_themes()
+        # 服务器图标解码缓存，按 data URI 哈希复用解码与缩放结果
+        self.favicons = FaviconCache(max_bytes=int(self.config.get("favicon_cache_mb", 4)) * 1024 * 1024)
+        # 渲染结果缓存：卡片内容哈希 -> (图片字节, 文本摘要)，按字节数限制内存
+        self.card_cache = LRUCache(
+            maxsize=1024,
+            max_weight=int(self.config.get("card_cache_mb", 16)) * 1024 * 1024,
+            weigher=lambda value: len(value[0]) + len(value[1]) * 4,
+        )
+        # 卡片编码：格式与档位可配置，按消息平台的能力选择实际格式
+        self.encoder = ImageEncoder(
+            image_format=self.config.get("image_format", "auto"),
+            preset=self.config.get("image_preset", "balanced"),
+            max_bytes=int(self.config.get("image_max_kb", 0)) * 1024,
+            platform_formats=ImageEncoder.parse_platform_formats(self.config.get("platform_image_formats", [])),
+        )
+        self.render_pool = RenderPool(
+            max_workers=self.config.get("render_workers", 2),
+            max_queue=self.config.get("render_queue_size", 8),
+        )
+        # 探测结果缓存，键为 (host, port, edition)
+        # 新鲜期内直接使用；超过新鲜期但未超过最大陈旧时间的结果先回复，同时在后台刷新
+        self.status_fresh_sec = max(0.0, float(self.config.get("status_cache_ttl", 30)))
+        self.status_max_stale_sec = (
+            max(self.status_fresh_sec, float(self.config.get("status_max_stale_sec", 300)))
+            if self.status_fresh_sec > 0 else 0.0
+        )
+        self.status_cache = LRUCache(
+            maxsize=self.config.get("status_cache_size", 256),
+            ttl=self.status_max_stale_sec,
+        )
+        self._probe_flight = SingleFlight()
+        # 进行中的后台刷新，键同 status_cache
+        self._revalidations: Dict[Tuple[str, int, str], asyncio.Future] = {}
+        self._background_tasks: Set[asyncio.Future] = set()
+        # 探测失败按 (host, port, edition) 指数退避熔断
+        self.breaker = CircuitBreaker(
+            base_backoff=self.config.get("breaker_base_sec", 10),
+            max_backoff=self.config.get("breaker_max_sec", 600),
+        )
+        # 所有 Bedrock 探测共用一个 UDP 端点
+        self.bedrock_pinger = BedrockPinger()
+        # 同步探测备选方案使用独立的有界线程池，避免挂起的连接占满默认线程池
+        self.sync_executor = BoundedExecutor(
+            max_workers=self.config.get("sync_fallback_workers", 4), max_queue=0, name="motd_sync_probe"
+        )
+        # 每个地址学习到的版本画像，用于预测优先探测的版本
+        self.host_profiles = HostProfiles()
+        # 每个服务器的延迟/人数历史，用于在卡片上绘制趋势图
+        self.history = HistoryStore(
+            capacity=self.config.get("history_capacity", 288),
+            db_path=os.path.join(self.data_dir, "history.db") if self.config.get("history_persist", False) else None,
+        )
+        # 批量查询时全局同时探测的服务器数
+        self._batch_semaphore = asyncio.Semaphore(max(1, int(self.config.get("batch_concurrency", 8))))
+        # 图片发送方式：bytes 直接以内存数据发送，file 写入受管理的临时目录
+        self.image_transport = self.config.get("image_transport", "bytes")
+        self.spool = ImageSpool(
+            os.path.join(self.data_dir, "spool"),
+            max_bytes=int(self.config.get("spool_quota_mb", 64)) * 1024 * 1024,
+        )
+        self.resolver = AsyncResolver(negative_ttl=self.config.get("dns_negative_ttl", 60))
+        self.watcher = WatchScheduler(
+            probe=self._parallel_probe,
+            notify=self._send_watch_notice,
+            store_path=os.path.join(self.data_dir, "watchlist.json"),
+            interval_sec=self.config.get("watch_interval_sec", 300),
+            jitter=self.config.get("watch_jitter", 0.2),
+            workers=self.config.get("watch_workers", 4),
+        )
+        # 查询的限流与全局并发控制
+        self.admission = AdmissionController(
+            user_per_minute=self.config.get("rate_limit_user_per_min", 6),
+            user_burst=self.config.get("rate_limit_user_burst", 3),
+            chat_per_minute=self.config.get("rate_limit_chat_per_min", 20),
+            chat_burst=self.config.get("rate_limit_chat_burst", 10),
+            max_queries=self.config.get("max_concurrent_queries", 32),
+            max_renders=self.config.get("max_concurrent_renders", 8),
+            text_only_load=self.config.get("text_only_load", 0.75),
+        )
+        # 探测结果、DNS、图标缓存与主机画像的启动快照，重启后在后台恢复
+        self.warm_state = (
+            WarmStateStore(os.path.join(self.data_dir, "warm_state.db"))
+            if self.config.get("warm_state_persist", True) else None
+        )
+        self._warm_restore: Optional[asyncio.Task] = None
+        # 各阶段耗时直方图与缓存命中率等运行指标
+        self.metrics = Metrics()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """注册按需读取的瞬时指标"""
+        gauges = {
+            "probes_in_flight": lambda: len(self._probe_flight),
+            "bedrock_pings_in_flight": lambda: self.bedrock_pinger.in_flight,
+            "render_pending": lambda: self.render_pool.pending,
+            "render_rejected": lambda: self.render_pool.rejected,
+            "sync_probe_pending": lambda: self.sync_executor.pending,
+            "status_cache_hit_ratio": lambda: self.status_cache.hit_ratio,
+            "status_cache_size": lambda: len(self.status_cache),
+            "card_cache_hit_ratio": lambda: self.card_cache.hit_ratio,
+            "card_cache_bytes": lambda: self.card_cache.weight,
+            "favicon_cache_hit_ratio": lambda: self.favicons.hit_ratio,
+            "favicon_rejected": lambda: self.favicons.rejected,
+            "dns_cache_hits": lambda: self.resolver.hits,
+            "dns_cache_misses": lambda: self.resolver.misses,
+            "breaker_open_keys": lambda: len(self.breaker),
+            "breaker_short_circuited": lambda: self.breaker.short_circuited,
+            "spool_bytes": lambda: self.spool.total_bytes,
+            "queries_in_flight": lambda: self.admission.query_slots.in_use,
+            "renders_in_flight": lambda: self.admission.render_slots.in_use,
+            "shed_rate_limited": lambda: self.admission.rate_limited,
+            "shed_busy": lambda: self.admission.busy,
+            "degraded_text_only": lambda: self.admission.degraded,
+        }
+        for name, fn in gauges.items():
+            self.metrics.gauge(name, fn)
 
     @filter.command("motd")
     async def handle_motd(self, event: AstrMessageEvent):
@@ -35,6 +210,10 @@ class MinecraftMOTDPlugin(Star):
         
         支持格式:
         /motd <server_address>[:<port>]
+        /motd <地址1> <地址2> ...   批量查询
+        /motd @<服务器组>
+        /motd watch|unwatch <server_address>[:<port>] [人数阈值]
+        /motd watchlist
         
         例如:
         /motd play.example.com
@@ -42,6 +221,7 @@ class MinecraftMOTDPlugin(Star):
         /motd [2001:db8::1]:19132
         """
         
+        started = time.perf_counter()
         # 从消息内容中解析服务器地址
         message_str = event.message_str.strip()
         # 为了日志安全，只记录消息长度
@@ -66,12 +246,282 @@ class MinecraftMOTDPlugin(Star):
                 "示例:\n"
                 "/motd play.example.com\n"
                 "/motd play.example.com:19132\n"
+                "/motd a.example.com b.example.com（批量查询）\n"
+                "/motd @组名（查询配置中的服务器组）\n"
+                "/motd watch <server_ip>[:<port>] [人数阈值]（状态变化时通知本会话）\n"
+                "/motd unwatch <server_ip>[:<port>] ｜ /motd watchlist\n"
                 "不带端口时将依次探测 Java(25565/TCP) 与 基岩版(19132/UDP)\n"
                 "若指定端口：先以 Java(TCP) 探测，失败后再以 基岩版(UDP) 探测"
             )
             yield event.plain_result(usage)
             return
 
+        # 监控子命令
+        subcommand = address.split(maxsplit=1)[0].lower()
+        if subcommand in ("watch", "unwatch", "watchlist"):
+            yield await self._handle_watch_command(event, subcommand, address[len(subcommand):].strip())
+            return
+
+        # 准入控制：用户/会话限流与全局并发名额，负载较高时只回复文字
+        targets = self._expand_targets(address)
+        admission = self.admission.admit(
+            (event.get_platform_name(), event.get_sender_id()),
+            event.unified_msg_origin,
+            exempt=event.is_admin(),
+            cost=len(targets),
+        )
+        if not admission.allowed:
+            logger.info(f"查询未被受理: {admission.message}")
+            yield event.plain_result(admission.message)
+            return
+        try:
+            async for result in self._handle_query(event, address, targets, started, admission.text_only,
+                                                   self._theme_for(event),
+                                                   self.encoder.choose(event.get_platform_name())):
+                yield result
+        finally:
+            admission.release()
+
+    async def _handle_query(self, event: AstrMessageEvent, address: str, targets: List[str],
+                            started: float, text_only: bool = False, theme: Optional[CardTheme] = None,
+                            image_format: str = "png8"):
+        """
+        执行单个或批量查询
+        
+        Args:
+            event: 消息事件
+            address: 命令参数
+            targets: 展开后的地址列表
+            started: 请求开始时间（perf_counter）
+            text_only: 负载较高时为 True，只回复文字摘要
+            theme: 卡片主题，默认使用配置的主题
+            image_format: 卡片的输出格式（由消息平台决定）
+        """
+        # 多个地址或服务器组：批量查询，合成一张图片
+        if targets != [address]:
+            async for result in self._handle_batch(event, targets, text_only, theme, image_format):
+                yield result
+            return
+
+        with self.metrics.timer("validate"):
+            parsed, error = self._parse_address(address)
+        if parsed is None:
+            yield event.plain_result(error)
+            return
+        ip, port = parsed
+
+        # 并行探测逻辑：结果按完成顺序逐个发送，不必等待较慢的一方；
+        # 两个版本先后很快应答时（互通服务器）合并为一张双版本卡片
+        policy = self.config.get("probe_race_policy", "merge")
+        found = False
+        async for group in self._iter_probe_groups(ip, port, policy=policy, allow_stale=True):
+            found = True
+            # 渲染图片和文本
+            if len(group) > 1:
+                img_bytes, status_text = await self._render_combined_card(group, text_only, theme, image_format)
+            else:
+                img_bytes, status_text = await self._render_status_card(group[0], text_only, theme, image_format)
+            if any(info.get("stale") for info in group):
+                # 陈旧结果：后台刷新完成后预先渲染新卡片，供下一次查询直接使用
+                self._rerender_after_revalidate(group, theme, image_format)
+            if img_bytes is None:
+                # 负载较高或渲染队列已满，降级为纯文本回复
+                yield event.plain_result(status_text)
+                continue
+            # 图片和文字一并发送
+            yield event.chain_result([self._image_component(img_bytes), Comp.Plain(status_text)])
+
+        if not found:
+            age = self._offline_age(ip, port)
+            if age is not None:
+                yield event.plain_result(f"当前服务器不在线（{age} 秒前检测），请稍后重试或检查服务器与端口")
+            else:
+                yield event.plain_result("当前服务器不在线，或者当前服务器信息输入错误，请检查服务器与端口后重试")
+        self.metrics.observe("request", (time.perf_counter() - started) * 1000)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("motd_stats")
+    async def handle_motd_stats(self, event: AstrMessageEvent):
+        """查看各阶段耗时、缓存命中率与进行中的探测数（仅管理员）"""
+        yield event.plain_result(self.metrics.format_text())
+
+    def _expand_targets(self, address: str) -> List[str]:
+        """
+        将命令参数展开为地址列表
+        
+        支持空格或逗号分隔的多个地址，以及配置中的服务器组（@组名 或 组名）。
+        """
+        groups = self._server_groups()
+        targets: List[str] = []
+        for token in re.split(r"[\s,，]+", address):
+            if not token:
+                continue
+            name = token[1:] if token.startswith("@") else token
+            if name in groups:
+                targets.extend(groups[name])
+            else:
+                targets.append(token)
+        # 去重并保持顺序
+        return list(dict.fromkeys(targets))
+
+    def _server_groups(self) -> dict:
+        """读取配置中的服务器组，格式为 "组名=地址1,地址2" """
+        groups = {}
+        for line in self.config.get("server_groups", []) or []:
+            if not isinstance(line, str) or "=" not in line:
+                continue
+            name, _, addresses = line.partition("=")
+            members = [a for a in re.split(r"[\s,，]+", addresses) if a]
+            if name.strip() and members:
+                groups[name.strip()] = members
+        return groups
+
+    def _load_themes(self) -> Tuple[CardTheme, dict]:
+        """
+        读取卡片主题配置
+        
+        Returns:
+            (默认主题, {群号: 主题})
+        """
+        name = str(self.config.get("card_theme", "dark") or "dark")
+        if name not in THEMES:
+            logger.warning(f"未知的卡片主题 {name}，使用 dark")
+            name = "dark"
+        default = THEMES[name].with_brand(str(self.config.get("card_brand", "") or ""))
+        group_themes = {}
+        for line in self.config.get("group_themes", []) or []:
+            group, _, spec = str(line).partition("=")
+            theme_name, _, brand = spec.partition(",")
+            group, theme_name = group.strip(), theme_name.strip() or name
+            if not group or theme_name not in THEMES:
+                logger.warning(f"忽略无效的群主题配置: {line}")
+                continue
+            group_themes[group] = THEMES[theme_name].with_brand(brand.strip() or default.brand)
+        return default, group_themes
+
+    def _theme_for(self, event: AstrMessageEvent) -> CardTheme:
+        """按群号选择卡片主题，未单独配置时使用默认主题"""
+        group_id = event.get_group_id()
+        return self.group_themes.get(str(group_id), self.default_theme) if group_id else self.default_theme
+
+    async def _handle_batch(self, event: AstrMessageEvent, targets: List[str], text_only: bool = False,
+                            theme: Optional[CardTheme] = None, image_format: str = "png8"):
+        """
+        批量查询多个服务器，合成一张图片与一段摘要发送
+        
+        所有服务器在全局并发上限下同时探测；text_only 时只发送摘要。
+        """
+        max_servers = int(self.config.get("batch_max_servers", 30))
+        if len(targets) > max_servers:
+            yield event.plain_result(f"一次最多查询 {max_servers} 个服务器")
+            return
+
+        parsed_targets = []
+        for target in targets:
+            parsed, error = self._parse_address(target)
+            if parsed is None:
+                yield event.plain_result(f"{target}: {error}")
+                return
+            parsed_targets.append((target, parsed))
+
+        async def probe_one(host: str, port: Optional[int]) -> List[dict]:
+            async with self._batch_semaphore:
+                return await self._parallel_probe(host, port, allow_stale=True)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(probe_one(host, port) for _, (host, port) in parsed_targets))
+        entries = [(label, infos) for (label, _), infos in zip(parsed_targets, results)]
+
+        online = sum(1 for _, infos in entries if infos)
+        lines = [f"MC 服务器批量查询：{online}/{len(entries)} 在线"]
+        for label, infos in entries:
+            if not infos:
+                lines.append(f"❌ {label} 离线")
+            for info in infos:
+                lines.append(
+                    f"✅ {label} [{info['edition']}] {info['players_online']}/{info['players_max']} "
+                    f"{info['latency_ms']}ms"
+                )
+        summary = "\n".join(lines)
+
+        if text_only or not self.admission.render_slots.try_acquire():
+            logger.info("当前负载较高，批量查询降级为文字回复")
+            yield event.plain_result(summary)
+            return
+        # 历史记录只在事件循环线程中读写，附加历史序列后再交给渲染线程
+        card_entries = [(label, [self._with_history(info) for info in infos]) for label, infos in entries]
+        try:
+            img_bytes = await self.render_pool.run(
+                self._draw_composite_card, card_entries, theme or self.default_theme, image_format
+            )
+        except RenderQueueFull as e:
+            logger.warning(f"{e}，降级为文字回复")
+            yield event.plain_result(summary)
+            return
+        finally:
+            self.admission.render_slots.release()
+        yield event.chain_result([self._image_component(img_bytes), Comp.Plain(summary)])
+        self.metrics.observe("batch_request", (time.perf_counter() - started) * 1000)
+
+    async def _handle_watch_command(self, event: AstrMessageEvent, subcommand: str, args: str):
+        """处理 watch / unwatch / watchlist 子命令"""
+        umo = event.unified_msg_origin
+        if subcommand == "watchlist":
+            targets = self.watcher.list_for(umo)
+            if not targets:
+                return event.plain_result("当前会话没有监控任何服务器")
+            lines = ["当前会话监控的服务器:"]
+            for target in targets:
+                state = {True: "在线", False: "离线", None: "未知"}[target.online]
+                threshold = target.subscribers.get(umo)
+                suffix = f"，人数阈值 {threshold}" if threshold is not None else ""
+                lines.append(f"- {target.label}（{state}{suffix}）")
+            return event.plain_result("\n".join(lines))
+
+        parts = args.split()
+        if not parts:
+            usage = f"用法: /motd {subcommand} <server_ip>[:<port>]"
+            if subcommand == "watch":
+                usage += " [人数阈值]"
+            return event.plain_result(usage)
+        parsed, error = self._parse_address(parts[0])
+        if parsed is None:
+            return event.plain_result(error)
+        host, port = parsed
+
+        if subcommand == "unwatch":
+            if self.watcher.remove(umo, host, port):
+                return event.plain_result(f"已取消监控 {parts[0]}")
+            return event.plain_result(f"当前会话没有监控 {parts[0]}")
+
+        threshold = None
+        if len(parts) > 1:
+            if not parts[1].isdigit():
+                return event.plain_result("人数阈值必须是正整数")
+            threshold = int(parts[1])
+        max_per_chat = int(self.config.get("watch_max_per_chat", 20))
+        watched = self.watcher.list_for(umo)
+        already = any(t.key == (host.lower(), port) for t in watched)
+        if not already and len(watched) >= max_per_chat:
+            return event.plain_result(f"每个会话最多监控 {max_per_chat} 个服务器")
+        self.watcher.add(umo, host, port, parts[0], threshold)
+        tip = f"，在线人数越过 {threshold} 时也会通知" if threshold is not None else ""
+        return event.plain_result(f"已开始监控 {parts[0]}，状态变化时将通知本会话{tip}")
+
+    async def _send_watch_notice(self, umo: str, text: str):
+        """向订阅会话推送监控通知"""
+        await self.context.send_message(umo, MessageChain().message(text))
+
+    def _parse_address(self, address: str) -> Tuple[Optional[Tuple[str, Optional[int]]], str]:
+        """
+        解析并预检查服务器地址
+        
+        Args:
+            address: 用户输入的地址，例如 play.example.com:25565 或 [::1]:19132
+            
+        Returns:
+            ((host, port), "") 或 (None, 错误提示)
+        """
         logger.info(f"尝试匹配地址: '{address}'")
         # 支持 IPv4、IPv6、域名的正则表达式
         ipv6_pattern = r"^\[?([0-9a-fA-F:]+)\]?(?::(\d+))?$"
@@ -84,8 +534,7 @@ class MinecraftMOTDPlugin(Star):
             match = re.match(ipv4_domain_pattern, address)
         logger.info(f"正则匹配结果: {match}")
         if not match:
-            yield event.plain_result("参数格式错误，请使用 /motd <server_ip>[:<port>]")
-            return
+            return None, "参数格式错误，请使用 /motd <server_ip>[:<port>]"
 
         ip = match.group(1)
         port = int(match.group(2)) if match.group(2) else None
@@ -122,35 +571,42 @@ class MinecraftMOTDPlugin(Star):
         
         if not is_valid:
             logger.info(f"预检查发现地址无效: {ip[:20]}")
-            yield event.plain_result("服务器地址无效")
-            return
-
-        # 并行探测逻辑
-        status_infos = await self._parallel_probe(ip, port)
-        
-        if not status_infos:
-            yield event.plain_result("当前服务器不在线，或者当前服务器信息输入错误，请检查服务器与端口后重试")
-            return
-
-        # 处理探测结果
-        for status_info in status_infos:
-            # 渲染图片和文本
-            img_bytes, status_text = await self._render_status_card(status_info)
-            file_path = self._save_temp_image(img_bytes)
-
-            logger.info(f"发送 Minecraft MOTD 本地渲染图片: {file_path}")
+            return None, "服务器地址无效"
 
-            # 异步清理临时文件
-            asyncio.create_task(self._cleanup_file(file_path))
-
-            # 图片和文字一并发送
-            yield event.chain_result([Comp.Image(file_path), Comp.Plain(status_text)])
-        return
+        return (ip, port), ""
 
     async def initialize(self):
+        loop = asyncio.get_running_loop()
+        # 字体按字号预加载，渲染时不再读取字体文件
+        await loop.run_in_executor(
+            None, self.font_cache.preload, (FONT_SIZE_TITLE, FONT_SIZE_BODY, FONT_SIZE_SMALL)
+        )
+        themes = {theme.key: theme for theme in [self.default_theme, *self.group_themes.values()]}
+        await loop.run_in_executor(None, self.card_templates.preload, list(themes.values()))
+        # 清理上次运行遗留的临时图片（包括旧版本写在系统临时目录中的文件）
+        await loop.run_in_executor(None, self.spool.cleanup_leftovers, [tempfile.gettempdir()])
+        self.spool.start()
+        # 恢复历史样本
+        await loop.run_in_executor(None, self.history.load)
+        self.history.start()
+        # 恢复监控列表并启动调度器
+        await loop.run_in_executor(None, self.watcher.load)
+        self.watcher.start()
+        # 默认图标在启动时解码一次，本地没有时再在后台下载
+        if not await loop.run_in_executor(None, self.icon_assets.load):
+            self.icon_assets.schedule_refresh()
+        # 上次运行的缓存快照在后台恢复，不阻塞启动；恢复完成前的查询照常探测
+        if self.warm_state is not None:
+            self._warm_restore = asyncio.create_task(self._restore_warm_state())
+            self.warm_state.start(self._save_warm_state, float(self.config.get("warm_state_interval_sec", 300)))
+        # 可选：定期以 Prometheus 文本格式导出指标
+        metrics_file = self._metrics_file()
+        if metrics_file:
+            self.metrics.start(metrics_file, float(self.config.get("metrics_dump_interval_sec", 60)))
         logger.info("MinecraftMOTDPlugin 已初始化")
 
-    async def _parallel_probe(self, host: str, port: Optional[int], timeout_sec: float = 5.0) -> List[dict]:
+    async def _parallel_probe(self, host: str, port: Optional[int], timeout_sec: float = 5.0,
+                              allow_stale: bool = False) -> List[dict]:
         """
         并行探测 Java 和 Bedrock 服务器，返回所有成功的结果
         
@@ -158,36 +614,430 @@ class MinecraftMOTDPlugin(Star):
             host: 服务器地址
             port: 端口号（可选）
             timeout_sec: 超时时间
+            allow_stale: 是否接受超过新鲜期的缓存结果（同时在后台刷新）
             
         Returns:
             成功探测的服务器信息列表
         """
-        tasks = []
+        return [result async for result in self._iter_probe_results(host, port, timeout_sec,
+                                                                    allow_stale=allow_stale)]
+
+    async def _iter_probe_results(self, host: str, port: Optional[int], timeout_sec: float = 5.0,
+                                  policy: str = "append", allow_stale: bool = False):
+        """
+        并行探测 Java 和 Bedrock 服务器，按完成顺序逐个产出成功的结果
+        
+        Args:
+            host: 服务器地址
+            port: 端口号（可选）
+            timeout_sec: 超时时间
+            policy: "append" 等待其余探测并追加结果；"first" 拿到首个结果后取消其余探测
+            allow_stale: 是否接受超过新鲜期的缓存结果（同时在后台刷新）
+            
+        Yields:
+            服务器信息
+        """
+        plan, deadline = self._plan_probes(host, port, timeout_sec, allow_stale)
+        loop = asyncio.get_running_loop()
+        profile_key = (host.lower(), port)
+
+        async def run(edition: str, factory) -> Tuple[str, Optional[dict]]:
+            return edition, await factory(max(0.1, deadline - loop.time()))
+
+        # 有足够历史时先探测预测的版本，另一版本延迟后作为对冲探测发出
+        predicted = self.host_profiles.predict(profile_key)
+        if predicted is not None:
+            plan.sort(key=lambda item: item[0] != predicted)
+            tasks = [asyncio.ensure_future(run(*plan[0]))]
+            delay = self.host_profiles.hedge_delay(profile_key)
+            await asyncio.wait(tasks, timeout=delay)
+            first = tasks[0]
+            if not (first.done() and not first.cancelled() and first.exception() is None
+                    and isinstance(first.result()[1], dict)):
+                logger.info(f"预测版本 {predicted} 未在 {delay:.2f}s 内应答，发出对冲探测")
+                tasks.extend(asyncio.ensure_future(run(*item)) for item in plan[1:])
+        else:
+            tasks = [asyncio.ensure_future(run(*item)) for item in plan]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    edition, result = await next_done
+                except Exception as e:
+                    logger.warning(f"探测任务异常: {type(e).__name__}: {e}")
+                    continue
+                if result is None or (result is not NOT_PROBED and "cache_age_sec" not in result):
+                    # 只用实际探测的结果更新画像，缓存命中与熔断跳过的探测不计入
+                    self.host_profiles.observe(
+                        profile_key, edition, result is not None,
+                        result.get("latency_ms") if result else None,
+                        result.get("port") if result else None,
+                    )
+                if isinstance(result, dict):
+                    yield result
+                    if policy == "first":
+                        break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _iter_probe_groups(self, host: str, port: Optional[int], policy: str = "merge",
+                                 allow_stale: bool = False):
+        """
+        按完成顺序产出探测结果分组
+        
+        merge 策略下，先应答的版本会再等待另一版本一小段时间，两者都在此期间应答时合为一组，
+        由一张双版本卡片展示；等待超时后先发送已有结果，另一版本之后单独成组。
+        其他策略下每个结果单独成组。
         
+        Args:
+            host: 服务器地址
+            port: 端口号（可选）
+            policy: "merge"、"append" 或 "first"
+            allow_stale: 是否接受超过新鲜期的缓存结果（同时在后台刷新）
+            
+        Yields:
+            服务器信息列表（1 或 2 项）
+        """
+        results = self._iter_probe_results(
+            host, port, policy="first" if policy == "first" else "append", allow_stale=allow_stale
+        )
+        if policy != "merge":
+            async for info in results:
+                yield [info]
+            return
+
+        following = None
+        try:
+            try:
+                first = await results.__anext__()
+            except StopAsyncIteration:
+                return
+            following = asyncio.ensure_future(results.__anext__())
+            await asyncio.wait({following}, timeout=self._merge_wait(host, port, first))
+            merged = following.done()
+            if not merged:
+                yield [first]
+            try:
+                second = await following
+            except StopAsyncIteration:
+                if merged:
+                    yield [first]
+                return
+            yield sorted([first, second], key=lambda info: info.get("edition") != "Java") if merged else [second]
+        finally:
+            if following is not None and not following.done():
+                following.cancel()
+                await asyncio.gather(following, return_exceptions=True)
+            await results.aclose()
+
+    def _merge_wait(self, host: str, port: Optional[int], first: dict) -> float:
+        """
+        先应答的版本等待另一版本的时间（秒）
+        
+        画像预测只有一个版本时不等待；已知另一版本也会应答时按 RTT 推算等待时间。
+        """
+        profile_key = (host.lower(), port)
+        if self.host_profiles.predict(profile_key) is not None:
+            return 0.0
+        wait = max(0.0, float(self.config.get("edition_merge_wait_ms", 500)) / 1000.0)
+        profile = self.host_profiles.get(profile_key)
+        other = "bedrock" if first.get("edition") == "Java" else "java"
+        if profile is not None and getattr(profile, f"{other}_ok") > 0:
+            wait = max(wait, self.host_profiles.hedge_delay(profile_key))
+        return wait
+
+    def _plan_probes(self, host: str, port: Optional[int], timeout_sec: float,
+                     allow_stale: bool = False) -> Tuple[list, float]:
+        """
+        生成各版本的探测计划
+        
+        缓存可以直接应答的版本（新鲜，或 allow_stale 时陈旧）不等待 DNS 解析；
+        需要实际探测的版本才解析地址，两个版本共享一次解析，解析耗时计入总时限。
+        
+        Returns:
+            ([(edition, 接收剩余超时并返回探测协程的函数)], 截止时间)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_sec
         if port is None:
-            # 未指定端口：并行探测 Java(25565) 和 Bedrock(19132)
-            tasks.append(self._probe_java(host, 25565, timeout_sec))
-            tasks.append(self._probe_bedrock(host, 19132, timeout_sec))
+            # 未指定端口：Java(25565，或 SRV 记录指定的端口) 和 Bedrock(19132)
+            ports = {"java": 25565, "bedrock": 19132}
         else:
-            # 指定端口：并行探测 Java 和 Bedrock
-            tasks.append(self._probe_java(host, port, timeout_sec))
-            tasks.append(self._probe_bedrock(host, port, timeout_sec))
+            # 指定端口：Java 和 Bedrock 使用同一端口
+            ports = {"java": port, "bedrock": port}
+        resolving: List[asyncio.Future] = []
+
+        async def resolve(edition: str) -> Optional[Tuple[str, int]]:
+            if not resolving:
+                resolving.append(asyncio.ensure_future(self._resolve_targets(host, port, timeout_sec)))
+            targets = await asyncio.shield(resolving[0])
+            return targets[edition] if targets is not None else None
+
+        def factory(edition: str):
+            return lambda t: self._probe_cached(
+                edition, host, ports[edition], t, allow_stale=allow_stale, resolve=lambda: resolve(edition)
+            )
+
+        return [(edition, factory(edition)) for edition in ("java", "bedrock")], deadline
+
+    async def _resolve_targets(self, host: str, port: Optional[int],
+                               timeout_sec: float) -> Optional[Dict[str, Tuple[str, int]]]:
+        """
+        解析各版本实际连接的地址
         
-        # 并行执行所有任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        Returns:
+            edition -> (host, port)；域名不存在或解析超时时为 None
+        """
+        try:
+            with self.metrics.timer("dns"):
+                resolved = await self.resolver.resolve(host, srv=port is None, timeout=timeout_sec)
+        except NXDomainError:
+            logger.info(f"域名不存在: {host}")
+            return None
+        except asyncio.TimeoutError:
+            logger.warning(f"DNS 解析超时: {host} (超时 {timeout_sec}s)")
+            return None
+        except ResolveError as e:
+            # 解析器异常时交给 mcstatus 自行连接
+            logger.info(f"DNS 解析失败，直接使用原地址: {e}")
+            resolved = ResolvedAddress(host=host, java_host=host)
+        if port is None:
+            return {"java": (resolved.java_host, resolved.java_port or 25565), "bedrock": (resolved.ip, 19132)}
+        return {"java": (resolved.java_host, port), "bedrock": (resolved.ip, port)}
+
+    async def _probe_cached(self, edition: str, host: str, port: int, timeout_sec: float = 5.0,
+                            target: Optional[Tuple[str, int]] = None, allow_stale: bool = False,
+                            resolve: Optional[Callable[[], Awaitable[Optional[Tuple[str, int]]]]] = None) -> Any:
+        """
+        带缓存的单版本探测
         
-        # 过滤成功的结果
-        valid_results = []
-        for result in results:
-            if isinstance(result, dict) and result is not None:
-                valid_results.append(result)
+        新鲜期内直接返回缓存结果（附带 cache_age_sec），同一目标的并发请求共享一次探测。
+        allow_stale 时，超过新鲜期但未超过最大陈旧时间的结果也立即返回（附带 stale），
+        并在后台发起一次刷新，刷新结果写回缓存供下一次查询使用。
         
-        return valid_results
+        Args:
+            edition: "java" 或 "bedrock"
+            host: 服务器地址
+            port: 端口号
+            timeout_sec: 超时时间
+            target: 已解析的实际连接地址 (host, port)
+            allow_stale: 是否接受陈旧的缓存结果
+            resolve: 未给出 target 时，在需要实际探测时解析连接地址的函数；解析耗时从超时中扣除
+            
+        Returns:
+            服务器信息；探测失败时为 None，熔断中或地址无法解析而未发起探测时为 NOT_PROBED
+        """
+        key = (host.lower(), port, edition)
+        probe = self._probe_java if edition == "java" else self._probe_bedrock
+
+        async def run() -> Any:
+            probe_target, budget = target, timeout_sec
+            if probe_target is None and resolve is not None:
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                probe_target = await resolve()
+                if probe_target is None:
+                    return NOT_PROBED
+                budget = max(0.1, timeout_sec - (loop.time() - started))
+            with self.metrics.timer(f"probe_{edition}"):
+                result = await probe(host, port, budget, probe_target)
+            if result is not None:
+                # 缓存与历史样本只在实际探测时写入一次
+                self.breaker.record_success(key)
+                self.status_cache.set(key, result)
+                self.history.record(key, result["latency_ms"], result["players_online"])
+            else:
+                # 探测失败时丢弃陈旧结果，之后的查询不再把离线的服务器显示为在线
+                self.status_cache.pop(key)
+                backoff = self.breaker.record_failure(key)
+                logger.info(f"{edition} 探测失败，{backoff:.0f}s 内不再探测 {host}:{port}")
+            return result
+
+        entry = self.status_cache.get_entry(key)
+        if entry is not None:
+            info, stored_at = entry
+            age = max(0.0, time.time() - stored_at)
+            if age < self.status_fresh_sec:
+                return dict(info, cache_age_sec=round(age))
+            if allow_stale:
+                self._revalidate(key, run)
+                return dict(info, cache_age_sec=round(age), stale=True)
+        if not self.breaker.allow(key):
+            # 熔断中：近期探测失败，直接判定离线
+            return NOT_PROBED
+
+        result = await self._probe_flight.do(key, run)
+        return dict(result) if isinstance(result, dict) else result
+
+    def _revalidate(self, key: Tuple[str, int, str], run: Callable[[], Awaitable[Any]]) -> None:
+        """在后台刷新一条陈旧的探测结果，同一目标同时只有一次刷新"""
+        if key in self._revalidations or not self.breaker.allow(key):
+            return
+        logger.info(f"回复陈旧缓存并在后台刷新: {key[0]}:{key[1]} ({key[2]})")
+        task = asyncio.ensure_future(self._probe_flight.do(key, run))
+        self._revalidations[key] = task
+
+        def done(t: asyncio.Future, k=key) -> None:
+            if self._revalidations.get(k) is t:
+                del self._revalidations[k]
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"后台刷新失败: {type(t.exception()).__name__}: {t.exception()}")
+
+        task.add_done_callback(done)
+
+    def _rerender_after_revalidate(self, group: List[dict], theme: Optional[CardTheme],
+                                   image_format: str = "png8") -> None:
+        """后台刷新完成后按同一主题与布局（单版本或双版本）渲染新卡片写入渲染缓存"""
+        refreshes = []
+        for info in group:
+            edition = "java" if info.get("edition") == "Java" else "bedrock"
+            key = (str(info.get("host", "")).lower(), info.get("port"), edition)
+            refreshes.append(self._revalidations.get(key) if info.get("stale") else None)
+        if not any(refreshes):
+            return
+
+        async def rerender() -> None:
+            fresh_group = []
+            for info, refresh in zip(group, refreshes):
+                try:
+                    fresh = await asyncio.shield(refresh) if refresh is not None else info
+                except Exception:
+                    return
+                if not isinstance(fresh, dict):
+                    return
+                fresh_group.append(dict(fresh))
+            if len(fresh_group) > 1:
+                await self._render_combined_card(fresh_group, False, theme, image_format)
+            else:
+                await self._render_status_card(fresh_group[0], False, theme, image_format)
+
+        task = asyncio.ensure_future(rerender())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _save_warm_state(self):
+        """写入缓存与主机画像的快照（缓存只在事件循环线程中读取，写库在线程中进行）"""
+        if self._warm_restore is None or not self._warm_restore.done():
+            # 恢复完成之前不覆盖上一次的快照
+            return
+        now = time.time()
+        sections = {"status": [], "dns": [], "host": []}
+        for key, info, stored_at, expires_at in self.status_cache.items():
+            try:
+                sections["status"].append((dumps(list(key)).decode("utf-8"), dumps(info), stored_at, expires_at))
+            except (TypeError, ValueError):
+                continue
+        for key, value, expires_at in self.resolver.snapshot():
+            sections["dns"].append((key, dumps(value), now, expires_at))
+        for key, data, checked_at in self.host_profiles.snapshot():
+            sections["host"].append((dumps(list(key)).decode("utf-8"), dumps(data), checked_at or now, None))
+        loop = asyncio.get_running_loop()
+        with self.metrics.timer("warm_state_save"):
+            await loop.run_in_executor(None, self._write_warm_state, sections)
+
+    def _write_warm_state(self, sections: dict):
+        now = time.time()
+        sections["favicon"] = [(key, data, now, None) for key, data in self.favicons.snapshot()]
+        self.warm_state.save(sections)
+
+    async def _restore_warm_state(self):
+        """读取上次的快照，逐条校验后放回各缓存；已有的条目不会被覆盖"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            sections = await loop.run_in_executor(None, self._read_warm_state)
+        except Exception as e:
+            logger.warning(f"读取启动快照失败: {e}")
+            return
+        counts = {
+            "status": self._restore_status(sections.get("status", [])),
+            "dns": self.resolver.restore(sections.get("dns", [])),
+            "host": self.host_profiles.restore(sections.get("host", [])),
+            "favicon": self.favicons.restore(sections.get("favicon", [])),
+        }
+        for section, count in counts.items():
+            self.metrics.incr(f"warm_restored_{section}", count)
+        logger.info(
+            f"已恢复启动快照 ({(time.perf_counter() - started) * 1000:.0f} ms): "
+            + ", ".join(f"{section} {count}" for section, count in counts.items())
+        )
+
+    def _read_warm_state(self) -> dict:
+        """在线程中读取并解析快照；无法解析的条目被丢弃"""
+        sections = {}
+        for section, rows in self.warm_state.load().items():
+            parsed = []
+            for key, value, stored_at, expires_at in rows:
+                if section == "favicon":
+                    parsed.append((key, value))
+                    continue
+                try:
+                    if section == "dns":
+                        parsed.append((key, loads(value), expires_at))
+                    elif section == "host":
+                        host, port = loads(key.encode("utf-8"))
+                        parsed.append(((host, port), loads(value)))
+                    else:
+                        parsed.append((loads(key.encode("utf-8")), loads(value), stored_at))
+                except (TypeError, ValueError):
+                    continue
+            sections[section] = parsed
+        return sections
+
+    def _restore_status(self, entries: List[Tuple[list, dict, float]]) -> int:
+        """恢复探测结果缓存；写入时间保留，超过最大陈旧时间的条目由缓存自行丢弃"""
+        required = ("host", "port", "edition", "latency_ms", "players_online", "players_max")
+        restored = 0
+        for key, info, stored_at in entries:
+            if not (isinstance(key, list) and len(key) == 3 and isinstance(info, dict)
+                    and all(name in info for name in required)):
+                continue
+            host, port, edition = key
+            if edition not in ("java", "bedrock") or str(info["host"]).lower() != host or info["port"] != port:
+                continue
+            key = (host, port, edition)
+            if key in self.status_cache:
+                continue
+            self.status_cache.set(key, info, stored_at=stored_at)
+            restored += 1 if key in self.status_cache else 0
+        return restored
+
+    def _metrics_file(self) -> Optional[str]:
+        """指标导出文件路径，相对路径基于插件数据目录"""
+        path = str(self.config.get("metrics_file", "") or "").strip()
+        if not path:
+            return None
+        return path if os.path.isabs(path) else os.path.join(self.data_dir, path)
 
     async def terminate(self):
+        for task in list(self._revalidations.values()) + list(self._background_tasks):
+            task.cancel()
+        if self.warm_state is not None:
+            await self.warm_state.close()
+            try:
+                await self._save_warm_state()
+            except Exception as e:
+                logger.warning(f"写入启动快照失败: {e}")
+        await self.metrics.close()
+        metrics_file = self._metrics_file()
+        if metrics_file:
+            try:
+                self.metrics.dump(metrics_file)
+            except OSError as e:
+                logger.warning(f"写入指标文件失败: {e}")
+        await self.watcher.close()
+        await self.history.close()
+        await self.icon_assets.close()
+        self.render_pool.shutdown()
+        self.sync_executor.shutdown()
+        self.bedrock_pinger.close()
+        await self.spool.close()
         logger.info("MinecraftMOTDPlugin 已停止")
 
-    async def _probe_java(self, host: str, port: int, timeout_sec: float = 5.0) -> Optional[dict]:
+    async def _probe_java(self, host: str, port: int, timeout_sec: float = 5.0,
+                          target: Optional[Tuple[str, int]] = None) -> Optional[dict]:
         """
         探测 Java 版服务器
         
@@ -195,16 +1045,18 @@ class MinecraftMOTDPlugin(Star):
             host: 服务器地址
             port: 端口号
             timeout_sec: 超时时间
+            target: 已解析的连接地址（SRV 目标），为空时直接连接 host:port
             
         Returns:
             服务器信息或 None
         """
         try:
             logger.info(f"开始 Java 探测: {host}:{port}")
+            deadline = asyncio.get_running_loop().time() + timeout_sec
             
-            # 创建服务器对象
-            server = JavaServer.lookup(f"{host}:{port}")
-            logger.info(f"JavaServer.lookup 成功: {host}:{port}")
+            # 创建服务器对象（地址已由异步解析器处理，不再同步 lookup）
+            connect_host, connect_port = target or (host, port)
+            server = JavaServer(connect_host, connect_port, timeout=timeout_sec)
             
             # 获取服务器状态（先尝试异步，失败后尝试同步）
             try:
@@ -212,8 +1064,8 @@ class MinecraftMOTDPlugin(Star):
                 logger.info(f"Java 异步探测成功: {host}:{port}")
             except Exception as async_error:
                 logger.info(f"Java 异步探测失败，尝试同步: {async_error}")
-                # 备选方案：使用同步方法
-                status = await asyncio.get_event_loop().run_in_executor(None, server.status)
+                # 备选方案：使用同步方法（有界线程池，且只使用剩余的时间）
+                status = await self._sync_status(server, deadline)
                 logger.info(f"Java 同步探测成功: {host}:{port}")
             # 解析 Java 返回
             version_name = getattr(status.version, "name", "")
@@ -240,7 +1092,11 @@ class MinecraftMOTDPlugin(Star):
                 except Exception:
                     motd_text = str(desc) if desc is not None else ""
 
-            favicon_data_uri = getattr(status, "favicon", None)
+            # mcstatus 11 起图标字段由 favicon 改名为 icon
+            favicon_data_uri = getattr(status, "icon", None) or getattr(status, "favicon", None)
+            # 保留原始 MOTD（JSON 文本组件或带 § 代码的字符串），用于按样式绘制
+            raw = getattr(status, "raw", None)
+            motd_raw = raw.get("description") if isinstance(raw, dict) else None
 
             return {
                 "edition": "Java",
@@ -254,6 +1110,7 @@ class MinecraftMOTDPlugin(Star):
                 "players_max": players_max,
                 "player_names": sample_names,
                 "motd": motd_text or "",
+                "motd_raw": motd_raw,
                 "favicon_data_uri": favicon_data_uri,
             }
         except asyncio.TimeoutError:
@@ -266,7 +1123,8 @@ class MinecraftMOTDPlugin(Star):
             logger.warning(f"Java 探测失败: {host}:{port} - {type(e).__name__}: {e}")
             return None
 
-    async def _probe_bedrock(self, host: str, port: int, timeout_sec: float = 5.0) -> Optional[dict]:
+    async def _probe_bedrock(self, host: str, port: int, timeout_sec: float = 5.0,
+                             target: Optional[Tuple[str, int]] = None) -> Optional[dict]:
         """
         探测 Bedrock 版服务器
         
@@ -274,25 +1132,30 @@ class MinecraftMOTDPlugin(Star):
             host: 服务器地址
             port: 端口号
             timeout_sec: 超时时间
+            target: 已解析的连接地址 (ip, port)，为空时直接连接 host:port
             
         Returns:
             服务器信息或 None
         """
         try:
             logger.info(f"开始 Bedrock 探测: {host}:{port}")
+            deadline = asyncio.get_running_loop().time() + timeout_sec
             
-            # 创建服务器对象
-            server = BedrockServer.lookup(f"{host}:{port}")
-            logger.info(f"BedrockServer.lookup 成功: {host}:{port}")
+            # 地址已由异步解析器处理，不再同步 lookup
+            connect_host, connect_port = target or (host, port)
             
-            # 获取服务器状态（先尝试异步，失败后尝试同步）
+            # 先通过共享 UDP 端点探测，失败后再使用 mcstatus 同步探测
             try:
-                status = await asyncio.wait_for(server.async_status(), timeout=timeout_sec)
+                info = await self.bedrock_pinger.ping(
+                    connect_host, connect_port, timeout_sec, host=host, label_port=port
+                )
                 logger.info(f"Bedrock 异步探测成功: {host}:{port}")
+                return info
             except Exception as async_error:
-                logger.info(f"Bedrock 异步探测失败，尝试同步: {async_error}")
-                # 备选方案：使用同步方法
-                status = await asyncio.get_event_loop().run_in_executor(None, server.status)
+                logger.info(f"Bedrock 异步探测失败，尝试同步: {type(async_error).__name__}: {async_error}")
+                # 备选方案：使用同步方法（有界线程池，且只使用剩余的时间）
+                server = BedrockServer(connect_host, connect_port, timeout=timeout_sec)
+                status = await self._sync_status(server, deadline)
                 logger.info(f"Bedrock 同步探测成功: {host}:{port}")
 
             # Bedrock 字段兼容（根据 mcstatus 命令行输出修正）
@@ -356,6 +1219,14 @@ class MinecraftMOTDPlugin(Star):
             # 如果还是为空，尝试 map_name 或其他字段
             if not motd_text:
                 motd_text = getattr(status, "map_name", "") or getattr(status, "level_name", "")
+
+            # 保留颜色代码供卡片渲染使用
+            motd_styled = None
+            if motd_raw is not None and hasattr(motd_raw, "to_minecraft"):
+                try:
+                    motd_styled = motd_raw.to_minecraft()
+                except Exception:
+                    motd_styled = None
             
             # 记录 MOTD 获取结果
             logger.info(f"Bedrock MOTD 解析: '{motd_text}'")
@@ -372,6 +1243,7 @@ class MinecraftMOTDPlugin(Star):
                 "players_max": players_max,
                 "player_names": [],
                 "motd": motd_text or "",
+                "motd_raw": motd_styled,
                 "favicon_data_uri": None,
             }
         except asyncio.TimeoutError:
@@ -384,66 +1256,338 @@ class MinecraftMOTDPlugin(Star):
             logger.warning(f"Bedrock 探测失败: {host}:{port} - {type(e).__name__}: {e}")
             return None
 
-    def _load_font(self, size: int) -> ImageFont.ImageFont:
+    async def _sync_status(self, server, deadline: float):
         """
-        加载 Minecraft 字体
+        在有界线程池中执行同步 status()，超时以探测截止时间为准
+        
+        Raises:
+            asyncio.TimeoutError: 没有剩余时间或等待超时
+            ExecutorFull: 同步探测线程已全部占用
+        """
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0.05:
+            raise asyncio.TimeoutError()
+        with self.metrics.timer("sync_fallback"):
+            return await self.sync_executor.run(server.status, timeout=remaining)
+
+    def _offline_age(self, host: str, port: Optional[int]) -> Optional[int]:
+        """所有版本都处于熔断状态时，返回最近一次探测距今的秒数"""
+        keys = [(host.lower(), port or 25565, "java"), (host.lower(), port or 19132, "bedrock")]
+        if not all(self.breaker.is_open(key) for key in keys):
+            return None
+        checked = [self.breaker.last_checked(key) or 0 for key in keys]
+        return max(0, round(time.time() - max(checked)))
+
+    def _load_font(self, size: int, text: str = "") -> ImageFont.ImageFont:
+        """
+        加载 Minecraft 字体（字体在启动时预加载并缓存）
         
         Args:
             size: 字体大小
+            text: 要绘制的文本，包含 CJK 字符时可能使用回退字体
             
         Returns:
             字体对象
         """
-        # 优先使用插件自带的 Minecraft 字体
-        plugin_dir = os.path.dirname(os.path.abspath(__file__))
-        minecraft_font = os.path.join(plugin_dir, "font", "Minecraft_AE.ttf")
+        return self.font_cache.get_for_text(text, size)
+
+    async def _render_status_card(self, info: dict, text_only: bool = False, theme: Optional[CardTheme] = None,
+                                  image_format: str = "png8") -> Tuple[Optional[bytes], str]:
+        """
+        渲染服务器状态卡片
         
-        try:
-            if os.path.exists(minecraft_font):
-                return ImageFont.truetype(minecraft_font, size)
-        except Exception as e:
-            logger.info(f"加载 Minecraft 字体失败: {e}")
+        卡片内容未变化时直接复用渲染缓存；否则在渲染线程池中绘制与编码，
+        负载较高、渲染名额用尽或队列已满时图片为 None，仅返回文本摘要。
+        
+        Args:
+            info: 服务器信息
+            text_only: 为 True 时不渲染新图片（仍会使用渲染缓存）
+            theme: 卡片主题，默认使用配置的主题
+            image_format: 输出格式
+            
+        Returns:
+            (图片字节或 None, 文本摘要)
+        """
+        theme = theme or self.default_theme
+        info = self._with_history(info)
+        key = self._card_cache_key(info, theme.key, image_format)
+        return await self._render_cached(
+            key, info, lambda: self._build_status_text(info), text_only,
+            self._draw_status_card, info, theme, image_format,
+        )
+
+    async def _render_combined_card(self, infos: List[dict], text_only: bool = False,
+                                    theme: Optional[CardTheme] = None,
+                                    image_format: str = "png8") -> Tuple[Optional[bytes], str]:
+        """
+        渲染 Java 与基岩版同时在线时的双版本卡片（一张图片、一段摘要）
         
-        # 备选方案：使用默认字体
+        Args:
+            infos: 两个版本的服务器信息，Java 在前
+            text_only: 为 True 时不渲染新图片（仍会使用渲染缓存）
+            theme: 卡片主题，默认使用配置的主题
+            image_format: 输出格式
+            
+        Returns:
+            (图片字节或 None, 文本摘要)
+        """
+        theme = theme or self.default_theme
+        parts = "+".join(self._card_cache_key(info, theme.key, image_format) for info in infos)
+        key = hashlib.sha1(f"combined|{parts}".encode("utf-8")).hexdigest()
+        # 任一版本来自缓存时按较旧的一方标注数据时间
+        age_info = {
+            "cache_age_sec": max(info.get("cache_age_sec") or 0 for info in infos),
+            "stale": any(info.get("stale") for info in infos),
+        }
+        return await self._render_cached(
+            key, age_info, lambda: self._build_combined_text(infos), text_only,
+            self._draw_combined_card, infos, theme, image_format,
+        )
+
+    async def _render_cached(self, key: str, age_info: dict, build_text: Callable[[], str], text_only: bool,
+                             draw_fn: Callable[..., bytes], *args) -> Tuple[Optional[bytes], str]:
+        """
+        带渲染缓存的卡片渲染
+        
+        未命中缓存时在渲染线程池中执行 draw_fn(*args)；负载较高、渲染名额用尽或队列已满时图片为 None。
+        """
+        cached = self.card_cache.get(key)
+        if cached is not None:
+            img_bytes, status_text = cached
+            logger.info(f"命中渲染缓存 (命中率 {self.card_cache.hit_ratio:.1%})")
+            return img_bytes, self._append_cache_age(status_text, age_info)
+
+        status_text = build_text()
+        if text_only or not self.admission.render_slots.try_acquire():
+            logger.info("当前负载较高，降级为文字回复")
+            return None, self._append_cache_age(status_text, age_info)
         try:
-            return ImageFont.load_default()
-        except Exception:
-            return ImageFont.load_default()
-
-    async def _render_status_card(self, info: dict) -> Tuple[bytes, str]:
-        """渲染服务器状态卡片"""
-        # 准备画布
-        width, height = 900, 300
-        bg_color = (28, 30, 34)
-        fg_primary = (235, 235, 235)
-        fg_secondary = (170, 170, 170)
-        accent = (88, 166, 255)
-
-        image = Image.new("RGBA", (width, height), bg_color)
-        draw = ImageDraw.Draw(image)
+            with self.metrics.timer("render"):
+                img_bytes = await self.render_pool.run(draw_fn, *args)
+        except RenderQueueFull as e:
+            logger.warning(f"{e}，降级为文字回复")
+            return None, self._append_cache_age(status_text, age_info)
+        finally:
+            self.admission.render_slots.release()
+        self.card_cache.set(key, (img_bytes, status_text))
+        return img_bytes, self._append_cache_age(status_text, age_info)
+
+    def _with_history(self, info: dict) -> dict:
+        """附加该服务器降采样后的历史序列与统计，供卡片绘制趋势图"""
+        edition = "java" if info.get("edition") == "Java" else "bedrock"
+        buf = self.history.get((str(info.get("host", "")).lower(), info.get("port"), edition))
+        if buf is None or len(buf) < 2:
+            return info
+        latency, players = buf.downsample(HISTORY_POINTS)
+        summary = buf.aggregate()
+        return dict(
+            info,
+            history={
+                "latency": [round(v, 1) for v in latency],
+                "players": [round(v, 1) for v in players],
+                "summary": {k: round(v, 1) for k, v in summary.items()},
+            },
+        )
+
+    @staticmethod
+    def _card_cache_key(info: dict, theme_key: str = "", image_format: str = "") -> str:
+        """根据卡片上显示的字段、主题与输出格式计算内容哈希"""
+        fields = {name: info.get(name) for name in CARD_FIELDS}
+        fields["theme"] = theme_key
+        fields["format"] = image_format
+        fields["motd"] = str(fields["motd"] or "")
+        fields["player_names"] = list(fields["player_names"] or [])[:10]
+        favicon = info.get("favicon_data_uri") or ""
+        fields["favicon"] = hashlib.sha1(favicon.encode("utf-8", "replace")).hexdigest() if favicon else ""
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-        # 字体
-        font_title = self._load_font(28)
-        font_body = self._load_font(20)
-        font_small = self._load_font(16)
+    @staticmethod
+    def _append_cache_age(status_text: str, info: dict) -> str:
+        if info.get("stale"):
+            return status_text + f"\n🕒数据来自 {info['cache_age_sec']} 秒前，正在后台刷新"
+        if info.get("cache_age_sec"):
+            return status_text + f"\n🕒数据来自 {info['cache_age_sec']} 秒前的缓存"
+        return status_text
 
-        padding = 20
-        x = padding
-        y = padding
+    def _draw_status_card(self, info: dict, theme: Optional[CardTheme] = None,
+                          image_format: str = "png8") -> bytes:
+        """绘制状态卡片并编码（在渲染线程中执行）"""
+        with self.metrics.timer("draw"):
+            image = self._draw_card_image(info, theme)
+        return self._encode_image(image, image_format)
+
+    def _draw_card_image(self, info: dict, theme: Optional[CardTheme] = None) -> Image.Image:
+        """复制预先绘制的模板，只绘制动态字段"""
+        theme = theme or self.default_theme
+        template = self.card_templates.get(theme, info.get("edition", ""), bool(info.get("history")))
+        image = template.image.copy()
+        draw = ImageDraw.Draw(image)
 
         # 服务器图标处理
-        icon_loaded = self._load_server_icon(image, info, x, y)
-        x_text = x + 96 + 16 if icon_loaded else x
+        padding = CARD_LAYOUT.padding
+        self._load_server_icon(image, info, padding, padding)
 
         # 渲染内容
-        self._render_content(draw, info, x_text, y, font_title, font_body, font_small, 
-                           fg_primary, fg_secondary, accent, width, padding)
+        self._render_content(image, draw, info, template, theme)
+        if info.get("history"):
+            self._render_history(draw, info["history"], template, theme)
+        return image
 
-        # 导出字节
-        buf = BytesIO()
-        image.save(buf, format="PNG", optimize=True)
-        img_bytes = buf.getvalue()
+    def _draw_combined_card(self, infos: List[dict], theme: Optional[CardTheme] = None,
+                            image_format: str = "png8") -> bytes:
+        """绘制双版本卡片并编码（在渲染线程中执行）"""
+        with self.metrics.timer("draw"):
+            image = self._draw_combined_image(infos, theme)
+        return self._encode_image(image, image_format)
 
+    def _draw_combined_image(self, infos: List[dict], theme: Optional[CardTheme] = None) -> Image.Image:
+        """
+        Java 与基岩版左右两栏并排的卡片
+        
+        图标与标题取自 Java 版；各栏显示本版本的延迟、协议、版本、在线人数与玩家示例列表。
+        两个版本的 MOTD 相同时跨两栏显示一次，不同时各自显示在本栏。
+        """
+        theme = theme or self.default_theme
+        lo = CARD_LAYOUT
+        template = self.card_templates.combined(theme, tuple(info.get("edition", "") for info in infos))
+        image = template.image.copy()
+        draw = ImageDraw.Draw(image)
+        primary = infos[0]
+        self._load_server_icon(image, primary, lo.padding, lo.padding)
+        title = f"{primary['host']}:{primary['port']}"
+        draw.text((lo.x_text, lo.padding), title, font=self._load_font(FONT_SIZE_TITLE, title), fill=theme.fg_primary)
+
+        for info, (x0, x1) in zip(infos, template.column_spans):
+            edition = info.get("edition", "")
+            values = [
+                ("延迟:", f"{info['latency_ms']} ms"),
+                ("协议:", str(info.get("protocol", "-") or "-")),
+                ("版本:", str(info.get("version_name", "-") or "-")),
+                ("在线:", f"{info['players_online']} / {info['players_max']}"),
+            ]
+            for label, value in values:
+                x, y = template.value_pos[f"{edition}|{label}"]
+                font = self._load_font(FONT_SIZE_BODY, label + value)
+                lines = self._wrap_text(value, font, x1 - x, 1)
+                draw.text((x, y), lines[0] if lines else "", font=font, fill=theme.fg_secondary)
+            # 玩家示例列表（Java 有 sample），超出本栏宽度时以省略号截断
+            sample_text = self._player_sample_text(info)
+            if sample_text:
+                font = self._load_font(FONT_SIZE_SMALL, sample_text)
+                lines = self._wrap_text(sample_text, font, x1 - x0, 1)
+                draw.text((x0, template.y_players + 26), lines[0] if lines else "", font=font,
+                          fill=theme.fg_secondary)
+
+        y_motd = template.y_motd
+        max_lines = max(0, (lo.height - lo.padding - y_motd) // 26)
+        runs = [
+            parse_motd(info.get("motd_raw") or info.get("motd", "") or "", bedrock=info.get("edition") != "Java")
+            for info in infos
+        ]
+        plains = [runs_to_plain(r).strip() for r in runs]
+        if len(set(plains)) == 1:
+            spans = [(lo.x_text, lo.width - lo.padding)]
+            runs = runs[:1]
+        else:
+            spans = list(template.column_spans)
+        for motd_runs, (x0, x1) in zip(runs, spans):
+            font_body = self._load_font(FONT_SIZE_BODY, runs_to_plain(motd_runs))
+            self.styled_text.draw(image, (x0, y_motd), motd_runs, font_body, x1 - x0, max_lines, 26, theme.motd_color)
+        return image
+
+    def _render_history(self, draw: ImageDraw.ImageDraw, history: dict, template: CardTemplate, theme: CardTheme):
+        """在卡片底部绘制延迟与在线人数趋势图（边框已在模板中）"""
+        summary = history.get("summary", {})
+        charts = [
+            ("延迟", history["latency"], "latency", "ms", theme.accent_java),
+            ("在线", history["players"], "players", "", theme.players),
+        ]
+        for (label, values, field, unit, color), box in zip(charts, template.chart_boxes):
+            if f"{field}_avg" in summary:
+                caption = (f"{label} min/avg/max: {summary[f'{field}_min']:g}/"
+                           f"{summary[f'{field}_avg']:g}/{summary[f'{field}_max']:g}{unit}")
+            else:
+                caption = f"{label}: -"
+            draw.text((box[0], box[1] - 24), caption, font=self._load_font(FONT_SIZE_SMALL, caption),
+                      fill=theme.fg_secondary)
+            self._draw_sparkline(draw, box, values, color)
+
+    @staticmethod
+    def _draw_sparkline(draw: ImageDraw.ImageDraw, box: Tuple[int, int, int, int], values: List[float], color: tuple):
+        """绘制折线图，NaN 值处断开"""
+        x0, y0, x1, y1 = box
+        finite = [v for v in values if v == v]
+        if len(values) < 2 or not finite:
+            return
+        low, high = min(finite), max(finite)
+        span = (high - low) or 1.0
+        step = (x1 - x0) / (len(values) - 1)
+        segment: List[Tuple[float, float]] = []
+        for i, v in enumerate(values):
+            if v != v:
+                if len(segment) > 1:
+                    draw.line(segment, fill=color, width=2)
+                segment = []
+                continue
+            segment.append((x0 + i * step, y1 - 2 - (v - low) / span * (y1 - y0 - 4)))
+        if len(segment) > 1:
+            draw.line(segment, fill=color, width=2)
+
+    def _draw_offline_card(self, label: str, theme: Optional[CardTheme] = None) -> Image.Image:
+        """绘制批量查询中离线服务器的简短条目"""
+        theme = theme or self.default_theme
+        image = self.card_templates.offline(theme).copy()
+        draw = ImageDraw.Draw(image)
+        text = f"{label}    离线或无法连接"
+        draw.text((44, 16), text, font=self._load_font(FONT_SIZE_BODY, text), fill=theme.fg_secondary)
+        return image
+
+    def _draw_composite_card(self, entries: List[Tuple[str, List[dict]]],
+                             theme: Optional[CardTheme] = None, image_format: str = "png8") -> bytes:
+        """
+        将多个服务器的卡片纵向拼接为一张图片（在渲染线程中执行）
+        
+        Args:
+            entries: (地址标签, 已附加历史序列的探测结果列表)，结果为空表示离线
+            theme: 卡片主题
+            image_format: 输出格式
+            
+        Returns:
+            图片字节
+        """
+        theme = theme or self.default_theme
+        gap = 8
+        cards: List[Image.Image] = []
+        for label, infos in entries:
+            if infos:
+                cards.extend(self._draw_card_image(info, theme) for info in infos)
+            else:
+                cards.append(self._draw_offline_card(label, theme))
+        width = max(card.width for card in cards)
+        height = sum(card.height for card in cards) + gap * (len(cards) - 1)
+        composite = Image.new("RGBA", (width, height), theme.composite_background)
+        y = 0
+        for card in cards:
+            composite.paste(card, (0, y))
+            y += card.height + gap
+        return self._encode_image(composite, image_format)
+
+    def _encode_image(self, image: Image.Image, image_format: str = "png8") -> bytes:
+        """按输出格式编码图片，并记录编码耗时与输出大小"""
+        started = time.perf_counter()
+        encoded = self.encoder.encode(image, image_format)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.metrics.observe("encode", elapsed_ms)
+        self.metrics.observe(f"encode_{encoded.format}", elapsed_ms)
+        self.metrics.observe_size(f"card_{encoded.format}", len(encoded.data))
+        if self.encoder.max_bytes and len(encoded.data) > self.encoder.max_bytes:
+            self.metrics.incr("encode_over_budget")
+            logger.warning(f"卡片编码后 {len(encoded.data)} 字节，超出预算 {self.encoder.max_bytes} 字节")
+        return encoded.data
+
+    def _build_status_text(self, info: dict) -> str:
+        """生成状态文本摘要"""
         # 文本摘要（优化格式）
         motd = self._clean_motd_text(info.get("motd", "") or "")
         
@@ -457,6 +1601,34 @@ class MinecraftMOTDPlugin(Star):
         else:
             title = "MC 基岩版服务器状态查询"
         
+        status_text = (
+            f"{title}\n"
+            f"✅️状态: 在线\n"
+            f"📋描述: {motd}\n"
+            f"{self._status_detail_text(info)}"
+        )
+
+        return status_text
+
+    def _build_combined_text(self, infos: List[dict]) -> str:
+        """生成双版本卡片的文本摘要：MOTD 相同时只显示一次，其余字段按版本分段"""
+        motds = []
+        for info in infos:
+            motd = self._clean_motd_text(info.get("motd", "") or "")
+            motds.append(motd[:97] + "..." if len(motd) > 100 else motd)
+        lines = ["MC 服务器状态查询（Java 版与基岩版互通）", "✅️状态: 在线"]
+        if len(set(motds)) == 1:
+            lines.append(f"📋描述: {motds[0]}")
+        for info, motd in zip(infos, motds):
+            lines.append(f"【{'Java 版' if info['edition'] == 'Java' else '基岩版'}】")
+            if len(set(motds)) > 1:
+                lines.append(f"📋描述: {motd}")
+            lines.append(self._status_detail_text(info))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _status_detail_text(info: dict) -> str:
+        """协议、版本、延迟与在线人数四行"""
         # 处理玩家示例列表
         player_info = f"{info['players_online']}/{info['players_max']}"
         if info.get('player_names'):
@@ -464,129 +1636,93 @@ class MinecraftMOTDPlugin(Star):
             if len(info['player_names']) > 3:
                 sample_players += f" 等{len(info['player_names'])}人"
             player_info += f" ({sample_players})"
-        
-        status_text = (
-            f"{title}\n"
-            f"✅️状态: 在线\n"
-            f"📋描述: {motd}\n"
+        return (
             f"💳协议版本: {info.get('protocol', '-') or '-'}\n"
             f"🧰游戏版本: {info.get('version_name', '-') or '-'}\n"
             f"📡延迟: {info['latency_ms']} ms\n"
             f"👧玩家在线: {player_info}"
         )
 
-        return img_bytes, status_text
-
     def _load_server_icon(self, image: Image.Image, info: dict, x: int, y: int) -> bool:
         """加载服务器图标，返回是否成功"""
-        # 尝试加载服务器 favicon
-        if info.get("favicon_data_uri"):
-            try:
-                data_uri: str = info["favicon_data_uri"]
-                if data_uri.startswith("data:"):
-                    b64 = data_uri.split(",", 1)[1]
-                else:
-                    b64 = data_uri
-                icon = Image.open(BytesIO(base64.b64decode(b64))).convert("RGBA")
-                icon = icon.resize((96, 96))
+        # 尝试加载服务器 favicon（解码结果按哈希缓存，无效图标会被拒绝）
+        data_uri = info.get("favicon_data_uri")
+        if isinstance(data_uri, str) and data_uri:
+            icon = self.favicons.get(data_uri)
+            if icon is not None:
                 image.paste(icon, (x, y), icon)
                 return True
-            except Exception as e:
-                logger.info(f"加载服务器 favicon 失败: {e}")
-        
-        # 如果没有 favicon，尝试加载默认 Minecraft logo
-        try:
-            # 尝试从网络加载默认 logo
-            import requests
-            
-            default_logo_url = "https://patchwiki.biligame.com/images/mc/5/53/smk9nesqj6bkd5qyd718xxhocic6et0.png"
-            response = requests.get(default_logo_url, timeout=10)
-            if response.status_code == 200:
-                default_icon = Image.open(BytesIO(response.content)).convert("RGBA")
-                default_icon = default_icon.resize((96, 96))
-                image.paste(default_icon, (x, y), default_icon)
-                logger.info("使用默认 Minecraft logo")
-                return True
-        except Exception as e:
-            logger.info(f"加载默认 logo 失败: {e}")
         
-        return False
+        # 如果没有 favicon，使用启动时预加载的默认图标
+        default_icon = self.icon_assets.default_icon
+        image.paste(default_icon, (x, y), default_icon)
+        return True
 
-    def _render_content(self, draw: ImageDraw.ImageDraw, info: dict, x_text: int, y: int,
-                      font_title: ImageFont.ImageFont, font_body: ImageFont.ImageFont, 
-                      font_small: ImageFont.ImageFont, fg_primary: tuple, fg_secondary: tuple, 
-                      accent: tuple, width: int, padding: int):
-        """渲染内容区域"""
-        # 标题行：host:port 与 Edition 徽标
+    def _render_content(self, image: Image.Image, draw: ImageDraw.ImageDraw, info: dict,
+                        template: CardTemplate, theme: CardTheme):
+        """渲染内容区域的动态字段（徽标与标签已在模板中）"""
+        lo = CARD_LAYOUT
+        x_text = lo.x_text
+        # 标题行：host:port
         title = f"{info['host']}:{info['port']}"
-        draw.text((x_text, y), title, font=font_title, fill=fg_primary)
-
-        edition_badge = f"{info['edition']}"
-        badge_w, badge_h = draw.textbbox((0, 0), edition_badge, font=font_small)[2:]
-        badge_x = x_text
-        badge_y = y + 34
-        # 徽标背景
-        draw.rounded_rectangle([badge_x, badge_y, badge_x + badge_w + 12, badge_y + badge_h + 8], radius=6, fill=accent)
-        draw.text((badge_x + 6, badge_y + 4), edition_badge, font=font_small, fill=(255, 255, 255))
-
-        # 第二行：延迟 / 协议 / 版本
-        y_info = badge_y + badge_h + 20
-        line2 = f"延迟: {info['latency_ms']} ms    协议: {info.get('protocol', '-') or '-'}    版本: {info.get('version_name', '-') or '-'}"
-        draw.text((x_text, y_info), line2, font=font_body, fill=fg_secondary)
-
-        # 第三行：在线人数
-        y_players = y_info + 28
-        players_line = f"在线: {info['players_online']} / {info['players_max']}"
-        draw.text((x_text, y_players), players_line, font=font_body, fill=fg_secondary)
+        draw.text((x_text, lo.padding), title, font=self._load_font(FONT_SIZE_TITLE, title), fill=theme.fg_primary)
+
+        # 第二行：延迟 / 协议 / 版本，第三行：在线人数
+        version = str(info.get("version_name", "-") or "-")
+        values = [
+            ("延迟:", f"{info['latency_ms']} ms"),
+            ("协议:", str(info.get("protocol", "-") or "-")),
+            ("版本:", version),
+            ("在线:", f"{info['players_online']} / {info['players_max']}"),
+        ]
+        for label, value in values:
+            x, y = template.value_pos[label]
+            # 与标签使用同一字体，保持同一行的基线一致
+            font = self._load_font(FONT_SIZE_BODY, label + value)
+            if label == "版本:":
+                lines = self._wrap_text(value, font, lo.width - lo.padding - x, 1)
+                value = lines[0] if lines else ""
+            draw.text((x, y), value, font=font, fill=theme.fg_secondary)
 
         # 玩家示例列表（Java 有 sample）
-        if info.get("player_names"):
-            sample_text = ", ".join(info["player_names"][:10])
-            draw.text((x_text, y_players + 26), f"在线玩家: {sample_text}", font=font_small, fill=fg_secondary)
+        sample_text = self._player_sample_text(info)
+        if sample_text:
+            draw.text((x_text, template.y_players + 26), sample_text,
+                      font=self._load_font(FONT_SIZE_SMALL, sample_text), fill=theme.fg_secondary)
 
-        # MOTD 描述（多行，先清洗颜色码与换行）
-        motd = self._clean_motd_text(info.get("motd", "") or "")
-        y_motd = y_players + 60
-        max_width = width - x_text - padding
-        for line in self._wrap_text(draw, motd, font_body, max_width):
-            draw.text((x_text, y_motd), line, font=font_body, fill=fg_primary)
-            y_motd += 26
+        # MOTD 描述（多行，按 § 代码与 JSON 文本组件的颜色和格式绘制）
+        raw = info.get("motd_raw")
+        runs = parse_motd(raw if raw else info.get("motd", "") or "", bedrock=info.get("edition") != "Java")
+        y_motd = template.y_motd
+        max_width = lo.width - x_text - lo.padding
+        max_lines = max(0, (lo.height - lo.padding - y_motd) // 26)
+        font_body = self._load_font(FONT_SIZE_BODY, runs_to_plain(runs))
+        self.styled_text.draw(
+            image, (x_text, y_motd), runs, font_body, max_width, max_lines, 26, theme.motd_color
+        )
+
+    @staticmethod
+    def _player_sample_text(info: dict) -> str:
+        """卡片上的玩家示例列表（最多 10 个名字），没有 sample 时为空字符串"""
+        if not info.get("player_names"):
+            return ""
+        return f"在线玩家: {', '.join(info['player_names'][:10])}"
 
-    def _wrap_text(self, draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+    def _wrap_text(self, text: str, font: ImageFont.ImageFont, max_width: int,
+                   max_lines: Optional[int] = None) -> List[str]:
         """
-        按指定宽度折行文本
+        按指定宽度折行文本（字形宽度按字体缓存，线性时间）
         
         Args:
-            draw: PIL 绘图对象
             text: 要折行的文本
             font: 字体对象
             max_width: 最大宽度
+            max_lines: 最多行数，超出部分以省略号截断
             
         Returns:
             折行后的文本列表
         """
-        if not text:
-            return []
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
-        result_lines: List[str] = []
-        for paragraph in text.split("\n"):
-            if paragraph == "":
-                # 保留空行
-                result_lines.append("")
-                continue
-            current_line = ""
-            for ch in paragraph:
-                test_line = current_line + ch
-                # 仅测量单行文本宽度，避免包含换行符
-                if draw.textlength(test_line, font=font) <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        result_lines.append(current_line)
-                    current_line = ch
-            if current_line:
-                result_lines.append(current_line)
-        return result_lines
+        return wrap_text(text, font, max_width, self.glyph_widths, max_lines)
 
     def _clean_motd_text(self, text) -> str:
         """
@@ -620,23 +1756,19 @@ class MinecraftMOTDPlugin(Star):
         except Exception:
             return text
 
+    def _image_component(self, img_bytes: bytes) -> Comp.Image:
+        """根据配置构造图片消息段：优先直接发送内存数据，必要时写入临时目录"""
+        if self.image_transport == "file":
+            file_path = self._save_temp_image(img_bytes)
+            logger.info(f"发送 Minecraft MOTD 本地渲染图片: {file_path}")
+            return Comp.Image(file_path)
+        return Comp.Image.fromBytes(img_bytes)
+
     def _save_temp_image(self, img_bytes: bytes) -> str:
-        """保存临时图片文件"""
+        """保存临时图片文件（由 ImageSpool 统一回收）"""
         try:
-            with tempfile.NamedTemporaryFile(prefix="motd_", suffix=".png", delete=False) as tmp:
-                tmp.write(img_bytes)
-                tmp.flush()
-                return tmp.name
+            with self.metrics.timer("spool_write"):
+                return self.spool.write(img_bytes, sniff_suffix(img_bytes))
         except Exception as e:
             logger.error(f"保存临时图片失败: {e}")
             raise
-
-    async def _cleanup_file(self, path: str, delay_sec: float = 60.0):
-        """异步清理临时文件"""
-        try:
-            await asyncio.sleep(delay_sec)
-            if os.path.exists(path):
-                os.remove(path)
-                logger.info(f"临时文件已清理: {os.path.basename(path)}")
-        except Exception as e:
-            logger.warning(f"临时文件清理失败 {os.path.basename(path)}: {e}")
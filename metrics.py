@@ -0,0 +1,226 @@
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+
+# 直方图桶上界（毫秒）
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# 输出大小直方图桶上界（字节）
+BUCKETS_BYTES = (4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+
+class Histogram:
+    """固定桶的直方图（耗时或字节数）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_MS):
+        self.buckets = buckets
+        # 最后一个桶为 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数，返回所在桶的上界（不超过观测到的最大值）"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.stage, (time.perf_counter() - self.started) * 1000)
+
+
+class Metrics:
+    """
+    进程内的轻量指标
+
+    各阶段耗时汇总为直方图，另有计数器与按需读取的瞬时值（回调）。
+    绘制与编码在渲染线程中计时，因此记录时加锁。
+    """
+
+    def __init__(self, prefix: str = "motd"):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self._histograms: Dict[str, Histogram] = {}
+        self._sizes: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+        self._dump_task: Optional[asyncio.Task] = None
+
+    def timer(self, stage: str) -> _Timer:
+        """
+        计时上下文，退出时记录耗时
+
+        用法:
+            with self.metrics.timer("dns"):
+                ...
+        """
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, value_ms: float) -> None:
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram()
+            hist.observe(value_ms)
+
+    def observe_size(self, name: str, size_bytes: int) -> None:
+        """记录一次输出大小（如编码后的卡片字节数）"""
+        with self._lock:
+            hist = self._sizes.get(name)
+            if hist is None:
+                hist = self._sizes[name] = Histogram(BUCKETS_BYTES)
+            hist.observe(size_bytes)
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, fn: Callable[[], float]) -> None:
+        """注册瞬时值，读取指标时调用 fn 取值"""
+        self._gauges[name] = fn
+
+    def format_text(self) -> str:
+        """生成 /motd_stats 的文本报告"""
+        lines = [f"MOTD 插件运行指标（已运行 {round(time.time() - self.started_at)} 秒）"]
+        with self._lock:
+            stages = sorted(self._histograms.items())
+            sizes = sorted(self._sizes.items())
+            counters = sorted(self._counters.items())
+        if stages:
+            lines.append("阶段耗时 (次数 / 平均 / p50 / p95 / p99 / 最大, ms):")
+            for stage, hist in stages:
+                lines.append(
+                    f"- {stage}: {hist.count} / {hist.mean:.1f} / {hist.quantile(0.5):g} / "
+                    f"{hist.quantile(0.95):g} / {hist.quantile(0.99):g} / {hist.max:.1f}"
+                )
+        if sizes:
+            lines.append("输出大小 (次数 / 平均 / p50 / p95 / 最大, KB):")
+            for name, hist in sizes:
+                lines.append(
+                    f"- {name}: {hist.count} / {hist.mean / 1024:.1f} / {hist.quantile(0.5) / 1024:.1f} / "
+                    f"{hist.quantile(0.95) / 1024:.1f} / {hist.max / 1024:.1f}"
+                )
+        gauges = self._read_gauges()
+        if gauges:
+            lines.append("状态:")
+            lines.extend(f"- {name}: {_format_value(value)}" for name, value in gauges)
+        if counters:
+            lines.append("计数:")
+            lines.extend(f"- {name}: {value}" for name, value in counters)
+        return "\n".join(lines)
+
+    def format_prometheus(self) -> str:
+        """生成 Prometheus 文本格式"""
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            stages = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            if stages:
+                lines.append(f"# HELP {p}_stage_duration_ms 各阶段耗时（毫秒）")
+                lines.append(f"# TYPE {p}_stage_duration_ms histogram")
+            for stage, hist in stages:
+                cumulative = 0
+                for bound, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{p}_stage_duration_ms_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{p}_stage_duration_ms_sum{{stage="{stage}"}} {hist.sum:.3f}')
+                lines.append(f'{p}_stage_duration_ms_count{{stage="{stage}"}} {hist.count}')
+            sizes = sorted(self._sizes.items())
+            if sizes:
+                lines.append(f"# HELP {p}_output_bytes 编码输出大小（字节）")
+                lines.append(f"# TYPE {p}_output_bytes histogram")
+            for name, hist in sizes:
+                cumulative = 0
+                for bound, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{p}_output_bytes_bucket{{output="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{p}_output_bytes_sum{{output="{name}"}} {hist.sum:.0f}')
+                lines.append(f'{p}_output_bytes_count{{output="{name}"}} {hist.count}')
+        for name, value in counters:
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        for name, value in self._read_gauges():
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """以 Prometheus 文本格式原子写入文件"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.format_prometheus())
+        os.replace(tmp_path, path)
+
+    def start(self, path: str, interval: float = 60.0) -> None:
+        """定期将指标写入 path（文本导出器 / node_exporter textfile 方式采集）"""
+        if self._dump_task is None or self._dump_task.done():
+            self._dump_task = asyncio.create_task(self._dump_loop(path, interval))
+
+    async def close(self) -> None:
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            self._dump_task = None
+
+    async def _dump_loop(self, path: str, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.dump, path)
+            except Exception as e:
+                logger.warning(f"写入指标文件失败: {e}")
+
+    def _read_gauges(self) -> List[Tuple[str, float]]:
+        values = []
+        for name, fn in sorted(self._gauges.items()):
+            try:
+                values.append((name, float(fn())))
+            except Exception as e:
+                logger.warning(f"读取指标 {name} 失败: {e}")
+        return values
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.3f}" if value < 1 else f"{value:.1f}"
@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ExecutorFull(Exception):
+    """线程池已满"""
+
+
+class RenderQueueFull(ExecutorFull):
+    """渲染队列已满"""
+
+
+class BoundedExecutor:
+    """
+    有界线程池
+
+    正在执行与排队的任务总数超过上限时直接拒绝。计数在线程中的任务真正结束时才减少，
+    即使调用方因超时放弃等待，仍在运行的任务也会继续占用名额，线程池不会被悄悄占满。
+    """
+
+    full_error = ExecutorFull
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, name: str = "motd_worker"):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def pending(self) -> int:
+        """正在执行与排队中的任务数"""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def is_full(self) -> bool:
+        return self._pending >= self.capacity
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        在线程池中执行函数
+
+        Args:
+            fn: 要执行的同步函数
+            timeout: 等待结果的超时（秒），None 表示一直等待
+
+        Raises:
+            ExecutorFull: 队列已满
+            asyncio.TimeoutError: 等待超时
+        """
+        if self.is_full():
+            self.rejected += 1
+            raise self.full_error(f"{self.name} 队列已满 ({self._pending}/{self.capacity})")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        loop = asyncio.get_running_loop()
+        # 计数只在事件循环线程中修改，无需加锁
+        self._pending += 1
+        future = loop.run_in_executor(self._executor, fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _release(self, future: "asyncio.Future[Any]") -> None:
+        self._pending -= 1
+        if not future.cancelled():
+            # 调用方放弃等待后，避免未读取的异常产生告警
+            future.exception()
+
+
+class RenderPool(BoundedExecutor):
+    """
+    有界渲染线程池
+
+    PIL 绘制与 PNG 编码在工作线程中执行，事件循环只等待结果。
+    队列已满时抛出 RenderQueueFull，由调用方降级为纯文本回复。
+    """
+
+    full_error = RenderQueueFull
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8):
+        super().__init__(max_workers, max_queue, name="motd_render")
@@ -0,0 +1,253 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:  # dnspython 由 mcstatus 引入，缺失时退回系统解析
+    dns = None
+
+
+class ResolveError(Exception):
+    """域名解析失败"""
+
+
+class NXDomainError(ResolveError):
+    """域名不存在"""
+
+
+@dataclass
+class ResolvedAddress:
+    """
+    解析结果
+
+    Attributes:
+        host: 用户输入的地址
+        java_host: Java 版实际连接的主机名（SRV 目标或原地址）
+        java_port: SRV 记录给出的端口，没有 SRV 时为 None
+        addresses: host 的 IP 地址列表（IPv4 在前）
+    """
+    host: str
+    java_host: str
+    java_port: Optional[int] = None
+    addresses: List[str] = field(default_factory=list)
+
+    @property
+    def ip(self) -> str:
+        return self.addresses[0] if self.addresses else self.host
+
+
+class DnsPythonBackend:
+    """基于 dnspython 异步解析器的查询后端，返回记录及其 TTL"""
+
+    async def query(self, name: str, rdtype: str, timeout: float) -> Tuple[List[Any], Optional[int]]:
+        try:
+            answer = await dns.asyncresolver.resolve(name, rdtype, lifetime=timeout)
+        except dns.resolver.NXDOMAIN as e:
+            raise NXDomainError(name) from e
+        except dns.resolver.NoAnswer:
+            return [], None
+        except dns.exception.Timeout as e:
+            raise asyncio.TimeoutError() from e
+        except dns.exception.DNSException as e:
+            raise ResolveError(f"{name} {rdtype}: {e}") from e
+
+        ttl = answer.rrset.ttl if answer.rrset is not None else None
+        if rdtype == "SRV":
+            records = [(r.priority, r.weight, str(r.target).rstrip("."), r.port) for r in answer]
+        else:
+            records = [r.address for r in answer]
+        return records, ttl
+
+
+class SystemBackend:
+    """使用系统 getaddrinfo 的查询后端（无 SRV 支持，也无法获知 TTL）"""
+
+    async def query(self, name: str, rdtype: str, timeout: float) -> Tuple[List[Any], Optional[int]]:
+        if rdtype == "SRV":
+            return [], None
+        family = socket.AF_INET if rdtype == "A" else socket.AF_INET6
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(name, None, family=family, type=socket.SOCK_STREAM), timeout
+            )
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+                if rdtype == "A":
+                    raise NXDomainError(name) from e
+                return [], None
+            raise ResolveError(f"{name} {rdtype}: {e}") from e
+        return list(dict.fromkeys(info[4][0] for info in infos)), None
+
+
+class AsyncResolver:
+    """
+    异步 DNS 解析器
+
+    一次解析同时得到 Java 版需要的 _minecraft._tcp SRV 记录和两个版本共用的
+    A/AAAA 记录。结果按记录 TTL 缓存，NXDOMAIN 与空记录按 negative_ttl 缓存。
+    """
+
+    def __init__(self, backend: Optional[Any] = None, negative_ttl: float = 60.0,
+                 default_ttl: float = 300.0, min_ttl: float = 5.0, max_ttl: float = 3600.0):
+        if backend is None:
+            backend = DnsPythonBackend() if dns is not None else SystemBackend()
+        self.backend = backend
+        self.negative_ttl = negative_ttl
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        # (name, rdtype) -> (expires_at, records 或 NXDomainError)
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str, srv: bool, timeout: float) -> ResolvedAddress:
+        """
+        解析服务器地址
+
+        Args:
+            host: 服务器地址（域名或 IP）
+            srv: 是否查询 _minecraft._tcp SRV 记录（未指定端口时）
+            timeout: 解析超时，计入探测总时限
+
+        Returns:
+            解析结果
+
+        Raises:
+            NXDomainError: 域名不存在
+            ResolveError: 其他解析错误
+            asyncio.TimeoutError: 解析超时
+        """
+        if _is_ip(host):
+            return ResolvedAddress(host=host, java_host=host, addresses=[host])
+
+        name = host.rstrip(".").lower()
+        return await asyncio.wait_for(self._resolve(name, host, srv, timeout), timeout)
+
+    async def _resolve(self, name: str, host: str, srv: bool, timeout: float) -> ResolvedAddress:
+        queries = [self._query(name, "A", timeout), self._query(name, "AAAA", timeout)]
+        if srv:
+            queries.append(self._query(f"_minecraft._tcp.{name}", "SRV", timeout))
+        results = await asyncio.gather(*queries, return_exceptions=True)
+
+        a_records, aaaa_records = results[0], results[1]
+        srv_records = results[2] if srv else []
+        if isinstance(a_records, NXDomainError):
+            raise a_records
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, (ResolveError, asyncio.TimeoutError)):
+                raise result
+
+        addresses: List[str] = []
+        for records in (a_records, aaaa_records):
+            if isinstance(records, list):
+                addresses.extend(records)
+
+        resolved = ResolvedAddress(host=host, java_host=host, addresses=addresses)
+        if isinstance(srv_records, list) and srv_records:
+            _, _, target, port = min(srv_records, key=lambda r: (r[0], -r[1]))
+            resolved.java_host = target
+            resolved.java_port = port
+            logger.info(f"SRV 记录: {host} -> {target}:{port}")
+
+        if not addresses and resolved.java_port is None:
+            errors = [r for r in (a_records, aaaa_records) if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+            raise NXDomainError(host)
+        return resolved
+
+    async def _query(self, name: str, rdtype: str, timeout: float) -> List[Any]:
+        key = (name, rdtype)
+        now = time.time()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self.hits += 1
+            if isinstance(cached[1], NXDomainError):
+                raise cached[1]
+            return cached[1]
+        self.misses += 1
+
+        try:
+            records, ttl = await self.backend.query(name, rdtype, timeout)
+        except NXDomainError as e:
+            self._cache[key] = (time.time() + self.negative_ttl, e)
+            raise
+        if not records:
+            ttl = self.negative_ttl
+        elif ttl is None:
+            ttl = self.default_ttl
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        self._cache[key] = (time.time() + ttl, records)
+        self._prune()
+        return records
+
+    def snapshot(self) -> List[Tuple[str, Any, float]]:
+        """
+        导出未过期的缓存记录，用于启动快照
+
+        Returns:
+            [("rdtype name", {"nx": 是否为 NXDOMAIN, "records": 记录}, 过期时间)]
+        """
+        now = time.time()
+        entries = []
+        for (name, rdtype), (expires_at, records) in self._cache.items():
+            if expires_at <= now:
+                continue
+            nx = isinstance(records, NXDomainError)
+            entries.append((f"{rdtype} {name}", {"nx": nx, "records": [] if nx else list(records)}, expires_at))
+        return entries
+
+    def restore(self, entries: List[Tuple[str, Any, float]]) -> int:
+        """
+        恢复 snapshot() 导出的记录；已过期、格式不符或已在缓存中的条目被跳过
+
+        Returns:
+            恢复的条目数
+        """
+        now = time.time()
+        restored = 0
+        for key, value, expires_at in entries:
+            rdtype, _, name = key.partition(" ")
+            if rdtype not in ("A", "AAAA", "SRV") or not name or expires_at <= now or (name, rdtype) in self._cache:
+                continue
+            try:
+                if value.get("nx"):
+                    records: Any = NXDomainError(name)
+                elif rdtype == "SRV":
+                    records = [(int(p), int(w), str(t), int(port)) for p, w, t, port in value["records"]]
+                else:
+                    records = [str(ipaddress.ip_address(r)) for r in value["records"]]
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            # 恢复的 TTL 不超过 max_ttl
+            self._cache[(name, rdtype)] = (min(expires_at, now + self.max_ttl), records)
+            restored += 1
+        self._prune()
+        return restored
+
+    def _prune(self, limit: int = 4096) -> None:
+        if len(self._cache) <= limit:
+            return
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[key]
+        while len(self._cache) > limit:
+            self._cache.pop(next(iter(self._cache)))
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,131 @@
+import asyncio
+import glob
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from astrbot.api import logger
+
+from .image_encoder import SUFFIXES
+
+
+# 只匹配卡片可能使用的后缀，避免误删系统临时目录中同名前缀的其他文件
+SPOOL_PATTERNS = tuple(f"motd_*{suffix}" for suffix in sorted(set(SUFFIXES.values())))
+
+
+class ImageSpool:
+    """
+    临时图片目录
+
+    所有卡片图片写入同一个目录，由单个清理任务按过期时间回收，
+    并受磁盘配额限制（超出时先删除最旧的文件）。启动时清理上次遗留的文件。
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_sec: float = 60.0, reap_interval: float = 15.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.reap_interval = reap_interval
+        # path -> (写入时间, 字节数)
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def cleanup_leftovers(self, extra_dirs: Iterable[str] = (), min_age_sec: float = 60.0) -> int:
+        """
+        删除上次运行遗留的图片（同步，需在线程中调用）
+
+        Args:
+            extra_dirs: 额外需要检查的目录（例如旧版本使用的系统临时目录）
+            min_age_sec: 只删除早于该时间的文件，避免误删其他进程正在使用的文件
+
+        Returns:
+            删除的文件数
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        removed = 0
+        now = time.time()
+        for directory in [self.directory, *extra_dirs]:
+            paths = [path for pattern in SPOOL_PATTERNS for path in glob.glob(os.path.join(directory, pattern))]
+            for path in paths:
+                try:
+                    if directory == self.directory or now - os.path.getmtime(path) >= min_age_sec:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logger.info(f"已清理遗留的临时图片 {removed} 个")
+        return removed
+
+    def write(self, img_bytes: bytes, suffix: str = ".png") -> str:
+        """
+        写入一张图片并返回文件路径
+
+        超出磁盘配额时先删除最旧的文件。
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="motd_", suffix=suffix, dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(img_bytes)
+        with self._lock:
+            self._files[path] = (time.time(), len(img_bytes))
+            self._total += len(img_bytes)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                oldest = next(iter(self._files))
+                self._remove(oldest)
+        return path
+
+    def start(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        with self._lock:
+            for path in list(self._files):
+                self._remove(path)
+
+    def reap(self) -> int:
+        """删除已过期的文件，返回删除数量"""
+        deadline = time.time() - self.ttl_sec
+        removed = 0
+        with self._lock:
+            while self._files:
+                path, (created, _) = next(iter(self._files.items()))
+                if created > deadline:
+                    break
+                self._remove(path)
+                removed += 1
+        return removed
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                removed = self.reap()
+                if removed:
+                    logger.info(f"临时图片已清理: {removed} 个")
+            except Exception as e:
+                logger.warning(f"临时图片清理失败: {e}")
+
+    def _remove(self, path: str) -> None:
+        _, size = self._files.pop(path, (0, 0))
+        self._total -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"临时文件清理失败 {os.path.basename(path)}: {e}")
@@ -0,0 +1,332 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .text_layout import ELLIPSIS, wrap_spans
+
+
+Color = Tuple[int, int, int]
+
+NAMED_COLORS = {
+    "black": (0, 0, 0),
+    "dark_blue": (0, 0, 170),
+    "dark_green": (0, 170, 0),
+    "dark_aqua": (0, 170, 170),
+    "dark_red": (170, 0, 0),
+    "dark_purple": (170, 0, 170),
+    "gold": (255, 170, 0),
+    "gray": (170, 170, 170),
+    "dark_gray": (85, 85, 85),
+    "blue": (85, 85, 255),
+    "green": (85, 255, 85),
+    "aqua": (85, 255, 255),
+    "red": (255, 85, 85),
+    "light_purple": (255, 85, 255),
+    "yellow": (255, 255, 85),
+    "white": (255, 255, 255),
+}
+
+LEGACY_COLORS = dict(zip("0123456789abcdef", NAMED_COLORS.values()))
+
+# 基岩版额外的颜色代码（基岩版中 §m §n 是颜色而不是删除线/下划线）
+BEDROCK_COLORS = {
+    "g": (221, 214, 5),
+    "h": (227, 212, 209),
+    "i": (206, 202, 202),
+    "j": (68, 58, 59),
+    "m": (151, 22, 7),
+    "n": (180, 104, 77),
+    "p": (222, 177, 45),
+    "q": (71, 160, 54),
+    "s": (44, 186, 168),
+    "t": (33, 73, 123),
+    "u": (154, 92, 198),
+    "v": (235, 113, 20),
+}
+
+LEGACY_FORMATS = {"k": "obfuscated", "l": "bold", "m": "strikethrough", "n": "underlined", "o": "italic"}
+
+_HEX_RE = re.compile(r"#?([0-9a-fA-F]{6})")
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    """一段文字的颜色与格式，color 为 None 时使用默认颜色"""
+    color: Optional[Color] = None
+    bold: bool = False
+    italic: bool = False
+    underlined: bool = False
+    strikethrough: bool = False
+    obfuscated: bool = False
+
+
+PLAIN = TextStyle()
+
+StyledRun = Tuple[str, TextStyle]
+
+
+def parse_color(value: Any) -> Optional[Color]:
+    """解析 JSON 文本组件中的颜色（名称或 #RRGGBB）"""
+    if not isinstance(value, str):
+        return None
+    if value in NAMED_COLORS:
+        return NAMED_COLORS[value]
+    match = _HEX_RE.fullmatch(value)
+    if match:
+        h = match.group(1)
+        return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+    return None
+
+
+def parse_legacy(text: str, base: TextStyle = PLAIN, bedrock: bool = False) -> List[StyledRun]:
+    """
+    解析带 § 代码的文本
+
+    颜色代码会清除之前的格式（与游戏内一致），§r 恢复为 base 样式，
+    支持 BungeeCord 的 §x§R§R§G§G§B§B 十六进制颜色。
+    """
+    runs: List[StyledRun] = []
+    style = base
+    buf: List[str] = []
+    i, n = 0, len(text)
+
+    def flush() -> None:
+        if buf:
+            runs.append(("".join(buf), style))
+            buf.clear()
+
+    while i < n:
+        ch = text[i]
+        if ch != "§" or i + 1 >= n:
+            buf.append(ch)
+            i += 1
+            continue
+        code = text[i + 1].lower()
+        if code == "x" and i + 14 <= n and all(text[j] == "§" for j in range(i + 2, i + 14, 2)):
+            color = parse_color("".join(text[j] for j in range(i + 3, i + 14, 2)))
+            if color is not None:
+                flush()
+                style = TextStyle(color=color)
+                i += 14
+                continue
+        flush()
+        if bedrock and code in BEDROCK_COLORS:
+            style = TextStyle(color=BEDROCK_COLORS[code])
+        elif code in LEGACY_COLORS:
+            style = TextStyle(color=LEGACY_COLORS[code])
+        elif code in LEGACY_FORMATS:
+            style = replace(style, **{LEGACY_FORMATS[code]: True})
+        elif code == "r":
+            style = base
+        i += 2
+    flush()
+    return runs
+
+
+def parse_component(component: Any, base: TextStyle = PLAIN, depth: int = 0) -> List[StyledRun]:
+    """
+    解析 JSON 文本组件（text / extra / color / bold 等），子组件继承父组件样式
+
+    组件中的字符串仍可能包含 § 代码，一并解析。
+    """
+    if depth > 32:
+        return []
+    if isinstance(component, str):
+        return parse_legacy(component, base)
+    if isinstance(component, list):
+        runs: List[StyledRun] = []
+        for child in component:
+            runs.extend(parse_component(child, base, depth + 1))
+        return runs
+    if not isinstance(component, dict):
+        return [(str(component), base)] if component is not None else []
+
+    style = base
+    color = parse_color(component.get("color"))
+    if color is not None:
+        style = replace(style, color=color)
+    for name in ("bold", "italic", "underlined", "strikethrough", "obfuscated"):
+        if name in component:
+            style = replace(style, **{name: bool(component[name])})
+
+    text = component.get("text")
+    if text is None:
+        text = component.get("translate", "")
+    runs = parse_legacy(str(text), style) if text else []
+    for child in component.get("extra", []) or []:
+        runs.extend(parse_component(child, style, depth + 1))
+    return runs
+
+
+def parse_motd(raw: Any, bedrock: bool = False) -> List[StyledRun]:
+    """
+    将 MOTD 解析为带样式的文字段
+
+    Args:
+        raw: 服务器返回的原始 MOTD：JSON 文本组件（dict / list / JSON 字符串）或带 § 代码的字符串
+        bedrock: 是否按基岩版的颜色代码解析
+    """
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        stripped = raw.strip()
+        if stripped[:1] in ("{", "[") and not bedrock:
+            try:
+                return parse_component(json.loads(stripped))
+            except ValueError:
+                pass
+        return parse_legacy(raw.replace("\r\n", "\n").replace("\r", "\n"), bedrock=bedrock)
+    if isinstance(raw, (dict, list)):
+        return parse_component(raw)
+    return parse_legacy(str(raw), bedrock=bedrock)
+
+
+def runs_to_plain(runs: List[StyledRun]) -> str:
+    return "".join(text for text, _ in runs)
+
+
+class GlyphAtlas:
+    """
+    字形蒙版缓存
+
+    以 (字体, 字符, 是否斜体) 为键缓存灰度蒙版、绘制偏移与前进宽度。
+    颜色在贴图时以纯色 + 蒙版的方式施加，因此同一字形的所有颜色共用一份蒙版。
+    在渲染线程中使用，访问时加锁。
+    """
+
+    ITALIC_SHEAR = 0.2
+
+    def __init__(self, max_glyphs: int = 8192):
+        self.max_glyphs = max_glyphs
+        self._glyphs: "OrderedDict[tuple, Tuple[Optional[Image.Image], Tuple[int, int], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._glyphs)
+
+    def glyph(self, font: ImageFont.ImageFont, ch: str, italic: bool = False
+              ) -> Tuple[Optional[Image.Image], Tuple[int, int], float]:
+        """
+        Returns:
+            (蒙版或 None（空白字符）, 相对文字原点的偏移, 前进宽度)
+        """
+        key = (font, ch, italic)
+        with self._lock:
+            entry = self._glyphs.get(key)
+            if entry is not None:
+                self._glyphs.move_to_end(key)
+                return entry
+        entry = self._build(font, ch, italic)
+        with self._lock:
+            self._glyphs[key] = entry
+            while len(self._glyphs) > self.max_glyphs:
+                self._glyphs.popitem(last=False)
+        return entry
+
+    def _build(self, font: ImageFont.ImageFont, ch: str, italic: bool):
+        advance = font.getlength(ch)
+        left, top, right, bottom = font.getbbox(ch)
+        if right <= left or bottom <= top:
+            return None, (0, 0), advance
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), ch, font=font, fill=255)
+        if italic:
+            w, h = mask.size
+            shift = int(h * self.ITALIC_SHEAR + 0.5)
+            mask = mask.transform(
+                (w + shift, h), Image.AFFINE, (1, self.ITALIC_SHEAR, -shift, 0, 1, 0), resample=Image.BILINEAR
+            )
+        return mask, (left, top), advance
+
+
+class StyledTextRenderer:
+    """
+    带样式文字的排版与绘制
+
+    折行使用 text_layout.wrap_spans（字宽包含粗体偏移），
+    每个字符从字形缓存中取蒙版贴到画布上；粗体按游戏的方式向右偏移 1 像素再贴一次。
+    """
+
+    def __init__(self, atlas: Optional[GlyphAtlas] = None):
+        self.atlas = atlas or GlyphAtlas()
+
+    def draw(self, image: Image.Image, xy: Tuple[int, int], runs: List[StyledRun], font: ImageFont.ImageFont,
+             max_width: float, max_lines: int, line_height: int, default_color: Color) -> int:
+        """
+        绘制带样式的多行文字
+
+        Args:
+            image: 画布
+            xy: 左上角位置
+            runs: parse_motd 的结果
+            font: 字体
+            max_width: 最大行宽
+            max_lines: 最多行数，超出部分以省略号截断
+            line_height: 行高
+            default_color: 未指定颜色时的文字颜色
+
+        Returns:
+            实际绘制的行数
+        """
+        chars: List[str] = []
+        styles: List[TextStyle] = []
+        for text, style in runs:
+            chars.extend(text)
+            styles.extend([style] * len(text))
+        if not chars or max_lines <= 0:
+            return 0
+
+        advances = [0.0 if ch == "\n" else self._advance(font, ch, st) for ch, st in zip(chars, styles)]
+        lines, truncated = wrap_spans("".join(chars), advances, max_width, max_lines)
+        draw = ImageDraw.Draw(image)
+        ascent = font.getmetrics()[0]
+        x0, y = xy
+        for index, (start, end) in enumerate(lines):
+            glyphs = [(chars[i], styles[i], advances[i]) for i in range(start, end)]
+            if truncated and index == len(lines) - 1:
+                glyphs = self._fit_ellipsis(glyphs, font, max_width, styles[end - 1] if end > start else PLAIN)
+            x = float(x0)
+            for ch, style, advance in glyphs:
+                color = style.color or default_color
+                self._paste(image, font, ch, style, color, int(x), y)
+                if style.underlined:
+                    draw.line([(x, y + ascent + 1), (x + advance, y + ascent + 1)], fill=color, width=1)
+                if style.strikethrough:
+                    mid = y + int(ascent * 0.6)
+                    draw.line([(x, mid), (x + advance, mid)], fill=color, width=1)
+                x += advance
+            y += line_height
+        return len(lines)
+
+    def _advance(self, font: ImageFont.ImageFont, ch: str, style: TextStyle) -> float:
+        advance = self.atlas.glyph(font, ch, style.italic)[2]
+        return advance + 1 if style.bold and not ch.isspace() else advance
+
+    def _paste(self, image: Image.Image, font: ImageFont.ImageFont, ch: str, style: TextStyle,
+               color: Color, x: int, y: int) -> None:
+        mask, (dx, dy), _ = self.atlas.glyph(font, ch, style.italic)
+        if mask is None:
+            return
+        box = (x + dx, y + dy, x + dx + mask.width, y + dy + mask.height)
+        image.paste(color, box, mask)
+        if style.bold:
+            image.paste(color, (box[0] + 1, box[1], box[2] + 1, box[3]), mask)
+
+    def _fit_ellipsis(self, glyphs: List[Tuple[str, TextStyle, float]], font: ImageFont.ImageFont,
+                      max_width: float, style: TextStyle) -> List[Tuple[str, TextStyle, float]]:
+        dots = [(ch, style, self._advance(font, ch, style)) for ch in ELLIPSIS]
+        budget = max_width - sum(a for _, _, a in dots)
+        kept, width = [], 0.0
+        for glyph in glyphs:
+            width += glyph[2]
+            if width > budget:
+                break
+            kept.append(glyph)
+        while kept and kept[-1][0].isspace():
+            kept.pop()
+        return kept + dots
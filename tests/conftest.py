@@ -0,0 +1,92 @@
+"""
+测试公共配置
+
+插件目录以包的形式导入（名为 motd_plugin），保证模块间的相对导入可用。
+未安装 AstrBot 时注册一个最小的 astrbot.api 替身，只提供插件用到的名字。
+"""
+import logging
+import os
+import sys
+import tempfile
+import types
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(PLUGIN_DIR, "bench")
+
+
+def _install_astrbot_stub() -> None:
+    def module(name: str, **attrs) -> types.ModuleType:
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    class _Filter:
+        class PermissionType:
+            ADMIN = "admin"
+
+        @staticmethod
+        def command(*args, **kwargs):
+            return lambda fn: fn
+
+        @staticmethod
+        def permission_type(*args, **kwargs):
+            return lambda fn: fn
+
+    class _Star:
+        def __init__(self, context):
+            self.context = context
+
+    class _StarTools:
+        @classmethod
+        def get_data_dir(cls, name):
+            path = os.path.join(tempfile.mkdtemp(prefix="motd_test_"), name)
+            os.makedirs(path, exist_ok=True)
+            return path
+
+    class _Image:
+        def __init__(self, file):
+            self.file = file
+
+        @classmethod
+        def fromBytes(cls, data):
+            return cls(data)
+
+    class _Plain:
+        def __init__(self, text):
+            self.text = text
+
+    class _MessageChain:
+        def __init__(self):
+            self.chain = []
+
+        def message(self, text):
+            self.chain.append(text)
+            return self
+
+    astrbot = module("astrbot")
+    api = module(
+        "astrbot.api",
+        logger=logging.getLogger("astrbot"),
+        AstrBotConfig=dict,
+    )
+    astrbot.api = api
+    api.event = module("astrbot.api.event", filter=_Filter(), AstrMessageEvent=object, MessageChain=_MessageChain)
+    api.star = module(
+        "astrbot.api.star", Context=object, Star=_Star, StarTools=_StarTools, register=lambda *a, **k: (lambda c: c)
+    )
+    api.message_components = module("astrbot.api.message_components", Image=_Image, Plain=_Plain)
+
+
+try:
+    import astrbot.api  # noqa: F401
+except ImportError:
+    _install_astrbot_stub()
+
+if "motd_plugin" not in sys.modules:
+    package = types.ModuleType("motd_plugin")
+    package.__path__ = [PLUGIN_DIR]
+    sys.modules["motd_plugin"] = package
+
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
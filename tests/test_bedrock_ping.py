@@ -0,0 +1,180 @@
+import asyncio
+import struct
+import time
+
+import pytest
+
+import fake_servers
+from fake_servers import FakeBedrockServer, FakeServerOptions
+from motd_plugin.bedrock_ping import BedrockPinger, build_ping, parse_pong, pong_to_info
+
+
+class Recorder(asyncio.DatagramProtocol):
+    """只记录收到的数据包、从不应答的 UDP 端点"""
+
+    def __init__(self):
+        self.packets = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.packets.put_nowait((data, addr))
+
+
+async def udp_endpoint(host):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(Recorder, local_addr=(host, 0))
+    return transport, protocol, transport.get_extra_info("sockname")[1]
+
+
+async def start_fake(**options):
+    server = FakeBedrockServer(FakeServerOptions(**options))
+    port = await server.start("127.0.0.1", 0)
+    return server, port
+
+
+def test_pong_matched_by_ping_id_and_source_address():
+    async def scenario():
+        pinger = BedrockPinger(resend_interval=5.0)
+        target, recorder, port = await udp_endpoint("127.0.0.1")
+        stranger, _, _ = await udp_endpoint("127.0.0.2")
+        fake = FakeBedrockServer(FakeServerOptions(players_online=7))
+        try:
+            task = asyncio.create_task(pinger.ping("127.0.0.1", port, timeout=2.0, host="play.example"))
+            data, client = await asyncio.wait_for(recorder.packets.get(), 1.0)
+            ping_id = data[1:9]
+            wrong_id = struct.pack(">Q", (struct.unpack(">Q", ping_id)[0] + 1) & 0xFFFFFFFFFFFFFFFF)
+
+            # 来源地址不符与编号不符的 pong 都应被忽略
+            stranger.sendto(fake.pong(ping_id), client)
+            target.sendto(fake.pong(wrong_id), client)
+            await asyncio.sleep(0.1)
+            assert not task.done()
+
+            target.sendto(fake.pong(ping_id), client)
+            info = await asyncio.wait_for(task, 1.0)
+            assert info["host"] == "play.example"
+            assert info["port"] == port
+            assert info["players_online"] == 7
+            assert pinger.in_flight == 0
+        finally:
+            pinger.close()
+            target.close()
+            stranger.close()
+
+    asyncio.run(scenario())
+
+
+def test_pong_from_wrong_address_times_out():
+    async def scenario():
+        pinger = BedrockPinger(resend_interval=5.0)
+        target, recorder, port = await udp_endpoint("127.0.0.1")
+        stranger, _, _ = await udp_endpoint("127.0.0.2")
+        fake = FakeBedrockServer(FakeServerOptions())
+        try:
+            task = asyncio.create_task(pinger.ping("127.0.0.1", port, timeout=0.3))
+            data, client = await asyncio.wait_for(recorder.packets.get(), 1.0)
+            stranger.sendto(fake.pong(data[1:9]), client)
+            with pytest.raises(asyncio.TimeoutError):
+                await task
+            assert pinger.in_flight == 0
+        finally:
+            pinger.close()
+            target.close()
+            stranger.close()
+
+    asyncio.run(scenario())
+
+
+def test_timeout_is_per_target():
+    async def scenario():
+        pinger = BedrockPinger(resend_interval=0.1)
+        silent, _, silent_port = await udp_endpoint("127.0.0.1")
+        server, port = await start_fake(latency_ms=20)
+        try:
+            started = time.monotonic()
+            fast, slow = await asyncio.gather(
+                pinger.ping("127.0.0.1", port, timeout=2.0),
+                pinger.ping("127.0.0.1", silent_port, timeout=0.3),
+                return_exceptions=True,
+            )
+            elapsed = time.monotonic() - started
+            assert fast["online"] is True
+            assert isinstance(slow, asyncio.TimeoutError)
+            assert 0.25 < elapsed < 1.0
+        finally:
+            pinger.close()
+            silent.close()
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_resends_after_dropped_ping(monkeypatch):
+    original = fake_servers._BedrockProtocol.datagram_received
+    dropped = []
+
+    def lossy(self, data, addr):
+        if not dropped:
+            dropped.append(data)
+            return
+        original(self, data, addr)
+
+    monkeypatch.setattr(fake_servers._BedrockProtocol, "datagram_received", lossy)
+
+    async def scenario():
+        pinger = BedrockPinger(resend_interval=0.1)
+        server, port = await start_fake()
+        try:
+            info = await pinger.ping("127.0.0.1", port, timeout=2.0)
+            return info, server.requests
+        finally:
+            pinger.close()
+            await server.close()
+
+    info, requests = asyncio.run(scenario())
+    assert len(dropped) == 1
+    assert requests == 1
+    assert info["online"] is True
+    # 延迟从最近一次发送算起，不包含丢包的等待时间
+    assert info["latency_ms"] < 100
+
+
+def test_build_and_parse_round_trip():
+    fake = FakeBedrockServer(FakeServerOptions())
+    ping = build_ping(42, 7)
+    ping_id, payload = parse_pong(fake.pong(ping[1:9]))
+    assert ping_id == 42
+    assert payload.startswith("MCPE;")
+    with pytest.raises(ValueError):
+        parse_pong(b"\x1c" + b"\x00" * 40)
+
+
+def test_pong_to_info_shape():
+    payload = "MCPE;Hello;712;1.21.50;3;50;123456;World;Survival;1;19132;19133;"
+    info = pong_to_info(payload, "play.example", 19132, 12.6)
+    assert info == {
+        "edition": "BE基岩版",
+        "host": "play.example",
+        "port": 19132,
+        "online": True,
+        "latency_ms": 13,
+        "protocol": 712,
+        "version_name": "1.21.50",
+        "players_online": 3,
+        "players_max": 50,
+        "player_names": [],
+        "motd": "Hello",
+        "favicon_data_uri": None,
+    }
+
+
+def test_pong_to_info_lenient_fields():
+    # MOTD 为空时使用地图名，无法解析的数字按 0 处理
+    info = pong_to_info("MCPE;;;;x;y;1;World", "h", 1, 0)
+    assert info["motd"] == "World"
+    assert info["protocol"] is None
+    assert (info["players_online"], info["players_max"]) == (0, 0)
+
+
+def test_pong_to_info_rejects_short_payload():
+    with pytest.raises(ValueError):
+        pong_to_info("MCPE;Hello;712;1.21.50;3", "h", 1, 0)
@@ -0,0 +1,29 @@
+from PIL import ImageChops
+
+from motd_plugin.main import MinecraftMOTDPlugin
+
+
+def make_infos(player_names):
+    java = {
+        "edition": "Java", "host": "play.example", "port": 25565, "online": True, "latency_ms": 20,
+        "protocol": 765, "version_name": "Paper 1.20.4", "players_online": 42, "players_max": 100,
+        "player_names": player_names, "motd": "Welcome", "favicon_data_uri": None,
+    }
+    bedrock = dict(java, edition="BE基岩版", port=19132, version_name="1.21.50", player_names=[])
+    return [java, bedrock]
+
+
+def test_combined_card_shows_java_player_sample_in_its_column():
+    plugin = MinecraftMOTDPlugin(None, {"history_persist": False, "warm_state_persist": False})
+    with_sample = plugin._draw_combined_image(make_infos([f"Player_{i:02d}" for i in range(12)]))
+    without = plugin._draw_combined_image(make_infos([]))
+    template = plugin.card_templates.combined(plugin.default_theme)
+    (java_x0, java_x1), (bedrock_x0, _) = template.column_spans
+
+    box = ImageChops.difference(with_sample.convert("RGB"), without.convert("RGB")).getbbox()
+    assert box is not None
+    left, top, right, bottom = box
+    # 只绘制在 Java 栏的在线人数下方、MOTD 上方，长列表按栏宽截断
+    assert java_x0 <= left and right <= java_x1 < bedrock_x0
+    assert template.y_players < top and bottom <= template.y_motd
+    assert plugin._player_sample_text(make_infos(["a"] * 12)[0]).count("a") == 10
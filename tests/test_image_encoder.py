@@ -0,0 +1,46 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from motd_plugin.image_encoder import FORMATS, ImageEncoder, sniff_suffix
+
+
+def noisy_card(mode="RGBA", size=(240, 120)):
+    """带噪点的卡片，保证任何格式都超出很小的字节预算"""
+    image = Image.effect_noise(size, 80).convert(mode)
+    image.paste((40, 120, 200) + ((255,) if mode == "RGBA" else ()), (10, 10, 90, 60))
+    return image
+
+
+@pytest.mark.parametrize("image_format", FORMATS)
+@pytest.mark.parametrize("max_bytes", [0, 64])
+def test_every_attempt_accepts_rgba(image_format, max_bytes):
+    encoder = ImageEncoder(image_format, max_bytes=max_bytes)
+    image = noisy_card()
+    attempts = encoder._attempts(image_format)
+    for fmt, param in attempts:
+        data = encoder._encode_once(image, fmt, param)
+        assert sniff_suffix(data) == {"png": ".png", "png8": ".png", "webp": ".webp", "jpeg": ".jpg"}[fmt]
+
+    result = encoder.encode(image, image_format)
+    assert result.attempts == len(attempts)
+    if max_bytes:
+        # 预算无法满足时走完所有尝试并返回其中最小的结果
+        assert len(attempts) > 1
+        assert result.format in {fmt for fmt, _ in attempts}
+    assert image.mode == "RGBA"
+
+
+def test_png_keeps_alpha():
+    data = ImageEncoder("png").encode(noisy_card(), "png").data
+    assert Image.open(BytesIO(data)).mode == "RGBA"
+
+
+def test_budget_falls_back_until_it_fits():
+    image = noisy_card("RGB")
+    full = ImageEncoder("png").encode(image, "png")
+    encoder = ImageEncoder("png", max_bytes=len(full.data) // 2)
+    result = encoder.encode(image, "png")
+    assert len(result.data) <= encoder.max_bytes
+    assert result.format != "png"
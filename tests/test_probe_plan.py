@@ -0,0 +1,189 @@
+import asyncio
+
+from motd_plugin.main import MinecraftMOTDPlugin
+
+
+def java_info(host, port, latency_ms=20):
+    return {
+        "edition": "Java", "host": host, "port": port, "online": True, "latency_ms": latency_ms,
+        "protocol": 765, "version_name": "1.20.4", "players_online": 3, "players_max": 20,
+        "player_names": [], "motd": "hello", "favicon_data_uri": None,
+    }
+
+
+def make_plugin(**config):
+    config.setdefault("history_persist", False)
+    config.setdefault("warm_state_persist", False)
+    return MinecraftMOTDPlugin(None, config)
+
+
+def test_open_breaker_does_not_change_host_profile():
+    async def scenario():
+        plugin = make_plugin(status_cache_ttl=0)
+        calls = {"java": 0, "bedrock": 0}
+
+        async def probe_java(host, port, timeout_sec=5.0, target=None):
+            calls["java"] += 1
+            return java_info(host, port)
+
+        async def probe_bedrock(host, port, timeout_sec=5.0, target=None):
+            calls["bedrock"] += 1
+            return None
+
+        plugin._probe_java = probe_java
+        plugin._probe_bedrock = probe_bedrock
+        try:
+            for _ in range(3):
+                await plugin._parallel_probe("203.0.113.5", None, timeout_sec=1.0)
+        finally:
+            await plugin.terminate()
+        return plugin, calls
+
+    plugin, calls = asyncio.run(scenario())
+    # 第一次失败后熔断，之后两次查询都不再实际探测基岩版
+    assert calls == {"java": 3, "bedrock": 1}
+    profile = plugin.host_profiles.get(("203.0.113.5", None))
+    assert (profile.java_ok, profile.bedrock_ok, profile.bedrock_fail) == (3, 0, 1)
+    assert plugin.host_profiles.predict(("203.0.113.5", None)) is None
+
+
+class SlowResolver:
+    """解析总是超时或失败的替身解析器，并记录调用次数"""
+
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def resolve(self, host, srv=True, timeout=5.0):
+        self.calls += 1
+        if self.delay:
+            await asyncio.wait_for(asyncio.sleep(self.delay), timeout)
+        raise self.error
+
+
+def seed_cache(plugin, host, age_sec):
+    import time
+    info = java_info(host, 25565)
+    plugin.status_cache.set((host, 25565, "java"), info, stored_at=time.time() - age_sec)
+    plugin.breaker.record_failure((host, 19132, "bedrock"))
+
+
+def test_fresh_cache_answers_without_waiting_for_dns():
+    from motd_plugin.resolver import NXDomainError
+
+    async def scenario(resolver):
+        plugin = make_plugin(status_cache_ttl=30)
+        plugin.resolver = resolver
+        seed_cache(plugin, "play.example", age_sec=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            results = await plugin._parallel_probe("play.example", None, timeout_sec=2.0)
+        finally:
+            await plugin.terminate()
+        return results, loop.time() - started
+
+    for resolver in (SlowResolver(asyncio.TimeoutError(), delay=5.0), SlowResolver(NXDomainError("play.example"))):
+        results, elapsed = asyncio.run(scenario(resolver))
+        assert [r["edition"] for r in results] == ["Java"]
+        assert "cache_age_sec" in results[0]
+        assert elapsed < 0.5
+        # 基岩版熔断中，Java 命中缓存，都不需要解析
+        assert resolver.calls == 0
+
+
+def test_stale_reply_skips_dns_and_revalidates_in_background():
+    async def scenario():
+        plugin = make_plugin(status_cache_ttl=30, status_max_stale_sec=300)
+        resolver = SlowResolver(asyncio.TimeoutError(), delay=0.3)
+        plugin.resolver = resolver
+        seed_cache(plugin, "play.example", age_sec=60)
+        probes = []
+
+        async def probe_java(host, port, timeout_sec=5.0, target=None):
+            probes.append(target)
+            return java_info(host, port)
+
+        plugin._probe_java = probe_java
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            results = await plugin._parallel_probe("play.example", None, timeout_sec=2.0, allow_stale=True)
+            elapsed = loop.time() - started
+            await asyncio.gather(*plugin._revalidations.values(), return_exceptions=True)
+        finally:
+            await plugin.terminate()
+        return plugin, results, elapsed, resolver, probes
+
+    plugin, results, elapsed, resolver, probes = asyncio.run(scenario())
+    assert results[0].get("stale") is True
+    assert elapsed < 0.2
+    # 后台刷新才解析地址；解析失败时不探测，也不丢弃缓存或计入熔断
+    assert resolver.calls == 1
+    assert probes == []
+    assert plugin.status_cache.get_entry(("play.example", 25565, "java")) is not None
+    assert not plugin.breaker.is_open(("play.example", 25565, "java"))
+
+
+def test_dns_failure_is_not_a_probe_failure():
+    from motd_plugin.resolver import NXDomainError
+
+    async def scenario():
+        plugin = make_plugin(status_cache_ttl=30)
+        plugin.resolver = SlowResolver(NXDomainError("missing.example"))
+        try:
+            results = await plugin._parallel_probe("missing.example", None, timeout_sec=1.0)
+        finally:
+            await plugin.terminate()
+        return plugin, results
+
+    plugin, results = asyncio.run(scenario())
+    assert results == []
+    assert plugin.resolver.calls == 1
+    assert plugin.host_profiles.get(("missing.example", None)) is None
+    assert not plugin.breaker.is_open(("missing.example", 25565, "java"))
+
+
+class FakeEvent:
+    def plain_result(self, text):
+        return ("plain", text)
+
+    def chain_result(self, chain):
+        return ("chain", chain)
+
+
+def test_batch_card_reads_history_on_the_event_loop_thread():
+    import threading
+
+    async def scenario():
+        plugin = make_plugin(status_cache_ttl=0)
+
+        async def probe_java(host, port, timeout_sec=5.0, target=None):
+            return java_info(host, port)
+
+        async def probe_bedrock(host, port, timeout_sec=5.0, target=None):
+            return None
+
+        plugin._probe_java = probe_java
+        plugin._probe_bedrock = probe_bedrock
+        threads = []
+        with_history = plugin._with_history
+
+        def record_thread(info):
+            threads.append(threading.current_thread())
+            return with_history(info)
+
+        plugin._with_history = record_thread
+        try:
+            # 先积累几条历史样本，使卡片带有趋势图
+            for _ in range(3):
+                await plugin._parallel_probe("203.0.113.5", None, timeout_sec=1.0)
+            replies = [r async for r in plugin._handle_batch(FakeEvent(), ["203.0.113.5", "203.0.113.6"])]
+        finally:
+            await plugin.terminate()
+        return replies, threads
+
+    replies, threads = asyncio.run(scenario())
+    assert [kind for kind, _ in replies] == ["chain"]
+    assert threads and all(t is threading.main_thread() for t in threads)
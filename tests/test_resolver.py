@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from motd_plugin.resolver import AsyncResolver, NXDomainError
+
+
+class StubBackend:
+    """本地替身解析器：按 (name, rdtype) 返回预设记录并统计查询次数"""
+
+    def __init__(self, records=None, delay=0.0):
+        # (name, rdtype) -> (records, ttl) 或异常
+        self.records = records or {}
+        self.delay = delay
+        self.calls = []
+
+    async def query(self, name, rdtype, timeout):
+        self.calls.append((name, rdtype, timeout))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        result = self.records.get((name, rdtype), ([], None))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def count(backend, rdtype):
+    return sum(1 for _, t, _ in backend.calls if t == rdtype)
+
+
+def test_records_cached_until_ttl_expires(monkeypatch):
+    backend = StubBackend({("play.example", "A"): (["203.0.113.5"], 30)})
+    resolver = AsyncResolver(backend=backend, min_ttl=1)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    first = run(resolver.resolve("Play.Example.", srv=False, timeout=1))
+    assert first.ip == "203.0.113.5"
+    run(resolver.resolve("play.example", srv=False, timeout=1))
+    assert count(backend, "A") == 1
+    assert resolver.hits >= 1
+
+    now[0] += 31
+    run(resolver.resolve("play.example", srv=False, timeout=1))
+    assert count(backend, "A") == 2
+
+
+def test_ttl_clamped_to_bounds(monkeypatch):
+    backend = StubBackend({("play.example", "A"): (["203.0.113.5"], 999999)})
+    resolver = AsyncResolver(backend=backend, max_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    run(resolver.resolve("play.example", srv=False, timeout=1))
+    now[0] += 61
+    run(resolver.resolve("play.example", srv=False, timeout=1))
+    assert count(backend, "A") == 2
+
+
+def test_nxdomain_is_negatively_cached(monkeypatch):
+    backend = StubBackend({("missing.example", "A"): NXDomainError("missing.example")})
+    resolver = AsyncResolver(backend=backend, negative_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    for _ in range(3):
+        with pytest.raises(NXDomainError):
+            run(resolver.resolve("missing.example", srv=False, timeout=1))
+    assert count(backend, "A") == 1
+
+    now[0] += 61
+    with pytest.raises(NXDomainError):
+        run(resolver.resolve("missing.example", srv=False, timeout=1))
+    assert count(backend, "A") == 2
+
+
+def test_srv_selects_lowest_priority_then_highest_weight():
+    backend = StubBackend({
+        ("play.example", "A"): (["203.0.113.5"], 300),
+        ("_minecraft._tcp.play.example", "SRV"): ([
+            (20, 100, "backup.example", 25570),
+            (10, 5, "light.example", 25566),
+            (10, 50, "heavy.example", 25567),
+        ], 300),
+    })
+    resolved = run(AsyncResolver(backend=backend).resolve("play.example", srv=True, timeout=1))
+    assert (resolved.java_host, resolved.java_port) == ("heavy.example", 25567)
+    # 基岩版仍使用原域名的 A 记录
+    assert resolved.ip == "203.0.113.5"
+
+
+def test_srv_nxdomain_with_a_record_falls_back_to_host():
+    backend = StubBackend({
+        ("play.example", "A"): (["203.0.113.5"], 300),
+        ("_minecraft._tcp.play.example", "SRV"): NXDomainError("_minecraft._tcp.play.example"),
+    })
+    resolved = run(AsyncResolver(backend=backend).resolve("play.example", srv=True, timeout=1))
+    assert resolved.java_host == "play.example"
+    assert resolved.java_port is None
+    assert resolved.addresses == ["203.0.113.5"]
+
+
+def test_ip_literal_skips_backend():
+    backend = StubBackend()
+    resolved = run(AsyncResolver(backend=backend).resolve("2001:db8::1", srv=True, timeout=1))
+    assert resolved.ip == "2001:db8::1"
+    assert backend.calls == []
+
+
+def test_timeout_bounds_resolution():
+    backend = StubBackend({("slow.example", "A"): (["203.0.113.5"], 300)}, delay=1.0)
+    resolver = AsyncResolver(backend=backend)
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        run(resolver.resolve("slow.example", srv=True, timeout=0.1))
+    assert time.monotonic() - started < 0.5
+    assert all(timeout == 0.1 for _, _, timeout in backend.calls)
+
+
+def test_dns_time_is_taken_from_probe_deadline():
+    from motd_plugin.main import MinecraftMOTDPlugin
+
+    async def scenario():
+        plugin = MinecraftMOTDPlugin(None, {"history_persist": False, "warm_state_persist": False})
+        backend = StubBackend({("slow.example", "A"): (["203.0.113.5"], 300)}, delay=0.3)
+        plugin.resolver = AsyncResolver(backend=backend)
+        budgets = {}
+
+        def fake_probe(edition):
+            async def probe(host, port, timeout_sec=5.0, target=None):
+                budgets[edition] = (timeout_sec, target)
+                return None
+            return probe
+
+        plugin._probe_java = fake_probe("java")
+        plugin._probe_bedrock = fake_probe("bedrock")
+        try:
+            results = [r async for r in plugin._iter_probe_results("slow.example", None, timeout_sec=1.0)]
+        finally:
+            await plugin.terminate()
+        return results, budgets, backend
+
+    results, budgets, backend = run(scenario())
+    assert results == []
+    # 两个版本共享一次解析
+    assert count(backend, "A") == 1
+    assert set(budgets) == {"java", "bedrock"}
+    for timeout_sec, _ in budgets.values():
+        # 解析耗时约 0.3s，从 1.0s 的总时限中扣除
+        assert 0.5 < timeout_sec < 0.75
+    assert budgets["bedrock"][1] == ("203.0.113.5", 19132)
+    assert budgets["java"][1] == ("slow.example", 25565)
@@ -0,0 +1,25 @@
+import os
+import time
+
+from motd_plugin.spool import ImageSpool
+
+
+def test_cleanup_removes_every_card_format(tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    for name in ("motd_a.png", "motd_b.jpg", "motd_c.webp", "other.png"):
+        (spool_dir / name).write_bytes(b"x")
+    for name in ("motd_old.jpg", "motd_new.webp", "motd_notes.txt"):
+        (legacy_dir / name).write_bytes(b"x")
+    old = time.time() - 3600
+    os.utime(legacy_dir / "motd_old.jpg", (old, old))
+    os.utime(legacy_dir / "motd_notes.txt", (old, old))
+
+    removed = ImageSpool(str(spool_dir)).cleanup_leftovers([str(legacy_dir)], min_age_sec=60)
+
+    assert removed == 4
+    assert sorted(os.listdir(spool_dir)) == ["other.png"]
+    # 其他目录只删除足够旧的卡片文件
+    assert sorted(os.listdir(legacy_dir)) == ["motd_new.webp", "motd_notes.txt"]
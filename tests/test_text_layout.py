@@ -0,0 +1,40 @@
+from PIL import Image, ImageFont
+
+from motd_plugin.styled_text import StyledTextRenderer, parse_motd
+from motd_plugin.text_layout import GlyphWidthCache, wrap_spans, wrap_text
+
+
+def test_wrap_spans_breaks_words_cjk_and_long_tokens():
+    # 超长单词从当前行的剩余空间开始按字符断开
+    text = "ab cd 中文字 xxxxxxx"
+    spans, truncated = wrap_spans(text, [1.0] * len(text), 5)
+    assert [text[s:e] for s, e in spans] == ["ab cd", "中文字 x", "xxxxx", "x"]
+    assert not truncated
+
+
+def test_wrap_spans_keeps_blank_lines_and_reports_truncation():
+    text = "a\n\nb\nc"
+    spans, truncated = wrap_spans(text, [1.0] * len(text), 10, max_lines=3)
+    assert [text[s:e] for s, e in spans] == ["a", "", "b"]
+    assert truncated
+    spans, truncated = wrap_spans("abc def", [1.0] * 7, 3, max_lines=1)
+    assert spans == [(0, 3)] and truncated
+
+
+def test_plain_and_styled_text_wrap_identically():
+    font = ImageFont.load_default(size=14)
+    text = "Welcome to the 测试服务器 with a Supercalifragilistic word"
+    lines = wrap_text(text, font, 90, GlyphWidthCache())
+
+    renderer = StyledTextRenderer()
+    image = Image.new("RGB", (200, 400))
+    drawn = renderer.draw(image, (0, 0), parse_motd(text), font, 90, 20, 16, (255, 255, 255))
+    assert drawn == len(lines)
+    assert len(lines) > 1
+
+
+def test_wrap_text_ellipsis_when_truncated():
+    font = ImageFont.load_default(size=14)
+    lines = wrap_text("one two three four five six", font, 60, GlyphWidthCache(), max_lines=2)
+    assert len(lines) == 2
+    assert lines[-1].endswith("...")
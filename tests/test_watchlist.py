@@ -0,0 +1,55 @@
+import asyncio
+
+from motd_plugin.watchlist import WatchScheduler, WatchTarget
+
+
+JAVA = {"edition": "Java", "version_name": "1.21.4", "players_online": 12, "players_max": 100}
+BEDROCK = {"edition": "BE基岩版", "version_name": "1.21.50", "players_online": 3, "players_max": 50}
+
+
+def make_scheduler(tmp_path, results):
+    sent = []
+
+    async def probe(host, port):
+        return results.pop(0)
+
+    async def notify(umo, text):
+        sent.append((umo, text))
+
+    scheduler = WatchScheduler(probe, notify, str(tmp_path / "watchlist.json"))
+    return scheduler, sent
+
+
+def poll_all(tmp_path, results, online=None):
+    rounds = len(results)
+    scheduler, sent = make_scheduler(tmp_path, results)
+    target = WatchTarget(host="play.example", port=None, label="play.example",
+                         subscribers={"umo": None}, online=online)
+
+    async def run():
+        for _ in range(rounds):
+            await scheduler._poll(target)
+
+    asyncio.run(run())
+    return target, sent
+
+
+def test_completion_order_does_not_flap_version(tmp_path):
+    target, sent = poll_all(tmp_path, [[JAVA, BEDROCK], [BEDROCK, JAVA], [JAVA, BEDROCK]], online=True)
+    assert sent == []
+    assert target.versions == {"Java": "1.21.4", "BE基岩版": "1.21.50"}
+    assert target.players == 12
+
+
+def test_back_online_reports_java_regardless_of_order(tmp_path):
+    for order in ([JAVA, BEDROCK], [BEDROCK, JAVA]):
+        target, sent = poll_all(tmp_path, [order], online=False)
+        assert len(sent) == 1
+        assert "已上线 (Java 1.21.4, 12/100)" in sent[0][1]
+
+
+def test_version_change_is_per_edition(tmp_path):
+    upgraded = dict(BEDROCK, version_name="1.21.60")
+    target, sent = poll_all(tmp_path, [[JAVA, BEDROCK], [upgraded, JAVA]], online=True)
+    assert len(sent) == 1
+    assert "play.example (BE基岩版) 版本变更: 1.21.50 → 1.21.60" in sent[0][1]
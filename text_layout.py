@@ -0,0 +1,150 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from PIL import ImageFont
+
+
+# 断行单元：连续空白、单个 CJK 字符、或不含空白与 CJK 的连续字符（拉丁单词）
+TOKEN_RE = re.compile(r"\s+|[⺀-鿿가-힯豈-﫿＀-￯]|[^\s⺀-鿿가-힯豈-﫿＀-￯]+")
+
+ELLIPSIS = "..."
+
+
+class GlyphWidthCache:
+    """
+    字形宽度缓存
+
+    按字体缓存每个字符的前进宽度，测量一段文本只需对已缓存的宽度求和，
+    不必每次调用 textlength 重新排版整行。字体对象由 FontCache 长期持有，
+    因此直接以字体对象为键。
+    """
+
+    def __init__(self):
+        self._widths: Dict[ImageFont.ImageFont, Dict[str, float]] = {}
+
+    def advance(self, font: ImageFont.ImageFont, ch: str) -> float:
+        table = self._widths.get(font)
+        if table is None:
+            table = self._widths.setdefault(font, {})
+        width = table.get(ch)
+        if width is None:
+            width = font.getlength(ch)
+            table[ch] = width
+        return width
+
+    def measure(self, font: ImageFont.ImageFont, text: str) -> float:
+        return sum(self.advance(font, ch) for ch in text)
+
+
+def wrap_spans(text: str, advances: List[float], max_width: float,
+               max_lines: Optional[int] = None) -> Tuple[List[Tuple[int, int]], bool]:
+    """
+    按宽度折行，只处理下标而不拼接字符串
+
+    拉丁文本在单词边界断行，CJK 字符可在任意字符间断行，超长单词按字符强制断开；
+    行尾空白不计入行内。纯文本与带样式文字共用这一实现，后者的字宽包含粗体等样式。
+
+    Args:
+        text: 要折行的文本（换行符只能是 \n）
+        advances: 每个字符的前进宽度，与 text 等长
+        max_width: 最大宽度
+        max_lines: 最多输出的行数
+
+    Returns:
+        (每行的 [start, end) 下标, 是否因行数限制被截断)
+    """
+    lines: List[Tuple[int, int]] = []
+
+    def full() -> bool:
+        return max_lines is not None and len(lines) >= max_lines
+
+    def rstrip(start: int, end: int) -> Tuple[int, int]:
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    offset = 0
+    for paragraph in text.split("\n"):
+        if full():
+            return lines, True
+        para_start = offset
+        offset += len(paragraph) + 1
+        if not paragraph:
+            # 保留空行
+            lines.append((para_start, para_start))
+            continue
+        line_start: Optional[int] = None
+        width = 0.0
+        pos = para_start
+        for token in TOKEN_RE.findall(paragraph):
+            if full():
+                return lines, True
+            t_start, t_end = pos, pos + len(token)
+            pos = t_end
+            token_width = sum(advances[t_start:t_end])
+            if line_start is None:
+                line_start = t_start
+            if width + token_width <= max_width:
+                width += token_width
+                continue
+            if token.isspace():
+                # 行尾空白直接丢弃并换行
+                lines.append(rstrip(line_start, t_start))
+                line_start, width = None, 0.0
+            elif token_width <= max_width and t_start > line_start:
+                lines.append(rstrip(line_start, t_start))
+                line_start, width = t_start, token_width
+            else:
+                # 单词比整行还宽：按字符强制断开
+                for i in range(t_start, t_end):
+                    if width + advances[i] > max_width and i > line_start:
+                        lines.append(rstrip(line_start, i))
+                        line_start, width = i, 0.0
+                        if full():
+                            return lines, True
+                    width += advances[i]
+        if line_start is not None:
+            if full():
+                return lines, True
+            lines.append(rstrip(line_start, pos))
+    return lines, False
+
+
+def wrap_text(text: str, font: ImageFont.ImageFont, max_width: float, widths: GlyphWidthCache,
+              max_lines: Optional[int] = None) -> List[str]:
+    """
+    按宽度折行文本
+
+    折行规则见 wrap_spans；每个字符只测量一次，整体为线性复杂度。
+
+    Args:
+        text: 要折行的文本
+        font: 字体对象
+        max_width: 最大宽度
+        widths: 字形宽度缓存
+        max_lines: 最多输出的行数，超出时最后一行以省略号结尾
+
+    Returns:
+        折行后的文本列表
+    """
+    if not text or (max_lines is not None and max_lines <= 0):
+        return []
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    advances = [0.0 if ch == "\n" else widths.advance(font, ch) for ch in text]
+    spans, truncated = wrap_spans(text, advances, max_width, max_lines)
+    lines = [text[start:end] for start, end in spans]
+    if truncated and lines:
+        lines[-1] = _fit_ellipsis(lines[-1], font, max_width, widths)
+    return lines
+
+
+def _fit_ellipsis(line: str, font: ImageFont.ImageFont, max_width: float, widths: GlyphWidthCache) -> str:
+    budget = max_width - widths.measure(font, ELLIPSIS)
+    width = 0.0
+    end = 0
+    for i, ch in enumerate(line):
+        width += widths.advance(font, ch)
+        if width > budget:
+            break
+        end = i + 1
+    return line[:end].rstrip() + ELLIPSIS
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+
+# (键, 值, 写入时间, 过期时间)；过期时间为 None 时按 max_age_sec 淘汰
+Row = Tuple[str, bytes, float, Optional[float]]
+
+
+def dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"))
+
+
+class WarmStateStore:
+    """
+    缓存与主机画像的本地快照
+
+    插件停止时与运行期间定期把各缓存的条目按分区（status、dns、favicon、host）写入 SQLite，
+    启动后在后台读回，过期条目与版本不符的快照直接丢弃，由调用方逐条校验后放回缓存。
+    读写均为同步方法，需在线程中调用。
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str, max_age_sec: float = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_age_sec = max_age_sec
+        self._db_lock = threading.Lock()
+        self._save_task: Optional[asyncio.Task] = None
+
+    def load(self) -> Dict[str, List[Row]]:
+        """
+        读取未过期的快照条目
+
+        Returns:
+            分区 -> [(键, 值, 写入时间, 过期时间)]；没有快照或快照无效时为空
+        """
+        if not os.path.isfile(self.db_path):
+            return {}
+        now = time.time()
+        sections: Dict[str, List[Row]] = {}
+        try:
+            with self._db_lock, sqlite3.connect(self.db_path) as conn:
+                if not self._schema_ok(conn):
+                    logger.info("启动快照版本不符，已忽略")
+                    return {}
+                rows = conn.execute(
+                    "SELECT section, key, value, stored_at, expires_at FROM entries "
+                    "WHERE (expires_at IS NULL OR expires_at > ?) AND stored_at >= ?",
+                    (now, now - self.max_age_sec),
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"读取启动快照失败: {e}")
+            return {}
+        for section, key, value, stored_at, expires_at in rows:
+            sections.setdefault(section, []).append((key, bytes(value), float(stored_at), expires_at))
+        return sections
+
+    def save(self, sections: Dict[str, List[Row]]) -> None:
+        """以一个事务整体替换快照"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._db_lock, sqlite3.connect(self.db_path) as conn:
+            if not self._schema_ok(conn):
+                conn.execute("DROP TABLE IF EXISTS entries")
+                conn.execute("DROP TABLE IF EXISTS meta")
+                self._ensure_schema(conn)
+            conn.execute("DELETE FROM entries")
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (section, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                [(section, key, value, stored_at, expires_at)
+                 for section, rows in sections.items() for key, value, stored_at, expires_at in rows],
+            )
+
+    def start(self, save: Callable[[], Awaitable[None]], interval: float = 300.0) -> None:
+        """定期调用 save 写入快照"""
+        if interval > 0 and (self._save_task is None or self._save_task.done()):
+            self._save_task = asyncio.create_task(self._save_loop(save, interval))
+
+    async def close(self) -> None:
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+
+    async def _save_loop(self, save: Callable[[], Awaitable[None]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await save()
+            except Exception as e:
+                logger.warning(f"写入启动快照失败: {e}")
+
+    def _schema_ok(self, conn: sqlite3.Connection) -> bool:
+        """检查快照结构版本，新建的空库视为有效"""
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not tables:
+            self._ensure_schema(conn)
+            return True
+        if "meta" not in tables or "entries" not in tables:
+            return False
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        return row is not None and row[0] == str(self.SCHEMA_VERSION)
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "section TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL, PRIMARY KEY (section, key))"
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(self.SCHEMA_VERSION),)
+        )
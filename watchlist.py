@@ -0,0 +1,263 @@
+import asyncio
+import heapq
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+
+WatchKey = Tuple[str, Optional[int]]
+
+# 连续失败多少次才判定为离线，避免偶发丢包造成误报
+OFFLINE_AFTER_FAILURES = 2
+
+
+@dataclass
+class WatchTarget:
+    """
+    被监控的服务器
+
+    多个会话监控同一服务器时共享一个目标，只轮询一次。
+    subscribers 为 会话标识 -> 玩家数阈值（None 表示不关注人数）；
+    versions 为 版本类型 -> 上次探测到的版本号，各版本分别比较。
+    """
+    host: str
+    port: Optional[int]
+    label: str
+    subscribers: Dict[str, Optional[int]] = field(default_factory=dict)
+    online: Optional[bool] = None
+    versions: Dict[str, str] = field(default_factory=dict)
+    players: int = 0
+    failures: int = 0
+
+    @property
+    def key(self) -> WatchKey:
+        return (self.host.lower(), self.port)
+
+
+class WatchScheduler:
+    """
+    服务器监控调度器
+
+    所有目标放在一个按到期时间排序的堆中，由一个调度协程分发给固定数量的工作协程，
+    因此目标数量增加时任务数不变。每次轮询间隔加入随机抖动，分散探测压力；
+    只有在线状态、版本或玩家数越过阈值时才推送通知。
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[str, Optional[int]], Awaitable[List[dict]]],
+        notify: Callable[[str, str], Awaitable[None]],
+        store_path: str,
+        interval_sec: float = 300.0,
+        jitter: float = 0.2,
+        workers: int = 4,
+    ):
+        self.probe = probe
+        self.notify = notify
+        self.store_path = store_path
+        self.interval_sec = max(10.0, float(interval_sec))
+        self.jitter = min(max(float(jitter), 0.0), 0.9)
+        self.workers = max(1, int(workers))
+        self.targets: Dict[WatchKey, WatchTarget] = {}
+        self._heap: List[Tuple[float, WatchKey]] = []
+        # 每个目标当前有效的到期时间，与之不符的堆条目视为过期并丢弃
+        self._due: Dict[WatchKey, float] = {}
+        self._queue: "asyncio.Queue[WatchKey]" = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def load(self) -> None:
+        """从本地文件恢复监控列表"""
+        if not os.path.isfile(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("targets", []):
+                target = WatchTarget(
+                    host=item["host"],
+                    port=item.get("port"),
+                    label=item.get("label") or item["host"],
+                    subscribers={k: v for k, v in item.get("subscribers", {}).items()},
+                )
+                if target.subscribers:
+                    self.targets[target.key] = target
+            logger.info(f"已加载监控列表: {len(self.targets)} 个服务器")
+        except Exception as e:
+            logger.warning(f"加载监控列表失败: {e}")
+
+    def save(self) -> None:
+        data = {
+            "targets": [
+                {"host": t.host, "port": t.port, "label": t.label, "subscribers": t.subscribers}
+                for t in self.targets.values()
+            ]
+        }
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            logger.warning(f"保存监控列表失败: {e}")
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        now = time.monotonic()
+        for key in self.targets:
+            # 启动时把首轮探测分散到一个周期内
+            self._schedule(key, now + random.uniform(0, self.interval_sec))
+        self._tasks.append(asyncio.create_task(self._dispatch_loop()))
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker_loop()))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def add(self, umo: str, host: str, port: Optional[int], label: str,
+            threshold: Optional[int] = None) -> bool:
+        """
+        添加监控
+
+        Returns:
+            是否为新增（已存在时只更新阈值）
+        """
+        key = (host.lower(), port)
+        target = self.targets.get(key)
+        created = target is None
+        if target is None:
+            target = WatchTarget(host=host, port=port, label=label)
+            self.targets[key] = target
+            self._schedule(key, time.monotonic())
+        is_new = umo not in target.subscribers
+        target.subscribers[umo] = threshold
+        self.save()
+        return created or is_new
+
+    def remove(self, umo: str, host: str, port: Optional[int]) -> bool:
+        key = (host.lower(), port)
+        target = self.targets.get(key)
+        if target is None or umo not in target.subscribers:
+            return False
+        del target.subscribers[umo]
+        if not target.subscribers:
+            # 堆中残留的条目在出队时会被忽略
+            del self.targets[key]
+            self._due.pop(key, None)
+        self.save()
+        return True
+
+    def list_for(self, umo: str) -> List[WatchTarget]:
+        return [t for t in self.targets.values() if umo in t.subscribers]
+
+    def _next_delay(self) -> float:
+        return self.interval_sec * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _schedule(self, key: WatchKey, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+        self._wakeup.set()
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due, key = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            if self._due.get(key) == due:
+                await self._queue.put(key)
+
+    async def _worker_loop(self) -> None:
+        while True:
+            key = await self._queue.get()
+            try:
+                target = self.targets.get(key)
+                if target is not None:
+                    await self._poll(target)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"监控探测失败 {key}: {type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+                if key in self.targets:
+                    self._schedule(key, time.monotonic() + self._next_delay())
+
+    async def _poll(self, target: WatchTarget) -> None:
+        infos = await self.probe(target.host, target.port)
+        messages: Dict[str, List[str]] = {umo: [] for umo in target.subscribers}
+
+        if not infos:
+            target.failures += 1
+            if target.online and target.failures >= OFFLINE_AFTER_FAILURES:
+                target.online = False
+                for umo in messages:
+                    messages[umo].append(f"🔴 {target.label} 已离线")
+            elif target.online is None and target.failures >= OFFLINE_AFTER_FAILURES:
+                target.online = False
+            await self._send(messages)
+            return
+
+        # 并发探测的结果按完成顺序返回；两个版本都有响应时，人数与上线通知以 Java 版为准
+        infos = sorted(infos, key=lambda i: i.get("edition") != "Java")
+        versions = {info["edition"]: str(info.get("version_name") or "") for info in infos}
+        info = infos[0]
+        players = int(info.get("players_online") or 0)
+        target.failures = 0
+
+        if target.online is False:
+            for umo in messages:
+                messages[umo].append(
+                    f"🟢 {target.label} 已上线 ({info['edition']} {versions[info['edition']]}, "
+                    f"{players}/{info.get('players_max', 0)})"
+                )
+        elif target.online:
+            for edition, version in versions.items():
+                previous = target.versions.get(edition)
+                if version and previous and version != previous:
+                    label = f"{target.label} ({edition})" if len(versions) > 1 else target.label
+                    for umo in messages:
+                        messages[umo].append(f"🧰 {label} 版本变更: {previous} → {version}")
+
+        if target.online:
+            for umo, threshold in target.subscribers.items():
+                if threshold is None:
+                    continue
+                if target.players < threshold <= players:
+                    messages[umo].append(f"👧 {target.label} 在线人数达到 {players} (阈值 {threshold})")
+                elif players < threshold <= target.players:
+                    messages[umo].append(f"👧 {target.label} 在线人数降至 {players} (阈值 {threshold})")
+
+        target.online = True
+        target.versions.update(versions)
+        target.players = players
+        await self._send(messages)
+
+    async def _send(self, messages: Dict[str, List[str]]) -> None:
+        for umo, lines in messages.items():
+            if not lines:
+                continue
+            try:
+                await self.notify(umo, "\n".join(lines))
+            except Exception as e:
+                logger.warning(f"发送监控通知失败: {e}")